@@ -0,0 +1,70 @@
+# bench_bulk_insert.py
+#
+# Compares rows/s of the per-row insert path against the batched bulk loader.
+#
+#     python benchmarks/bench_bulk_insert.py [rows]
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from bulk_loader import configure_for_bulk_load, insert_candidates  # noqa: E402
+from cv_extractor import insert_candidate  # noqa: E402
+
+
+def create_database(path):
+    """Create an empty candidates table at path and return a connection to it."""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+    CREATE TABLE candidates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT,
+        phone TEXT,
+        skills TEXT
+    )
+    ''')
+    conn.commit()
+    return conn
+
+
+def make_rows(count):
+    """Generate synthetic candidate rows."""
+    return [(f"Candidate {i}", f"candidate{i}@example.com", f"+1 555 {i:07d}", "Python, SQL, Machine Learning")
+            for i in range(count)]
+
+
+def per_row(conn, rows):
+    """The original path: one execute and one commit per row."""
+    for row in rows:
+        insert_candidate(conn, *row)
+
+
+def bulk(conn, rows):
+    """The bulk loader path: batched transactions with load pragmas."""
+    configure_for_bulk_load(conn)
+    insert_candidates(conn, rows)
+
+
+def run(count):
+    rows = make_rows(count)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, loader in (("per_row", per_row), ("bulk", bulk)):
+            conn = create_database(os.path.join(tmp, f"{name}.db"))
+            start = time.perf_counter()
+            loader(conn, rows)
+            elapsed = time.perf_counter() - start
+            conn.close()
+            results[name] = count / elapsed
+            print(f"{name:>8}: {count} rows in {elapsed:.3f}s ({results[name]:,.0f} rows/s)")
+    print(f" speedup: {results['bulk'] / results['per_row']:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,66 @@
+# bench_dedup.py
+#
+# Times near-duplicate lookups with the MinHash/LSH index in SQLite against comparing each new CV's
+# signature with every stored one, as the number of stored CVs grows, and checks the LSH index finds
+# every planted near-duplicate (a stored CV with a line changed and a different email).
+#
+#     python benchmarks/bench_dedup.py [queries]
+
+import os
+import random
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from corpus import cv_lines
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from database_setup import setup_database  # noqa: E402
+from dedup import SIMILARITY_THRESHOLD, DuplicateIndex, estimated_similarity, minhash  # noqa: E402
+
+
+def run(queries=200):
+    rng = random.Random(0)
+    conn = sqlite3.connect(':memory:')
+    setup_database(conn)
+    index = DuplicateIndex(conn)
+    texts, signatures = [], []
+    for stored in (1000, 10000, 50000):
+        with conn:
+            while len(texts) < stored:
+                lines = cv_lines(rng, f"B{len(texts):06d}")
+                signature = minhash("\n".join(lines))
+                cursor = conn.execute("INSERT INTO candidates (name) VALUES (?)", (f"B{len(texts):06d}",))
+                index.add(cursor.lastrowid, signature)
+                texts.append(lines)
+                signatures.append(signature)
+        matrix = np.array(signatures)
+
+        originals = rng.sample(range(stored), queries)
+        probes = []
+        for original in originals:
+            lines = list(texts[original])
+            lines[rng.randrange(len(lines))] = "Volunteered at a local food bank."
+            probes.append(minhash("\n".join(lines).replace("@", "_at_")))
+
+        start = time.perf_counter()
+        found = [index.find(signature) for signature in probes]
+        lsh = time.perf_counter() - start
+        start = time.perf_counter()
+        for signature in probes:
+            similarities = (matrix == signature).mean(axis=1)
+            int(np.argmax(similarities))
+        scan = time.perf_counter() - start
+
+        expected = [estimated_similarity(signatures[original], probe) >= SIMILARITY_THRESHOLD
+                    for original, probe in zip(originals, probes)]
+        hits = sum(1 for match, original in zip(found, originals) if match and match[0] == original + 1)
+        print(f"{stored:>6} CVs: LSH {lsh / queries * 1000:6.2f} ms/lookup, full scan {scan / queries * 1000:6.2f} ms/lookup "
+              f"({scan / lsh:.1f}x), found {hits}/{sum(expected)} near-duplicates above the threshold")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,102 @@
+# bench_end_to_end.py
+#
+# Times the whole pipeline on a synthetic corpus: PDF text extraction, ingestion of CVs and job
+# descriptions, scoring and interview scheduling. Results are printed and written as JSON so runs
+# can be compared across versions.
+#
+#     python benchmarks/bench_end_to_end.py --cvs 1000 --jobs 50 --output results.json
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from corpus import write_cv_corpus, write_job_csv
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+
+def git_revision():
+    """Returns the current commit of the repository, or None outside a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed(results, stage, items, func, *args, **kwargs):
+    """Runs func, records its wall time under stage and returns its result."""
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    results[stage] = {'seconds': round(seconds, 4), 'items': items, 'per_second': round(items / seconds, 2) if seconds else None}
+    print(f"{stage:>18}: {items:>7} items in {seconds:8.3f}s ({results[stage]['per_second'] or 0:,.1f}/s)")
+    return value
+
+
+def run(cvs, jobs, seed=0, workers=None):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Each run starts with an empty text cache and database
+        os.environ['CV_TEXT_CACHE'] = os.path.join(tmp, 'cv_text_cache.db')
+        from text_extraction import extract_text_from_cv
+        from database_setup import setup_database
+        from data_insertion import insert_job_descriptions_from_csv
+        from cv_extractor import process_cv_directory_incremental
+        from score_store import refresh_candidate_scores
+        from interview_scheduler import schedule_interviews_from_scores
+        from db import connect
+
+        cv_directory = os.path.join(tmp, 'cvs')
+        csv_file = os.path.join(tmp, 'job_description.csv')
+        cv_paths = timed(results, 'generate_cvs', cvs, write_cv_corpus, cv_directory, cvs, seed)
+        timed(results, 'generate_jobs', jobs, write_job_csv, csv_file, jobs, seed)
+
+        timed(results, 'extract_text', cvs, lambda: [extract_text_from_cv(path, use_cache=False) for path in cv_paths])
+
+        conn = connect(os.path.join(tmp, 'recruitment.db'))
+        setup_database(conn)
+        timed(results, 'ingest_jobs', jobs, insert_job_descriptions_from_csv, conn, csv_file)
+        timed(results, 'ingest_cvs', cvs, process_cv_directory_incremental, cv_directory, conn, workers=workers)
+        timed(results, 'score', cvs * jobs, refresh_candidate_scores, conn)
+        timed(results, 'rescore_noop', cvs * jobs, refresh_candidate_scores, conn)
+        scheduled = timed(results, 'schedule', cvs, schedule_interviews_from_scores, conn)
+        results['schedule']['scheduled'] = len(scheduled)
+        conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark on a synthetic corpus.")
+    parser.add_argument('--cvs', type=int, default=500, help="Number of synthetic CVs")
+    parser.add_argument('--jobs', type=int, default=20, help="Number of synthetic job descriptions")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help="Ingestion worker processes (default: every core)")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parameters': {'cvs': args.cvs, 'jobs': args.jobs, 'seed': args.seed, 'workers': args.workers},
+        'stages': run(args.cvs, args.jobs, args.seed, args.workers),
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# bench_extraction.py
+#
+# Compares the text extraction backends on the CVs in cvs/ (or another directory): time per CV,
+# and whether the text, and the fields parsed from it, match pdfplumber's output.
+#
+#     python benchmarks/bench_extraction.py [cv_directory] [repeats]
+
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from extraction_backends import available_backends, get_backend, PdfplumberBackend  # noqa: E402
+from section_parser import parse_cv  # noqa: E402
+
+CV_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'cvs')
+
+
+def extract(backend, data):
+    """Returns the whole text of a PDF and the number of pages re-read by the fallback backend."""
+    with backend.open(data) as document:
+        text = "\n".join(document.page_text(i) for i in range(len(document))).strip()
+        return text, getattr(document, "fallback_pages", 0)
+
+
+def run(cv_directory=CV_DIRECTORY, repeats=3):
+    paths = sorted(glob.glob(os.path.join(cv_directory, '*.pdf')))
+    if not paths:
+        print(f"No PDFs found in {cv_directory}")
+        return
+    pdfs = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            pdfs.append(f.read())
+
+    reference = [extract(PdfplumberBackend(), data)[0] for data in pdfs]
+    baseline = None
+    print(f"{len(pdfs)} CVs, best of {repeats} runs")
+    print(f"{'Backend':<22} {'ms/CV':>8} {'Speedup':>8} {'Same text':>10} {'Same fields':>12} {'Fallback pages':>15}")
+    for name in available_backends():
+        backend = get_backend(name)
+        best = float('inf')
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results = [extract(backend, data) for data in pdfs]
+            best = min(best, time.perf_counter() - start)
+        baseline = baseline or best  # pdfplumber is listed first
+        same_text = sum(text == expected for (text, _), expected in zip(results, reference))
+        same_fields = sum(parse_cv(text) == parse_cv(expected) for (text, _), expected in zip(results, reference))
+        fallback_pages = sum(pages for _, pages in results)
+        print(f"{backend.name:<22} {best / len(pdfs) * 1000:>8.2f} {baseline / best:>7.1f}x "
+              f"{same_text:>10} {same_fields:>12} {fallback_pages:>15}")
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else CV_DIRECTORY, int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -0,0 +1,76 @@
+# bench_job_loader.py
+#
+# Loads a large synthetic job description CSV (windows-1252, like the ATS exports) into SQLite, once
+# with pandas as database_setup used to, and once with the streaming job_description_loader, and
+# reports the time and peak memory of each. Each load runs in its own process so the peaks are
+# independent.
+#
+#     python benchmarks/bench_job_loader.py [jobs]
+
+import csv
+import os
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from corpus import ROLES, job_description
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+
+def write_csv(path, jobs):
+    """Writes jobs synthetic job descriptions, with a few windows-1252 apostrophes, to a CSV."""
+    rng = random.Random(0)
+    with open(path, "w", newline="", encoding="windows-1252") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Job Title", "Job Description"])
+        for i in range(jobs):
+            title = ROLES[i % len(ROLES)]
+            writer.writerow([title, job_description(rng, title).replace("Bachelor's", "Bachelor’s")])
+
+
+def load(method, csv_path, db_path):
+    """Loads csv_path into a fresh job_descriptions table with the given method."""
+    from bulk_loader import insert_job_descriptions
+    from job_description_loader import clean_job_description, iter_job_descriptions, parse_description
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE job_descriptions (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, description TEXT NOT NULL)')
+    if method == "pandas":
+        import pandas as pd
+        frame = pd.read_csv(csv_path, encoding='ISO-8859-1')
+        rows = []
+        for title, description in zip(frame['Job Title'], frame['Job Description']):
+            clean_job_description(description)  # The streaming loader cleans every description too
+            rows.append((title, parse_description(description)))
+    else:
+        rows = ((job.title, job.parsed) for job in iter_job_descriptions(csv_path))
+    count = len(insert_job_descriptions(conn, rows))
+    conn.close()
+    return count
+
+
+def run(jobs=200000):
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "job_description.csv")
+        write_csv(csv_path, jobs)
+        size = os.path.getsize(csv_path) / 1e6
+        print(f"{jobs} job descriptions, {size:.0f} MB")
+        for method in ("pandas", "streaming"):
+            output = subprocess.run([sys.executable, __file__, "--load", method, csv_path, os.path.join(directory, f"{method}.db")],
+                                    capture_output=True, text=True, check=True).stdout.split()
+            count, seconds, peak = int(output[0]), float(output[1]), float(output[2])
+            print(f"{method:>9}: {count} rows in {seconds:.1f}s ({size / seconds:.1f} MB/s), peak memory {peak:.0f} MB")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--load"]:
+        start = time.perf_counter()
+        loaded = load(*sys.argv[2:5])
+        # ru_maxrss is in KiB on Linux
+        print(loaded, time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
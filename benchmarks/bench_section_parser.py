@@ -0,0 +1,88 @@
+# bench_section_parser.py
+#
+# Compares the original multi-pass regex parsing of CVs and job descriptions with the single-pass
+# section parser, on CVs of growing size. Also checks that both give the same results.
+#
+#     python benchmarks/bench_section_parser.py [repeats]
+
+import os
+import random
+import re
+import sys
+import time
+
+from corpus import cv_lines, job_description, ROLES
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from section_parser import parse_cv, parse_job_sections  # noqa: E402
+
+
+def legacy_parse_cv(cv_text):
+    """The original parsing: an independent re.search per field, with patterns compiled per call."""
+    email = re.search(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', cv_text)
+    phone = re.search(r'\+?\d[\d -]{8,}\d', cv_text)
+    skills = re.search(r'Skills:\s*(.*?)(?=\n|$)', cv_text)
+    experience = re.search(r'Work Experience\s*(.*?)(?=Skills:|Certifications:|Achievements:|$)', cv_text, re.DOTALL)
+    title = re.search(r'Work Experience\s*(.*?)\s+at', cv_text, re.DOTALL)
+    return (email.group(0) if email else None, phone.group(0) if phone else None,
+            skills.group(1).strip() if skills else None, title.group(1).strip() if title else None,
+            experience.group(1).strip() if experience else None)
+
+
+def legacy_parse_job_sections(description):
+    """The original job description parsing: one lazy DOTALL scan per section."""
+    sections = {"Description": "", "Qualification": "", "Responsibilities": ""}
+    description_match = re.search(r'Description:\s*(.*?)(?=Qualification:|Responsibilities:|$)', description, re.DOTALL)
+    qualification_match = re.search(r'Qualification:\s*(.*?)(?=Responsibilities:|$)', description, re.DOTALL)
+    responsibilities_match = re.search(r'Responsibilities:\s*(.*?)(?=$)', description, re.DOTALL)
+    if description_match:
+        sections['Description'] = description_match.group(1).strip()
+    if qualification_match:
+        sections['Qualification'] = qualification_match.group(1).strip()
+    if responsibilities_match:
+        sections['Responsibilities'] = responsibilities_match.group(1).strip()
+    return sections
+
+
+def make_cv(rng, experience_entries):
+    """A CV whose Work Experience section is padded with experience_entries extra lines."""
+    lines = cv_lines(rng, "B000001")
+    position = lines.index("Work Experience") + 2
+    filler = [f"Delivered project {i} on time and on budget for a key client" for i in range(experience_entries)]
+    return "\n".join(lines[:position] + filler + lines[position:])
+
+
+def best_of(func, texts, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        parse_cv.cache_clear()  # Time parsing, not cache hits
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(repeats=5):
+    rng = random.Random(0)
+    new_cv = lambda text: tuple(parse_cv(text))  # noqa: E731
+    for entries in (0, 100, 1000, 10000):
+        texts = [make_cv(rng, entries) for _ in range(20)]
+        for text in texts:
+            assert legacy_parse_cv(text) == new_cv(text), "parsers disagree"
+        legacy = best_of(legacy_parse_cv, texts, repeats)
+        new = best_of(new_cv, texts, repeats)
+        size = sum(map(len, texts)) // len(texts)
+        print(f"CV of {size:>8} chars: legacy {legacy / len(texts) * 1e6:9.1f} us, single pass {new / len(texts) * 1e6:9.1f} us ({legacy / new:.1f}x)")
+
+    descriptions = [job_description(rng, rng.choice(ROLES)) for _ in range(200)]
+    for description in descriptions:
+        assert legacy_parse_job_sections(description) == parse_job_sections(description), "parsers disagree"
+    legacy = best_of(legacy_parse_job_sections, descriptions, repeats)
+    new = best_of(parse_job_sections, descriptions, repeats)
+    print(f"Job descriptions: legacy {legacy / len(descriptions) * 1e6:9.1f} us, single pass {new / len(descriptions) * 1e6:9.1f} us ({legacy / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
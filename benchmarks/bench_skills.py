@@ -0,0 +1,71 @@
+# bench_skills.py
+#
+# Times skill extraction with the Aho-Corasick matcher against a per-term substring scan, for
+# dictionaries of growing size (up to 10k terms), and checks that both find the same skills.
+#
+#     python benchmarks/bench_skills.py [cvs]
+
+import os
+import random
+import re
+import sys
+import time
+
+from corpus import cv_lines
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from skills_taxonomy import SKILLS, SkillMatcher, normalize, skill_id  # noqa: E402
+
+SYLLABLES = ["da", "ta", "flo", "ka", "zen", "ops", "net", "ly", "sys", "qu", "ix", "ro", "mo", "gra", "vi", "tex"]
+
+
+def make_taxonomy(terms, rng):
+    """SKILLS padded with made-up tools until it holds about the given number of terms."""
+    taxonomy = {name: list(synonyms) for name, synonyms in SKILLS.items()}
+    count = sum(1 + len(synonyms) for synonyms in taxonomy.values())
+    while count < terms:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        synonyms = [f"{name} {rng.choice(['cloud', 'studio', 'db', 'engine'])}"]
+        if name not in taxonomy:
+            taxonomy[name] = synonyms
+            count += 2
+    return taxonomy
+
+
+def naive_skills(taxonomy, text):
+    """One whole-word regex search per term: the cost grows with the number of terms."""
+    text = normalize(text)
+    found = set()
+    for name, synonyms in taxonomy.items():
+        for term in {normalize(term) for term in [name, *synonyms]}:
+            start = r'(?<!\w)' if re.match(r'\w', term[0]) else ''
+            end = r'(?!\w)' if re.match(r'\w', term[-1]) else ''
+            if term in text and re.search(start + re.escape(term) + end, text):
+                found.add(skill_id(name))
+                break
+    return found
+
+
+def run(cvs=50):
+    rng = random.Random(0)
+    texts = ["\n".join(cv_lines(rng, f"B{i:06d}")) for i in range(cvs)]
+    for terms in (200, 1000, 10000):
+        taxonomy = make_taxonomy(terms, rng)
+        start = time.perf_counter()
+        matcher = SkillMatcher(taxonomy)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fast = [matcher.skills(text) for text in texts]
+        automaton = time.perf_counter() - start
+        start = time.perf_counter()
+        slow = [naive_skills(taxonomy, text) for text in texts]
+        scan = time.perf_counter() - start
+        assert fast == slow, "matchers disagree"
+        print(f"{matcher.terms:>6} terms: build {build * 1000:7.1f} ms, Aho-Corasick {automaton / cvs * 1000:6.2f} ms/CV, "
+              f"per-term scan {scan / cvs * 1000:7.2f} ms/CV ({scan / automaton:.0f}x)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
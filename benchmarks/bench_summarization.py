@@ -0,0 +1,47 @@
+# bench_summarization.py
+#
+# Measures summarization throughput against the local Ollama stub at several concurrency levels.
+#
+#     python benchmarks/bench_summarization.py [descriptions] [latency_seconds]
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from job_description_summarizer import SummarizationService  # noqa: E402
+from ollama_model import OllamaModel  # noqa: E402
+from ollama_stub_server import start_stub_server  # noqa: E402
+
+
+def run(count, latency, concurrency_levels=(1, 4, 16)):
+    server = start_stub_server(latency=latency)
+    url = f"http://127.0.0.1:{server.server_port}"
+    descriptions = [f"Job {i}: Develop and maintain software, collaborate with teams, write clean code." for i in range(count)]
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for concurrency in concurrency_levels:
+                service = SummarizationService(cache_path=os.path.join(tmp, f"cache_{concurrency}.db"), concurrency=concurrency)
+                service.model = OllamaModel(service.model_name, base_url=url, pool_size=concurrency)
+
+                start = time.perf_counter()
+                service.summarize_many(descriptions)
+                cold = time.perf_counter() - start
+
+                start = time.perf_counter()
+                service.summarize_many(descriptions)  # Every summary is now cached
+                warm = time.perf_counter() - start
+
+                results[concurrency] = count / cold
+                print(f"concurrency {concurrency:>3}: {count / cold:8.1f} summaries/s cold, {count / warm:10.1f} summaries/s cached")
+                service.model.close()
+    finally:
+        server.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 64, float(sys.argv[2]) if len(sys.argv) > 2 else 0.05)
@@ -0,0 +1,158 @@
+# corpus.py
+#
+# Generates synthetic CV PDFs and job description CSVs for the benchmarks.
+#
+#     python benchmarks/corpus.py <output_dir> [cvs] [jobs] [seed]
+#
+# CVs follow the layout of the files in cvs/ ("Work Experience" / "<title> at <company>", a
+# "Skills: ..." line), so they exercise the same parsing paths as real uploads. The PDFs are written
+# by hand with the standard Helvetica font; no PDF library is needed.
+
+import csv
+import os
+import random
+import sys
+
+ROLES = [
+    "Software Engineer", "Data Scientist", "Product Manager", "Cloud Engineer", "Cybersecurity Analyst",
+    "Machine Learning Engineer", "DevOps Engineer", "Full Stack Developer", "Big Data Engineer", "AI Researcher",
+    "Database Administrator", "Network Engineer", "Software Architect", "Blockchain Developer",
+    "IT Project Manager", "Business Intelligence Analyst", "Robotics Engineer", "Embedded Systems Engineer",
+    "Quality Assurance Engineer", "UX/UI Designer",
+]
+SKILLS = [
+    "Python", "Java", "C++", "SQL", "JavaScript", "React", "Node.js", "Docker", "Kubernetes", "AWS", "Azure",
+    "GCP", "Terraform", "Spark", "Hadoop", "Kafka", "TensorFlow", "PyTorch", "scikit-learn", "Tableau",
+    "Power BI", "Linux", "Git", "CI/CD", "Selenium", "Figma", "Solidity", "ROS", "Embedded C", "Agile",
+    "Scrum", "Penetration Testing", "Network Security", "PostgreSQL", "MongoDB", "Redis", "GraphQL",
+]
+TASKS = [
+    "Designed and built {skill} services used by millions of customers.",
+    "Led the migration of legacy systems to {skill}, cutting costs by {pct}%.",
+    "Built predictive models with {skill} that improved decisions across teams.",
+    "Automated testing and deployment pipelines with {skill}.",
+    "Mentored junior engineers and introduced {skill} best practices.",
+    "Improved system performance by {pct}% through profiling and {skill} tuning.",
+]
+COMPANIES = ["ABC Inc.", "Globex", "Initech", "Umbrella Corp", "Stark Industries", "Wayne Enterprises", "Hooli", "Acme Ltd."]
+FIRST_NAMES = ["Alyssa", "Ben", "Chen", "Divya", "Emeka", "Farah", "Gabriel", "Hana", "Ivan", "Julia", "Kofi", "Lena"]
+LAST_NAMES = ["Chavez", "Smith", "Nguyen", "Patel", "Okafor", "Haddad", "Silva", "Kim", "Petrov", "Rossi", "Mensah", "Berg"]
+DEGREES = ["B.Sc. in Computer Science", "M.Sc. in Data Science", "B.Eng. in Electronics", "Diploma in Software Engineering"]
+
+LINES_PER_PAGE = 50
+
+
+def _escape(text):
+    """Escapes a line for a PDF string literal (the standard fonts only cover Latin-1)."""
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("latin-1", "replace")
+
+
+def make_pdf(lines):
+    """Returns the bytes of a minimal PDF showing the given lines of text, LINES_PER_PAGE per page."""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    font_id = 3 + 2 * len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % (3 + 2 * i) for i in range(len(pages)))
+        + b"] /Count %d >>" % len(pages),
+    ]
+    for i, page in enumerate(pages):
+        stream = b"BT /F1 10 Tf 14 TL 50 780 Td " + b"".join(b"(" + _escape(line) + b") Tj T* " for line in page) + b"ET"
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (4 + 2 * i, font_id))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def cv_lines(rng, candidate_id):
+    """Returns the text lines of one synthetic CV."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    skills = rng.sample(SKILLS, rng.randint(4, 8))
+    lines = [
+        f"Candidate Resume (ID: {candidate_id})",
+        f"Name: {first} {last}",
+        f"Email: {first.lower()}{last.lower()}{rng.randint(1, 99)}@example.com",
+        f"Phone: +1-{rng.randint(200, 999)}-{rng.randint(1000000, 9999999)}",
+        "Education",
+        f"{rng.choice(DEGREES)} ({rng.randint(2005, 2015)}-{rng.randint(2016, 2020)})",
+        "Work Experience",
+    ]
+    year = 2023
+    for _ in range(rng.randint(1, 3)):
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)} ({start}-{year})")
+        for task in rng.sample(TASKS, 2):
+            lines.append(task.format(skill=rng.choice(skills), pct=rng.randint(10, 60)))
+        year = start
+    lines += [
+        f"Skills: {', '.join(skills)}",
+        "Certifications",
+        f"{rng.choice(['AWS Certified Solutions Architect', 'PMP', 'CISSP', 'CKA'])} - Validated expertise in {rng.choice(skills)}.",
+        "Achievements",
+        f"Delivered {rng.randint(3, 20)} production projects using {rng.choice(skills)}.",
+    ]
+    return lines
+
+
+def job_description(rng, title):
+    """Returns a synthetic job description in the layout of job_description.csv."""
+    skills = rng.sample(SKILLS, 5)
+    return (
+        f" Description:\nWe are seeking a skilled {title} to join our team and work with {skills[0]} and {skills[1]}.\n\n"
+        "Responsibilities:\n\n"
+        + "\n".join(task.format(skill=skill, pct=rng.randint(10, 60)) for task, skill in zip(rng.sample(TASKS, 3), skills))
+        + "\nQualifications:\n\n"
+        f"Bachelor's degree in Computer Science or a related field.\n"
+        f"Proficiency in {', '.join(skills[2:])}.\n"
+        "Strong problem-solving skills and attention to detail."
+    )
+
+
+def write_cv_corpus(directory, count, seed=0):
+    """Writes count synthetic CV PDFs into directory and returns their paths."""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        candidate_id = f"S{i:06d}"
+        path = os.path.join(directory, f"{candidate_id}.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(cv_lines(rng, candidate_id)))
+        paths.append(path)
+    return paths
+
+
+def write_job_csv(path, count, seed=0):
+    """Writes count synthetic job descriptions to a CSV with the columns of job_description.csv."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Job Title", "Job Description"])
+        for i in range(count):
+            title = ROLES[i % len(ROLES)]
+            if i >= len(ROLES):
+                title = f"{rng.choice(['Senior', 'Lead', 'Junior', 'Staff', 'Principal'])} {title}"
+            writer.writerow([title, job_description(rng, title)])
+    return path
+
+
+if __name__ == "__main__":
+    output = sys.argv[1]
+    cvs = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    jobs = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    write_cv_corpus(os.path.join(output, "cvs"), cvs, seed)
+    write_job_csv(os.path.join(output, "job_description.csv"), jobs, seed)
+    print(f"Wrote {cvs} CVs and {jobs} job descriptions to {output}")
@@ -0,0 +1,74 @@
+# bulk_loader.py
+
+from contextlib import nullcontext
+
+from metrics import counter, timer
+
+# Number of rows written per transaction
+BATCH_SIZE = 500
+
+
+def configure_for_bulk_load(conn):
+    """
+    Applies SQLite pragmas suited to large load jobs.
+
+    WAL lets readers keep working while the load runs, and synchronous=NORMAL only syncs at
+    checkpoints instead of on every commit.
+    """
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-64000')  # 64 MB page cache
+
+
+def _insert_batch(conn, sql, batch, commit=True):
+    """Inserts one batch inside a single transaction (or the caller's) and returns the ids assigned to its rows."""
+    # executemany cannot return rows, so each row is its own INSERT ... RETURNING; the single
+    # transaction per batch is what saves the time, and ids are read back instead of assumed
+    with conn if commit else nullcontext():
+        return [conn.execute(sql, row).fetchone()[0] for row in batch]
+
+
+def bulk_insert(conn, table, columns, rows, batch_size=BATCH_SIZE, commit=True):
+    """
+    Inserts rows in batches, committing once per batch instead of once per row.
+
+    Args:
+        conn (Connection): The database connection.
+        table (str): The table to insert into.
+        columns (list): The column names, in the order the row values are given.
+        rows (iterable): Tuples of values. May be a generator; it is consumed one batch at a time.
+        batch_size (int): Number of rows written per transaction.
+        commit (bool): Commit each batch. False leaves every batch in the transaction the caller
+            already holds (e.g. one opened with BEGIN IMMEDIATE) for the caller to commit.
+
+    Returns:
+        list: The ids assigned to the inserted rows, in input order.
+    """
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) RETURNING id"
+    write_time = timer("db_write_seconds", "Time spent in database write transactions")
+    rows_written = counter("db_rows_written_total", "Rows written to the database")
+    ids = []
+    batch = []
+    for row in rows:
+        batch.append(tuple(row))
+        if len(batch) >= batch_size:
+            with write_time.time(table=table):
+                ids.extend(_insert_batch(conn, sql, batch, commit))
+            rows_written.inc(len(batch), table=table)
+            batch = []
+    if batch:
+        with write_time.time(table=table):
+            ids.extend(_insert_batch(conn, sql, batch, commit))
+        rows_written.inc(len(batch), table=table)
+    return ids
+
+
+def insert_candidates(conn, candidates, batch_size=BATCH_SIZE):
+    """Bulk inserts (name, email, phone, skills) tuples into the candidates table."""
+    return bulk_insert(conn, 'candidates', ['name', 'email', 'phone', 'skills'], candidates, batch_size)
+
+
+def insert_job_descriptions(conn, job_descriptions, batch_size=BATCH_SIZE):
+    """Bulk inserts (title, description) tuples into the job_descriptions table."""
+    return bulk_insert(conn, 'job_descriptions', ['title', 'description'], job_descriptions, batch_size)
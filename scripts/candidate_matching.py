@@ -1,69 +1,272 @@
-import sqlite3
 import pandas as pd
-import pdfplumber
-import re
+import numpy as np
 import os
-
-def create_connection(db_file):
-    """Create a database connection to the SQLite database specified by db_file."""
-    conn = None
-    try:
-        conn = sqlite3.connect(db_file)
-        print("Connection established.")
-    except sqlite3.Error as e:
-        print(f"Error connecting to database: {e}")
-    return conn
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from text_extraction import extract_text_until  # Shared, cached PDF text extraction
+from matching_engine import CandidateIndex, TOKEN_PATTERN
+from db import DB_PATH, create_connection
+from section_parser import parse_cv, has_cv_fields
+from skills_taxonomy import extract_skills
+from title_index import TitleIndex, SIMILARITY_THRESHOLD
+from embedding_matcher import EmbeddingScorer
+from metrics import timed, print_summary
 
 def load_job_descriptions(conn):
     """Loads job descriptions from the database."""
     query = "SELECT * FROM job_descriptions"
     return pd.read_sql_query(query, conn)
 
-def extract_text_from_cv(cv_file):
-    """Extracts text from a CV (PDF file)."""
-    extracted_text = ""
-    try:
-        with pdfplumber.open(cv_file) as pdf:
-            for page in pdf.pages:
-                extracted_text += page.extract_text() + "\n"
-    except Exception as e:
-        print(f"Error extracting text from CV {cv_file}: {e}")
-    
-    return extracted_text.strip()
-
 def extract_job_description_from_cv(cv_text):
     """Extracts the job description from the CV text."""
-    job_description_match = re.search(r'Work Experience\s*(.*?)(?=Skills:|Certifications:|Achievements:|$)', cv_text, re.DOTALL)
-    if job_description_match:
-        return job_description_match.group(1).strip()
-    return ""
+    # The Work Experience section, up to Skills:, Certifications: or Achievements:
+    return parse_cv(cv_text).work_experience or ""
 
 def extract_job_title_from_cv(cv_text):
     """Extracts the job title from the CV text."""
-    job_title_match = re.search(r'Work Experience\s*(.*?)\s+at', cv_text, re.DOTALL)
-    if job_title_match:
-        return job_title_match.group(1).strip()
-    return ""
+    # The text between "Work Experience" and the first " at"
+    return parse_cv(cv_text).job_title or ""
+
+def has_title_and_experience(cv_text):
+    """Returns True once the CV text read so far holds the job title and the whole Work Experience section."""
+    return has_cv_fields(cv_text, ("job_title", "work_experience"))
+
+def keyword_score(job_description, cv_text):
+    """Counts the words of the job description that appear in the CV text."""
+    cv_text_lower = cv_text.lower()
+    keywords = TOKEN_PATTERN.findall(job_description.lower())
+    return sum(1 for keyword in keywords if keyword in cv_text_lower)
+
+def build_job_title_index(job_titles, threshold=SIMILARITY_THRESHOLD):
+    """Indexes job titles by their position in job_titles, so a CV title resolves to its jobs in one lookup."""
+    index = TitleIndex(threshold)
+    for position, title in enumerate(job_titles):
+        index.add(position, title)
+    return index
+
+def candidates_by_job(job_titles, cv_titles, threshold=SIMILARITY_THRESHOLD):
+    """
+    Applies the job title gate: a CV only matches jobs whose title is similar to the CV's job title
+    (see title_index), e.g. "Sr. Software Engineer" for "Software Engineer".
+
+    Args:
+        job_titles (list): Job titles, one per job.
+        cv_titles (dict): Maps candidate id to the job title found in the CV.
+        threshold (float): Trigram similarity (0-1) a CV title must exceed.
+
+    Returns:
+        list: One set of candidate ids per job, those that pass the job's title gate.
+    """
+    index = build_job_title_index(job_titles, threshold)
+    eligible = [set() for _ in job_titles]
+    for candidate_id, title in cv_titles.items():
+        for position in index.keys(title):
+            eligible[position].add(candidate_id)
+    return eligible
+
+def title_mask(job_titles, cv_titles, threshold=SIMILARITY_THRESHOLD):
+    """
+    Returns the job title gate as a jobs x CVs csr_matrix: 1 where the CV passes the job's title gate
+    (see candidates_by_job), 0 elsewhere.
+
+    Args:
+        job_titles (list): Job titles, one per job.
+        cv_titles (list): The job title found in each CV, one per CV.
+    """
+    eligible = candidates_by_job(job_titles, dict(enumerate(cv_titles)), threshold)
+    rows = [row for row, columns in enumerate(eligible) for _ in columns]
+    columns = [column for columns in eligible for column in columns]
+    return sparse.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(len(job_titles), len(cv_titles)))
+
+def build_candidate_index(cv_files):
+    """
+    Builds an inverted index over the work experience section of every CV.
+
+    Args:
+        cv_files (dict): Maps candidate name to the CV path or file object.
+
+    Returns:
+        tuple: (CandidateIndex, cv_titles), where cv_titles maps candidate name to the job title found in the CV.
+    """
+    index = CandidateIndex()
+    cv_titles = {}
+    for candidate_name, cv_file in cv_files.items():
+        cv_text = extract_text_until(cv_file, has_title_and_experience)
+        index.add_candidate(candidate_name, extract_job_description_from_cv(cv_text))
+        cv_titles[candidate_name] = extract_job_title_from_cv(cv_text)
+    return index, cv_titles
+
+@timed("scoring_seconds", "Time spent scoring CVs against jobs", method="tfidf_batch")
+def compute_score_matrix(job_texts, cv_texts, top_k=None):
+    """
+    Scores every job against every CV in one batch using TF-IDF cosine similarity.
+
+    Args:
+        job_texts (list): Job description texts, one per job.
+        cv_texts (list): CV texts, one per candidate.
+        top_k (int): If given, only the top_k scores per job are kept.
+
+    Returns:
+        scipy.sparse.csr_matrix: A jobs x candidates matrix of scores between 0 and 100.
+    """
+    vectorizer = TfidfVectorizer(token_pattern=r'\b\w+\b', sublinear_tf=True)
+    vectorizer.fit(list(job_texts) + list(cv_texts))
+    job_matrix = vectorizer.transform(job_texts)
+    cv_matrix = vectorizer.transform(cv_texts)
+
+    # Rows are L2-normalised, so a single sparse product gives the cosine similarity of every pair
+    scores = (job_matrix @ cv_matrix.T).tocsr() * 100
+    return keep_top_k(scores, top_k)
+
+def keep_top_k(scores, top_k):
+    """Zeroes all but the top_k scores of each row of a jobs x CVs csr_matrix, in place, and returns it."""
+    if top_k is not None:
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            if end - start > top_k:
+                row_data = scores.data[start:end]
+                row_data[np.argpartition(row_data, -top_k)[:-top_k]] = 0
+        scores.eliminate_zeros()
+    return scores
+
+class JobScorer:
+    """
+    Scores one CV at a time against every job, for callers that cannot wait for the whole CV corpus.
 
-def match_candidate(cv_file, job):
-    """Calculates the matching score for a candidate's CV against a job description."""
-    cv_text = extract_text_from_cv(cv_file)
-    job_title_from_cv = extract_job_title_from_cv(cv_text)
+    The TF-IDF vocabulary and weights are fitted on the job descriptions alone, so scores are close to,
+    but not identical to, those of compute_score_matrix.
+    """
 
-    if job_title_from_cv.lower() != job['title'].lower():
-        return 0  # No match if job titles do not match
+    def __init__(self, job_texts):
+        self.vectorizer = TfidfVectorizer(token_pattern=r'\b\w+\b', sublinear_tf=True)
+        self.job_matrix = self.vectorizer.fit_transform(job_texts)
 
-    job_description_from_cv = extract_job_description_from_cv(cv_text)
-    job_description = job['description'].lower()
-    cv_text_lower = job_description_from_cv.lower()
+    @timed("scoring_seconds", "Time spent scoring CVs against jobs", method="tfidf")
+    def score_cvs(self, cv_texts):
+        """
+        Scores a batch of CVs against every job.
 
-    keywords = re.findall(r'\b\w+\b', job_description)
-    score = sum(1 for keyword in keywords if keyword in cv_text_lower)
+        Returns:
+            scipy.sparse.csr_matrix: A jobs x CVs matrix of scores between 0 and 100.
+        """
+        return (self.job_matrix @ self.vectorizer.transform(cv_texts).T).tocsr() * 100
 
-    return score
+    def score_cv(self, cv_text, threshold=0):
+        """
+        Scores a single CV against every job.
+
+        Returns:
+            list: (job_index, score) tuples with score above threshold, sorted by descending score.
+        """
+        scores = self.score_cvs([cv_text]).toarray().ravel()
+        rows = np.flatnonzero(scores > threshold)
+        return sorted(zip(rows.tolist(), scores[rows].round(2).tolist()), key=lambda item: (-item[1], item[0]))
+
+def skill_incidence(skill_sets, vocabulary):
+    """Returns a binary sparse matrix with one row per skill set and one column per skill of the vocabulary."""
+    rows, columns = [], []
+    for row, skills in enumerate(skill_sets):
+        for skill in skills:
+            column = vocabulary.get(skill)
+            if column is not None:
+                rows.append(row)
+                columns.append(column)
+    return sparse.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(len(skill_sets), len(vocabulary)))
+
+class SkillScorer:
+    """
+    Scores CVs by skill-set overlap: the share of a job's skills that the CV mentions, from 0 to 100.
+
+    Skills are found with the skills taxonomy in one pass over each text, so synonyms count as the
+    same skill ("k8s" and "Kubernetes") and the cost does not grow with the number of job keywords.
+    """
+
+    def __init__(self, job_texts=None, job_skills=None):
+        """
+        Args:
+            job_texts (list): Job description texts, one per job.
+            job_skills (list): Precomputed skill id collections, one per job, instead of job_texts.
+        """
+        self.job_skills = [set(skills) for skills in job_skills] if job_skills is not None else \
+            [set(extract_skills(text)) for text in job_texts]
+        self.vocabulary = {skill: i for i, skill in enumerate(sorted(set().union(*self.job_skills)))}
+        self.job_matrix = skill_incidence(self.job_skills, self.vocabulary)
+        # Each job's overlap count is divided by its number of skills; jobs without skills score 0
+        counts = np.array([len(skills) for skills in self.job_skills], dtype=float)
+        self.job_weights = sparse.diags(np.divide(100, counts, out=np.zeros_like(counts), where=counts > 0))
+
+    @timed("scoring_seconds", "Time spent scoring CVs against jobs", method="skills")
+    def score_cvs(self, cv_texts=None, cv_skills=None):
+        """
+        Scores a batch of CVs against every job.
+
+        Args:
+            cv_texts (list): CV texts.
+            cv_skills (list): Precomputed skill id collections, one per CV, instead of cv_texts.
+
+        Returns:
+            scipy.sparse.csr_matrix: A jobs x CVs matrix of scores between 0 and 100.
+        """
+        if cv_skills is None:
+            cv_skills = [extract_skills(text) for text in cv_texts]
+        cv_matrix = skill_incidence(cv_skills, self.vocabulary)
+        return (self.job_weights @ (self.job_matrix @ cv_matrix.T)).tocsr()
+
+    def score_cv(self, cv_text, threshold=0):
+        """
+        Scores a single CV against every job.
+
+        Returns:
+            list: (job_index, score) tuples with score above threshold, sorted by descending score.
+        """
+        scores = self.score_cvs([cv_text]).toarray().ravel()
+        rows = np.flatnonzero(scores > threshold)
+        return sorted(zip(rows.tolist(), scores[rows].round(2).tolist()), key=lambda item: (-item[1], item[0]))
+
+# Ways to score CVs against jobs; each gives scores between 0 and 100
+SCORING_METHODS = ('tfidf', 'skills', 'embedding')
+
+def make_scorer(job_texts, method='tfidf'):
+    """Returns the scorer for a scoring method: a JobScorer, SkillScorer or EmbeddingScorer over the jobs."""
+    if method == 'tfidf':
+        return JobScorer(job_texts)
+    if method == 'skills':
+        return SkillScorer(job_texts)
+    if method == 'embedding':
+        return EmbeddingScorer(job_texts)
+    raise ValueError(f"Unknown scoring method: {method}")
+
+def compute_scores(job_texts, cv_texts, method='tfidf', top_k=None, mask=None):
+    """
+    Scores every job against every CV in one batch with the given scoring method.
+
+    Args:
+        job_texts (list): Job description texts, one per job.
+        cv_texts (list): CV texts, one per candidate.
+        method (str): One of SCORING_METHODS.
+        top_k (int): If given, only the top_k scores per job are kept.
+        mask (csr_matrix): If given, a jobs x candidates 0/1 matrix such as title_mask; pairs outside
+            it score 0, and top_k is taken among the pairs inside it.
+
+    Returns:
+        scipy.sparse.csr_matrix: A jobs x candidates matrix of scores between 0 and 100.
+    """
+    if method == 'embedding':
+        # Each job's top_k CVs come from the embedding store's nearest-neighbour search
+        return EmbeddingScorer(job_texts, top_k=top_k).score_cvs(cv_texts, mask=mask)
+    if mask is None:
+        if method == 'tfidf':
+            return compute_score_matrix(job_texts, cv_texts, top_k=top_k)
+        return keep_top_k(make_scorer(job_texts, method).score_cvs(cv_texts), top_k)
+
+    scores = compute_score_matrix(job_texts, cv_texts) if method == 'tfidf' else \
+        make_scorer(job_texts, method).score_cvs(cv_texts)
+    scores = scores.multiply(mask).tocsr()
+    scores.eliminate_zeros()
+    return keep_top_k(scores, top_k)
 
 def main():
-    database = r"C:\Users\Nandini\Desktop\Job Screening AI\data\recruitment.db"
+    database = DB_PATH
     cv_directory = r"C:\Users\Nandini\Desktop\Job Screening AI\data\cv"
 
     conn = create_connection(database)
@@ -71,20 +274,21 @@ def main():
     if conn:
         job_descriptions = load_job_descriptions(conn)
 
-        for index, job in job_descriptions.iterrows():
+        # Parse every CV once; the file name is assumed to be the candidate's name
+        cv_files = {cv_file[:-4]: os.path.join(cv_directory, cv_file)
+                    for cv_file in os.listdir(cv_directory) if cv_file.endswith('.pdf')}
+        candidate_index, cv_titles = build_candidate_index(cv_files)
+        # Each CV title is looked up once in the job title index, instead of comparing it with every job
+        eligible = candidates_by_job(job_descriptions['title'].tolist(), cv_titles)
+
+        for row, (_, job) in enumerate(job_descriptions.iterrows()):
             job_title = job['title']
-            
-            for cv_file in os.listdir(cv_directory):
-                if cv_file.endswith('.pdf'):
-                    cv_path = os.path.join(cv_directory, cv_file)
-                    matching_score = match_candidate(cv_path, job)
-                    
-                    candidate_name = cv_file[:-4]  # Assuming the file name is the candidate's name
-                    
-                    if matching_score > 0:
-                        print(f"Candidate: {candidate_name} | Job Title: {job_title} | Matching Score: {matching_score}")
+
+            for candidate_name, matching_score in candidate_index.score_job(job['description'], candidates=eligible[row]):
+                print(f"Candidate: {candidate_name} | Job Title: {job_title} | Matching Score: {matching_score}")
 
         conn.close()
+        print_summary()
     else:
         print("Failed to create a database connection.")
 
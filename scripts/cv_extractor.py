@@ -1,21 +1,28 @@
-import sqlite3
-import pdfplumber
 import os
 import logging
-import re
+import queue
+import threading
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from text_extraction import extract_text_until  # Shared, cached PDF text extraction
+from bulk_loader import configure_for_bulk_load, insert_candidates, BATCH_SIZE
+from database_setup import migrate_schema
+from score_store import refresh_candidate_scores
+from db import DB_PATH, create_connection
+from section_parser import parse_cv, has_cv_fields
+from dedup import minhash, link_duplicates, release_duplicates
+from metrics import REGISTRY, timed, print_summary, reset as reset_metrics
 
 # Set up logging
 logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def create_connection(db_file):
-    """Create a database connection to the SQLite database specified by db_file."""
-    conn = None
-    try:
-        conn = sqlite3.connect(db_file)
-        logging.info("Connection established.")
-    except sqlite3.Error as e:
-        logging.error(f"Error connecting to database: {e}")
-    return conn
+# Parallel ingestion settings
+WORKERS = None  # Number of worker processes (None uses every CPU core)
+QUEUE_SIZE = 256  # Maximum number of parsed CVs waiting to be written to the database; 0 or less for no limit
+STOP_POLL_INTERVAL = 0.5  # Seconds the feeder waits on a full queue before checking whether the writer gave up
+INCREMENTAL = True  # Only process CVs that are new or changed since the last run
+CANDIDATE_FIELDS = ("email", "phone", "skills")  # Fields read by parse_cv_text; later CV pages are skipped
 
 def insert_candidate(conn, name, email, phone, skills):
     """Insert a new candidate into the candidates table."""
@@ -25,63 +32,305 @@ def insert_candidate(conn, name, email, phone, skills):
     conn.commit()
     return cur.lastrowid
 
-def extract_text_from_cv(pdf_path):
-    """Extracts text from a CV (PDF file)."""
-    extracted_text = ""
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                extracted_text += page.extract_text() + "\n"
-    except Exception as e:
-        logging.error(f"Error extracting text from CV {pdf_path}: {e}")
-    
-    return extracted_text.strip()
-
+@timed("regex_parse_seconds", "Time spent parsing sections out of CV and job description text", kind="cv")
 def parse_cv_text(cv_text):
     """Parse the CV text to extract candidate information."""
-    # Example regex patterns for extracting email, phone, and skills
-    email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    phone_pattern = r'\+?\d[\d -]{8,}\d'  # Adjust this pattern based on expected phone formats
-    skills_pattern = r'Skills:\s*(.*?)(?=\n|$)'  # Adjust based on your CV format
-
-    email = re.search(email_pattern, cv_text)
-    phone = re.search(phone_pattern, cv_text)
-    skills = re.search(skills_pattern, cv_text)
+    # Email, phone and the "Skills:" line come from one pass of the shared section parser
+    record = parse_cv(cv_text)
 
     return {
-        "email": email.group(0) if email else "N/A",
-        "phone": phone.group(0) if phone else "N/A",
-        "skills": skills.group(1).strip() if skills else "N/A"
+        "email": record.email if record.email is not None else "N/A",
+        "phone": record.phone if record.phone is not None else "N/A",
+        "skills": record.skills if record.skills is not None else "N/A"
     }
 
+def has_candidate_fields(cv_text):
+    """Returns True once the CV text read so far holds every field parse_cv_text needs."""
+    return has_cv_fields(cv_text, CANDIDATE_FIELDS)
+
 def process_cv_directory(cv_directory, conn):
     """Processes all CVs in the specified directory and inserts candidate data into the database."""
-    for cv_file in os.listdir(cv_directory):
-        if cv_file.endswith('.pdf'):
+    migrate_schema(conn)
+    cv_files = [cv_file for cv_file in os.listdir(cv_directory) if cv_file.endswith('.pdf')]
+    parsed = []
+
+    def candidates():
+        for cv_file in cv_files:
             cv_path = os.path.join(cv_directory, cv_file)
-            cv_text = extract_text_from_cv(cv_path)
+            cv_text = extract_text_until(cv_path, has_candidate_fields)
 
             # Parse the CV text to extract candidate information
             candidate_info = parse_cv_text(cv_text)
+            candidate_info['signature'] = minhash(cv_text)
+            parsed.append(candidate_info)
             name = cv_file[:-4]  # Assuming the file name is the candidate's name
-            email = candidate_info['email']
-            phone = candidate_info['phone']
-            skills = candidate_info['skills']
-
-            candidate_id = insert_candidate(conn, name, email, phone, skills)
-            # Print the desired output
             print(f"Processing CV: {cv_file}")
-            print(f"Inserted candidate with ID: {candidate_id}")
+            yield (name, candidate_info['email'], candidate_info['phone'], candidate_info['skills'])
+
+    # Candidates are written in batches rather than one commit per CV
+    candidate_ids = insert_candidates(conn, candidates())
+    for cv_file, candidate_id in zip(cv_files, candidate_ids):
+        print(f"Inserted candidate {cv_file[:-4]} with ID: {candidate_id}")
+    _link_duplicates(conn, zip(candidate_ids, parsed))
+
+def _link_duplicates(conn, candidates):
+    """Links newly written candidates, given as (candidate_id, parsed CV) pairs, to the candidates they duplicate."""
+    duplicates = link_duplicates(conn, [(candidate_id, info['signature'], info['email'], info['phone'])
+                                        for candidate_id, info in candidates])
+    for candidate_id, original_id, reason in duplicates:
+        logging.info(f"Candidate {candidate_id} duplicates candidate {original_id} (same {reason})")
+    return duplicates
+
+def extract_candidate(cv_path):
+    """
+    Extracts and parses a single CV and computes its MinHash signature. Runs inside a worker process during parallel ingestion.
+
+    Raises the read or parser error of a CV that cannot be extracted, so it is skipped rather than
+    stored as a candidate without details.
+    """
+    cv_text = extract_text_until(cv_path, has_candidate_fields, raise_errors=True)
+    candidate_info = parse_cv_text(cv_text)
+    candidate_info['signature'] = minhash(cv_text)
+    return cv_path, candidate_info
+
+def _extract_candidate_in_worker(cv_path):
+    """Runs extract_candidate in a worker process and hands its metrics back to the parent."""
+    return extract_candidate(cv_path), REGISTRY.drain()
+
+def _put_result(results, item, stop):
+    """Puts item on the results queue, waiting while it is full; returns False if stop was set first."""
+    while not stop.is_set():
+        try:
+            results.put(item, timeout=STOP_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _feed_results(cv_paths, workers, results, stop):
+    """
+    Fans CVs out over a process pool and pushes parsed candidates onto the results queue.
+
+    Stops submitting CVs, and cancels those not started yet, once stop is set, i.e. once the
+    writer has given up and nothing drains the queue any more.
+    """
+    # Keep at most queue size CVs in flight so memory stays bounded; an unbounded queue sets no limit
+    in_flight = results.maxsize if results.maxsize > 0 else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=reset_metrics) as executor:
+            pending = set()
+            paths = iter(cv_paths)
+            while not stop.is_set():
+                for cv_path in paths:
+                    pending.add(executor.submit(_extract_candidate_in_worker, cv_path))
+                    if in_flight is not None and len(pending) >= in_flight:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        result, worker_metrics = future.result()
+                        REGISTRY.merge(worker_metrics)
+                    except Exception as e:
+                        logging.error(f"Error processing CV: {e}")
+                        continue
+                    if not _put_result(results, result, stop):  # Blocks while the writer is behind
+                        break
+            for future in pending:
+                future.cancel()
+    finally:
+        _put_result(results, None, stop)  # Tell the writer there is nothing left
+
+def process_cv_directory_parallel(cv_directory, conn, workers=WORKERS, queue_size=QUEUE_SIZE):
+    """
+    Processes all CVs in the specified directory using a pool of worker processes.
+
+    PDF extraction and parsing run in parallel, while this thread is the single writer that
+    inserts the parsed candidates into the database as they arrive.
+
+    Args:
+        cv_directory (str): The directory containing CVs.
+        conn (Connection): The database connection.
+        workers (int): Number of worker processes (None uses every CPU core).
+        queue_size (int): Maximum number of parsed CVs buffered between the workers and the writer;
+            0 or less for no limit.
+
+    Returns:
+        int: The number of candidates inserted.
+    """
+    migrate_schema(conn)
+    cv_paths = [os.path.join(cv_directory, cv_file) for cv_file in os.listdir(cv_directory) if cv_file.endswith('.pdf')]
+    results = queue.Queue(maxsize=queue_size)
+    parsed = []
+    start_time = time.perf_counter()
+
+    stop = threading.Event()
+    feeder = threading.Thread(target=_feed_results, args=(cv_paths, workers, results, stop), name="cv-feeder", daemon=True)
+    feeder.start()
+
+    def candidates():
+        while True:
+            result = results.get()
+            if result is None:
+                return
+            cv_path, candidate_info = result
+            parsed.append(candidate_info)
+            name = os.path.basename(cv_path)[:-4]  # Assuming the file name is the candidate's name
+            yield (name, candidate_info['email'], candidate_info['phone'], candidate_info['skills'])
+
+    # The writer drains the queue in batches, one transaction per batch
+    try:
+        candidate_ids = insert_candidates(conn, candidates())
+    finally:
+        stop.set()  # If the writer failed, the feeder must not wait on the full queue forever
+        feeder.join()
+    processed = len(candidate_ids)
+
+    _link_duplicates(conn, zip(candidate_ids, parsed))
+    elapsed = time.perf_counter() - start_time
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    print(f"Processed {processed} CVs in {elapsed:.2f}s ({rate:.1f} CVs/s)")
+    return processed
+
+def hash_file(path):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def find_changed_cvs(cv_directory, conn):
+    """
+    Compares the CVs in a directory with the cv_files table.
+
+    Files whose size and mtime are unchanged are skipped without being read. Files whose size or
+    mtime changed are hashed, and only count as modified if their content hash changed too.
+
+    Returns:
+        tuple: (changed, deleted) where changed maps each new or modified CV path to
+        (size, mtime, content_hash, candidate_id or None) and deleted lists paths no longer on disk.
+    """
+    known = {row[0]: row[1:] for row in conn.execute(
+        'SELECT path, size, mtime, content_hash, candidate_id, deleted FROM cv_files')}
+
+    changed = {}
+    touched = []
+    seen = set()
+    with os.scandir(cv_directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.pdf') or not entry.is_file():
+                continue
+            cv_path = entry.path
+            stat = entry.stat()
+            seen.add(cv_path)
+
+            record = known.get(cv_path)
+            if record and not record[4] and record[0] == stat.st_size and record[1] == stat.st_mtime:
+                continue  # Unchanged since the last run
+
+            content_hash = hash_file(cv_path)
+            candidate_id = record[3] if record else None
+            if record and record[2] == content_hash:
+                touched.append((stat.st_size, stat.st_mtime, cv_path))  # Same content, only the metadata moved
+            else:
+                changed[cv_path] = (stat.st_size, stat.st_mtime, content_hash, candidate_id)
+
+    deleted = [path for path, record in known.items() if path not in seen and not record[4]]
+
+    with conn:
+        conn.executemany('UPDATE cv_files SET size = ?, mtime = ?, deleted = 0 WHERE path = ?', touched)
+    return changed, deleted
+
+def _record_batch(conn, batch, changed):
+    """
+    Writes a batch of parsed CVs: new CVs become candidates, modified CVs update their candidate.
+
+    Each CV is then linked to the earlier candidate it duplicates, if any.
+    """
+    new = [(cv_path, info) for cv_path, info in batch if changed[cv_path][3] is None]
+    new_ids = insert_candidates(conn, [(os.path.basename(cv_path)[:-4], info['email'], info['phone'], info['skills'])
+                                       for cv_path, info in new])
+    candidate_ids = dict(zip((cv_path for cv_path, _ in new), new_ids))
+
+    with conn:
+        conn.executemany('UPDATE candidates SET email = ?, phone = ?, skills = ? WHERE id = ?',
+                         [(info['email'], info['phone'], info['skills'], changed[cv_path][3])
+                          for cv_path, info in batch if changed[cv_path][3] is not None])
+        conn.executemany('''INSERT OR REPLACE INTO cv_files(path, size, mtime, content_hash, candidate_id, deleted)
+                            VALUES(?, ?, ?, ?, ?, 0)''',
+                         [(cv_path, *changed[cv_path][:3], candidate_ids.get(cv_path, changed[cv_path][3]))
+                          for cv_path, _ in batch])
+    _link_duplicates(conn, [(candidate_ids.get(cv_path, changed[cv_path][3]), info) for cv_path, info in batch])
+
+def process_cv_directory_incremental(cv_directory, conn, workers=WORKERS, queue_size=QUEUE_SIZE):
+    """
+    Processes only the CVs that are new or modified since the last run and marks deleted ones.
+
+    New CVs are inserted as candidates, modified CVs update the candidate they were linked to,
+    and CVs that disappeared from the directory are flagged as deleted in the cv_files table.
+    CVs that duplicate an earlier candidate are linked to it through candidates.duplicate_of.
+    CVs whose text cannot be extracted are skipped and left out of cv_files, so the next run
+    tries them again.
+
+    Returns:
+        tuple: (processed, deleted) counts.
+    """
+    migrate_schema(conn)
+    start_time = time.perf_counter()
+    changed, deleted = find_changed_cvs(cv_directory, conn)
+
+    with conn:
+        conn.executemany('UPDATE cv_files SET deleted = 1 WHERE path = ?', [(path,) for path in deleted])
+    # A deleted CV can no longer be the original its duplicates point to
+    release_duplicates(conn, [row[0] for path in deleted for row in conn.execute(
+        'SELECT candidate_id FROM cv_files WHERE path = ? AND candidate_id IS NOT NULL', (path,))])
+
+    processed = 0
+    if changed:
+        results = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        feeder = threading.Thread(target=_feed_results, args=(list(changed), workers, results, stop),
+                                  name="cv-feeder", daemon=True)
+        feeder.start()
+
+        batch = []
+        try:
+            while True:
+                result = results.get()
+                if result is not None:
+                    batch.append(result)
+                if batch and (result is None or len(batch) >= BATCH_SIZE):
+                    _record_batch(conn, batch, changed)
+                    processed += len(batch)
+                    batch = []
+                if result is None:
+                    break
+        finally:
+            stop.set()  # If a batch failed to save, the feeder must not wait on the full queue forever
+            feeder.join()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Processed {processed} new or modified CVs, marked {len(deleted)} deleted, in {elapsed:.2f}s")
+    return processed, len(deleted)
 
 def main():
-    database = r"C:\Users\Nandini\Desktop\Job Screening AI\data\recruitment.db"  # Path to your database file
+    database = DB_PATH  # Path to your database file
     cv_directory = r"C:\Users\Nandini\Desktop\Job Screening AI\data\cv"  # Path to your CV directory
 
     conn = create_connection(database)
 
     if conn:
-        process_cv_directory(cv_directory, conn)
+        configure_for_bulk_load(conn)
+        if INCREMENTAL:
+            process_cv_directory_incremental(cv_directory, conn)
+        else:
+            process_cv_directory_parallel(cv_directory, conn)
+        # Score only the CVs that changed against the current jobs
+        print(f"Rescored {refresh_candidate_scores(conn)} CVs")
         conn.close()
+        print_summary()
     else:
         logging.error("Failed to create a database connection.")
 
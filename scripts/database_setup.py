@@ -1,19 +1,178 @@
 import sqlite3
 import os
-import pandas as pd
+from bulk_loader import configure_for_bulk_load, insert_job_descriptions
+from job_description_loader import iter_job_descriptions
+from score_store import refresh_candidate_scores
+from db import DB_PATH, create_connection
+from metrics import print_summary
 
-def create_connection():
-    """Create a database connection to the SQLite database specified by db_file."""
-    database = r"C:\Users\Nandini\Desktop\Job Screening AI\data\recruitment.db"
-    conn = sqlite3.connect(database)
-    return conn
+def create_cv_files_table(conn):
+    """Create the table that tracks which CV files have been ingested, used for incremental runs."""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS cv_files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime REAL NOT NULL,
+        content_hash TEXT NOT NULL,
+        candidate_id INTEGER,
+        deleted INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (candidate_id) REFERENCES candidates (id)
+    )
+    ''')
 
-def setup_database(conn):
+# Schema migrations, applied in order. PRAGMA user_version records how many have run.
+MIGRATIONS = [
+    # 1: lookup indexes and the materialized candidate_scores table
+    [
+        'CREATE INDEX IF NOT EXISTS idx_job_descriptions_title ON job_descriptions (title)',
+        'CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates (email)',
+        'CREATE INDEX IF NOT EXISTS idx_candidates_name ON candidates (name)',
+        'CREATE INDEX IF NOT EXISTS idx_interview_schedules_date ON interview_schedules (interview_date)',
+        'CREATE INDEX IF NOT EXISTS idx_interview_schedules_candidate ON interview_schedules (candidate_id)',
+        'CREATE INDEX IF NOT EXISTS idx_interview_schedules_job ON interview_schedules (job_id)',
+        'CREATE INDEX IF NOT EXISTS idx_cv_files_candidate ON cv_files (candidate_id)',
+        '''
+        CREATE TABLE IF NOT EXISTS candidate_scores (
+            job_id INTEGER NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            scorer_version TEXT NOT NULL,
+            PRIMARY KEY (job_id, candidate_id),
+            FOREIGN KEY (job_id) REFERENCES job_descriptions (id),
+            FOREIGN KEY (candidate_id) REFERENCES candidates (id)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_candidate_scores_job_score ON candidate_scores (job_id, score DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_candidate_scores_candidate ON candidate_scores (candidate_id)',
+        # The scorer version each CV was last scored with; NULL means it needs (re)scoring
+        'ALTER TABLE cv_files ADD COLUMN scored_version TEXT',
+    ],
+    # 2: interviewers, when they are available, and who runs each interview
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS interviewers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS interviewer_availability (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            interviewer_id INTEGER NOT NULL,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            FOREIGN KEY (interviewer_id) REFERENCES interviewers (id)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_interviewer_availability_end ON interviewer_availability (end_time)',
+        'ALTER TABLE interview_schedules ADD COLUMN interviewer_id INTEGER REFERENCES interviewers (id)',
+        'CREATE INDEX IF NOT EXISTS idx_interview_schedules_interviewer ON interview_schedules (interviewer_id, interview_date)',
+    ],
+    # 3: skill ids found in each CV and job description by the skills taxonomy
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS candidate_skills (
+            candidate_id INTEGER NOT NULL,
+            skill TEXT NOT NULL,
+            PRIMARY KEY (candidate_id, skill),
+            FOREIGN KEY (candidate_id) REFERENCES candidates (id)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_candidate_skills_skill ON candidate_skills (skill, candidate_id)',
+        '''
+        CREATE TABLE IF NOT EXISTS job_skills (
+            job_id INTEGER NOT NULL,
+            skill TEXT NOT NULL,
+            PRIMARY KEY (job_id, skill),
+            FOREIGN KEY (job_id) REFERENCES job_descriptions (id)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_job_skills_skill ON job_skills (skill, job_id)',
+    ],
+    # 4: near-duplicate CV detection; duplicate_of links a duplicate to the first candidate of its group
+    [
+        'ALTER TABLE candidates ADD COLUMN duplicate_of INTEGER REFERENCES candidates (id)',
+        'CREATE INDEX IF NOT EXISTS idx_candidates_duplicate_of ON candidates (duplicate_of)',
+        # MinHash signature of each CV, and its locality-sensitive hashing bucket in each band
+        '''
+        CREATE TABLE IF NOT EXISTS cv_minhash (
+            candidate_id INTEGER PRIMARY KEY,
+            signature BLOB NOT NULL,
+            FOREIGN KEY (candidate_id) REFERENCES candidates (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS cv_lsh_buckets (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, candidate_id),
+            FOREIGN KEY (candidate_id) REFERENCES candidates (id)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_cv_lsh_buckets_candidate ON cv_lsh_buckets (candidate_id)',
+        # Phone numbers reduced to their digits, so differently formatted numbers still match
+        '''
+        CREATE TABLE IF NOT EXISTS cv_phones (
+            phone TEXT NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            PRIMARY KEY (phone, candidate_id),
+            FOREIGN KEY (candidate_id) REFERENCES candidates (id)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_cv_phones_candidate ON cv_phones (candidate_id)',
+    ],
+    # 5: skill overlap scores, materialized like candidate_scores
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS candidate_skill_scores (
+            job_id INTEGER NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            score REAL NOT NULL,
+            scorer_version TEXT NOT NULL,
+            PRIMARY KEY (job_id, candidate_id),
+            FOREIGN KEY (job_id) REFERENCES job_descriptions (id),
+            FOREIGN KEY (candidate_id) REFERENCES candidates (id)
+        ) WITHOUT ROWID
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_candidate_skill_scores_job_score ON candidate_skill_scores (job_id, score DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_candidate_skill_scores_candidate ON candidate_skill_scores (candidate_id)',
+        # CVs scored before this migration have no skill scores yet
+        'UPDATE cv_files SET scored_version = NULL',
+    ],
+]
+
+def migrate_schema(conn):
+    """Apply any schema migrations this database has not had yet."""
+    create_cv_files_table(conn)
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute('BEGIN')  # Run each migration, DDL included, in one transaction
+        try:
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+def setup_database(conn, drop_candidates=False):
     """Create tables if they do not exist."""
     cursor = conn.cursor()
 
-    # Drop the candidates table if it exists (for development purposes)
-    cursor.execute('DROP TABLE IF EXISTS candidates')
+    # Optionally drop the candidates table (for development purposes); this also forgets which CVs were ingested
+    # and the interviews booked for the dropped candidates
+    if drop_candidates:
+        cursor.execute('DROP TABLE IF EXISTS candidates')
+        cursor.execute('DROP TABLE IF EXISTS interview_schedules')
+        cursor.execute('DROP TABLE IF EXISTS cv_files')
+        cursor.execute('DROP TABLE IF EXISTS candidate_scores')
+        cursor.execute('DROP TABLE IF EXISTS candidate_skill_scores')
+        cursor.execute('DROP TABLE IF EXISTS candidate_skills')
+        for table in ('cv_minhash', 'cv_lsh_buckets', 'cv_phones'):
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
 
     # Create candidates table
     cursor.execute('''
@@ -49,25 +208,19 @@ def setup_database(conn):
 
     conn.commit()
 
+    # Create cv_files, candidate_scores and indexes
+    if drop_candidates:
+        conn.execute('PRAGMA user_version = 0')
+    migrate_schema(conn)
+
 def insert_job_descriptions_from_csv(conn, csv_file):
     """Insert job descriptions from a CSV file into the job_descriptions table."""
-    job_descriptions = pd.read_csv(csv_file, encoding='ISO-8859-1')  # Load job descriptions
-
-    for index, row in job_descriptions.iterrows():
-        title = row['Job Title']
-        description = row['Job Description']
-        
-        # Insert into the database
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO job_descriptions (title, description)
-            VALUES (?, ?)
-        ''', (title, description))
-    
-    conn.commit()
+    # Stream the file into the database in batched transactions, without loading it whole
+    rows = ((job.title, job.description) for job in iter_job_descriptions(csv_file))
+    return insert_job_descriptions(conn, rows)
 
 def main():
-    database = r"C:\Users\Nandini\Desktop\Job Screening AI\data\recruitment.db"
+    database = DB_PATH
     
     # Check if the database already exists
     if not os.path.exists(database):
@@ -76,14 +229,20 @@ def main():
         conn.close()
         print("Database created and tables set up.")
     else:
-        print("Database already exists.")
+        conn = create_connection()
+        migrate_schema(conn)
+        conn.close()
+        print("Database already exists; schema is up to date.")
     
     # Insert job descriptions from CSV
     conn = create_connection()
+    configure_for_bulk_load(conn)
     csv_file = r"C:\Users\Nandini\Desktop\Job Screening AI\data\job_description.csv"
     insert_job_descriptions_from_csv(conn, csv_file)
+    refresh_candidate_scores(conn)
     conn.close()
     print("Job descriptions inserted into the database.")
+    print_summary()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,132 @@
+# db.py
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Path to the recruitment database; set RECRUITMENT_DB to use a different file
+DB_PATH = os.environ.get("RECRUITMENT_DB", "recruitment.db")
+
+BUSY_TIMEOUT = 30  # Seconds to wait for another writer before failing with "database is locked"
+STATEMENT_CACHE_SIZE = 256  # Prepared statements kept per connection
+POOL_SIZE = 8  # Idle connections kept open per database
+
+
+def _configure(conn):
+    """Applies the pragmas every connection should have. Runs once per connection, not per request."""
+    # WAL lets any number of readers run alongside the single writer
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT * 1000}')
+
+
+def connect(db_file=DB_PATH, check_same_thread=True):
+    """Opens a configured connection to the SQLite database specified by db_file."""
+    conn = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT, cached_statements=STATEMENT_CACHE_SIZE,
+                           check_same_thread=check_same_thread)
+    _configure(conn)
+    return conn
+
+
+def create_connection(db_file=DB_PATH):
+    """Create a database connection to the SQLite database specified by db_file."""
+    conn = None
+    try:
+        conn = connect(db_file)
+        print("Connection established.")
+    except sqlite3.Error as e:
+        print(f"Error connecting to database: {e}")
+    return conn
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of open SQLite connections to one database file.
+
+    Connections are opened and configured once, then handed out and returned, so callers skip the
+    connect and pragma cost and reuse each connection's prepared statement cache. Idle connections
+    beyond max_size are closed.
+    """
+
+    def __init__(self, db_file=DB_PATH, max_size=POOL_SIZE, row_factory=sqlite3.Row):
+        self.db_file = db_file
+        self.row_factory = row_factory
+        self._idle = queue.LifoQueue(maxsize=max_size)  # Most recently used first keeps caches warm
+
+    def acquire(self):
+        """Takes an idle connection from the pool, or opens a new one if none is idle."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            conn = connect(self.db_file, check_same_thread=False)
+            conn.row_factory = self.row_factory
+            return conn
+
+    def release(self, conn):
+        """Returns a connection to the pool, rolling back anything left uncommitted."""
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Context manager that lends a pooled connection for the duration of the block."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Closes every idle connection."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_file=DB_PATH):
+    """Returns the shared connection pool for db_file, creating it on first use."""
+    key = os.path.abspath(db_file)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(db_file)
+        return _pools[key]
+
+
+def init_app(app, db_file=DB_PATH):
+    """
+    Gives a Flask app request-scoped connections.
+
+    get_request_connection() borrows one pooled connection the first time a request needs it, and the
+    connection goes back to the pool when the request ends.
+    """
+    pool = get_pool(db_file)
+    app.extensions['db_pool'] = pool
+
+    @app.teardown_appcontext
+    def release_request_connection(exception):
+        from flask import g
+        conn = g.pop('db_conn', None)
+        if conn is not None:
+            pool.release(conn)
+
+    return pool
+
+
+def get_request_connection():
+    """Returns the current request's pooled connection, borrowing one on first use."""
+    from flask import current_app, g
+    if 'db_conn' not in g:
+        g.db_conn = current_app.extensions['db_pool'].acquire()
+    return g.db_conn
@@ -0,0 +1,203 @@
+# dedup.py
+
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+from metrics import counter, timed
+
+SHINGLE_SIZE = 5  # Words per shingle
+NUM_PERMUTATIONS = 128  # MinHash values per signature
+BANDS = 32  # LSH bands of 4 rows; CVs sharing a bucket in any band are compared, so pairs at the threshold are almost never missed
+SIMILARITY_THRESHOLD = 0.8  # Estimated Jaccard similarity above which two CVs are duplicates
+
+_PRIME = (1 << 31) - 1  # Shingle hashes are 32-bit, so a * x + b stays within 64 bits
+_rng = np.random.default_rng(20240501)  # Fixed, so signatures stay comparable across runs and processes
+_A = _rng.integers(1, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+_ROWS = NUM_PERMUTATIONS // BANDS
+
+WORD_PATTERN = re.compile(r'\w+')
+MISSING = (None, "", "N/A")  # Values parse_cv_text uses for a missing email or phone
+# Candidates whose CV was deleted stay in the candidates table, but nothing may be linked to them
+_LIVE = 'NOT EXISTS (SELECT 1 FROM cv_files f WHERE f.candidate_id = candidates.id AND f.deleted = 1)'
+
+
+def shingles(text):
+    """Returns the 32-bit hashes of every SHINGLE_SIZE-word shingle of the lower-cased text."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        words = words + [""] * (SHINGLE_SIZE - len(words))  # Short texts still get one shingle
+    return np.unique(np.fromiter((zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+                                  for i in range(len(words) - SHINGLE_SIZE + 1)), dtype=np.uint64))
+
+
+@timed("dedup_signature_seconds", "Time spent computing MinHash signatures of CVs")
+def minhash(text):
+    """Returns the MinHash signature of a CV's text as NUM_PERMUTATIONS uint32 values."""
+    hashes = shingles(text)
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def estimated_similarity(first, second):
+    """Estimates the Jaccard similarity of two CVs' shingle sets from their signatures."""
+    return float(np.mean(first == second))
+
+
+def band_buckets(signature):
+    """Returns the LSH bucket of each band of a signature, as signed 64-bit integers."""
+    return [int.from_bytes(hashlib.blake2b(signature[band * _ROWS:(band + 1) * _ROWS].tobytes(), digest_size=8).digest(),
+                           "big", signed=True) for band in range(BANDS)]
+
+
+def normalize_phone(phone):
+    """Keeps only the digits of a phone number, or returns None if there are too few to identify anyone."""
+    if phone in MISSING:
+        return None
+    digits = re.sub(r'\D', '', phone)
+    return digits if len(digits) >= 7 else None
+
+
+class DuplicateIndex:
+    """
+    Finds which earlier candidate a newly ingested CV duplicates, from the database.
+
+    A CV is a duplicate of an existing candidate with the same email, the same phone number, or a
+    near-identical text. Near-identical texts are found with MinHash and locality-sensitive hashing:
+    each signature is split into BANDS bands, and only candidates sharing a band's bucket are
+    compared. Buckets are indexed SQLite rows, so a lookup touches a handful of rows however many
+    CVs have been ingested.
+    """
+
+    def __init__(self, conn, threshold=SIMILARITY_THRESHOLD):
+        self.conn = conn
+        self.threshold = threshold
+
+    def find(self, signature, email=None, phone=None, exclude=None):
+        """
+        Returns (candidate_id, reason, similarity) for the original candidate this CV duplicates, or None.
+
+        Args:
+            signature (ndarray): The CV's MinHash signature.
+            email (str): The email parsed from the CV.
+            phone (str): The phone number parsed from the CV.
+            exclude (int): A candidate id never to match, i.e. the CV's own.
+        """
+        exclude = -1 if exclude is None else exclude
+        if email not in MISSING:
+            row = self.conn.execute(f'SELECT id FROM candidates WHERE email = ? AND id != ? AND {_LIVE} ORDER BY id LIMIT 1',
+                                    (email, exclude)).fetchone()
+            if row:
+                return self._original(row[0]), 'email', None
+        phone_digits = normalize_phone(phone)
+        if phone_digits:
+            row = self.conn.execute('SELECT candidate_id FROM cv_phones WHERE phone = ? AND candidate_id != ? '
+                                    'ORDER BY candidate_id LIMIT 1', (phone_digits, exclude)).fetchone()
+            if row:
+                return self._original(row[0]), 'phone', None
+
+        buckets = band_buckets(signature)
+        placeholders = ", ".join("(?, ?)" for _ in buckets)
+        params = [value for band, bucket in enumerate(buckets) for value in (band, bucket)]
+        # Joining the query's buckets, rather than filtering with IN, makes SQLite search the primary key per band
+        candidates = self.conn.execute(f'''WITH query (band, bucket) AS (VALUES {placeholders})
+                                           SELECT DISTINCT b.candidate_id, m.signature FROM query
+                                           JOIN cv_lsh_buckets b ON b.band = query.band AND b.bucket = query.bucket
+                                           JOIN cv_minhash m ON m.candidate_id = b.candidate_id
+                                           WHERE b.candidate_id != ?''', params + [exclude]).fetchall()
+        best = None
+        for candidate_id, blob in candidates:
+            similarity = estimated_similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if similarity >= self.threshold and (best is None or (similarity, -candidate_id) > (best[1], -best[0])):
+                best = (candidate_id, similarity)
+        if best:
+            return self._original(best[0]), 'text', best[1]
+        return None
+
+    def _original(self, candidate_id):
+        """Follows duplicate_of to the root of the group, so every duplicate links to its first live candidate."""
+        seen = {candidate_id}
+        while True:
+            row = self.conn.execute(f'SELECT id FROM candidates WHERE id = (SELECT duplicate_of FROM candidates WHERE id = ?) AND {_LIVE}',
+                                    (candidate_id,)).fetchone()
+            if not row or row[0] in seen:  # A root, a deleted original, or a cycle
+                return candidate_id
+            candidate_id = row[0]
+            seen.add(candidate_id)
+
+    def add(self, candidate_id, signature, phone=None):
+        """Indexes a candidate's signature and phone number, replacing any previous entry, inside the caller's transaction."""
+        self.remove(candidate_id)
+        self.conn.execute('INSERT INTO cv_minhash (candidate_id, signature) VALUES (?, ?)', (candidate_id, signature.tobytes()))
+        self.conn.executemany('INSERT OR IGNORE INTO cv_lsh_buckets (band, bucket, candidate_id) VALUES (?, ?, ?)',
+                              [(band, bucket, candidate_id) for band, bucket in enumerate(band_buckets(signature))])
+        phone_digits = normalize_phone(phone)
+        if phone_digits:
+            self.conn.execute('INSERT OR IGNORE INTO cv_phones (phone, candidate_id) VALUES (?, ?)', (phone_digits, candidate_id))
+
+    def remove(self, candidate_id):
+        """Removes a candidate from the index, inside the caller's transaction."""
+        for table in ('cv_minhash', 'cv_lsh_buckets', 'cv_phones'):
+            self.conn.execute(f'DELETE FROM {table} WHERE candidate_id = ?', (candidate_id,))
+
+
+def link_duplicates(conn, candidates, threshold=SIMILARITY_THRESHOLD):
+    """
+    Links each newly ingested or modified candidate to the candidate it duplicates, if any.
+
+    Candidates are checked in order and indexed as they go, so duplicates within the same batch are
+    found too. Sets candidates.duplicate_of (NULL for originals) and commits once. The duplicates of
+    a candidate that turns out to be a duplicate itself are relinked to its original, so every
+    duplicate_of points at the root of its group.
+
+    Args:
+        conn (Connection): The database connection.
+        candidates (iterable): (candidate_id, signature, email, phone) tuples.
+        threshold (float): Estimated similarity above which two CV texts are duplicates.
+
+    Returns:
+        list: (candidate_id, original_id, reason) for every duplicate found.
+    """
+    index = DuplicateIndex(conn, threshold)
+    duplicates = []
+    with conn:
+        for candidate_id, signature, email, phone in candidates:
+            match = index.find(signature, email, phone, exclude=candidate_id)
+            original = match[0] if match else None
+            if original == candidate_id:
+                original = None  # The candidate is itself the original of the group it matched
+            conn.execute('UPDATE candidates SET duplicate_of = ? WHERE id = ?', (original, candidate_id))
+            if original is not None:
+                conn.execute('UPDATE candidates SET duplicate_of = ? WHERE duplicate_of = ?', (original, candidate_id))
+            index.add(candidate_id, signature, phone)
+            if original is not None:
+                duplicates.append((candidate_id, original, match[1]))
+                counter("duplicate_cvs_total", "CVs linked to an existing candidate").inc(reason=match[1])
+    return duplicates
+
+
+def release_duplicates(conn, candidate_ids):
+    """
+    Drops removed candidates from the index and promotes the first duplicate of each to original.
+
+    The other duplicates of a removed candidate are relinked to the promoted one, and the promoted
+    candidate's CV is marked for scoring, since duplicates are never scored.
+
+    Returns:
+        list: The ids of the promoted candidates.
+    """
+    index = DuplicateIndex(conn)
+    promoted = []
+    with conn:
+        for candidate_id in candidate_ids:
+            index.remove(candidate_id)
+            duplicates = [row[0] for row in conn.execute(
+                'SELECT id FROM candidates WHERE duplicate_of = ? ORDER BY id', (candidate_id,))]
+            if duplicates:
+                conn.execute('UPDATE candidates SET duplicate_of = NULL WHERE id = ?', (duplicates[0],))
+                conn.execute('UPDATE candidates SET duplicate_of = ? WHERE duplicate_of = ?', (duplicates[0], candidate_id))
+                conn.execute('UPDATE cv_files SET scored_version = NULL WHERE candidate_id = ?', (duplicates[0],))
+                promoted.append(duplicates[0])
+    return promoted
@@ -0,0 +1,490 @@
+# embedding_matcher.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from metrics import counter, timed
+
+try:
+    import hnswlib
+except ImportError:  # Optional; the numpy IVF index is used instead
+    hnswlib = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # Optional; the hashing embedder is used instead
+    SentenceTransformer = None
+
+# Embedder used by EmbeddingScorer: "hashing" (offline, no model) or "sentence-transformers" (needs the package
+# and MODEL_NAME available locally); set CV_EMBEDDER to choose
+EMBEDDER = os.environ.get("CV_EMBEDDER", "hashing")
+MODEL_NAME = "all-MiniLM-L6-v2"  # Small sentence-embedding model that runs on CPU
+HASHING_DIMENSIONS = 512
+
+# Directory of the vector store and its ANN index; set CV_EMBEDDINGS to use a different one
+STORE_PATH = os.environ.get("CV_EMBEDDINGS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "embeddings"))
+INITIAL_CAPACITY = 1024  # Rows allocated in a new vector file; the file doubles when full
+STORE_MAX_BYTES = 256 * 1024 * 1024  # Vectors kept on disk; the least recently used are dropped beyond this
+
+IVF_PROBES = 8  # Clusters searched per query by the IVF index; more while a filtered search has too few results
+IVF_RETRAIN_FACTOR = 4  # Re-cluster the IVF index once it holds this many times the vectors it was trained on
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 100
+
+
+class HashingEmbedder:
+    """
+    Offline embedder: hashed word unigrams and bigrams, L2-normalised.
+
+    Captures shared vocabulary rather than meaning, but needs no model, so it is the default and the
+    one used by tests and benchmarks.
+    """
+
+    def __init__(self, dimensions=HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+        self._vectorizer = HashingVectorizer(n_features=dimensions, ngram_range=(1, 2), token_pattern=r'\b\w+\b',
+                                             alternate_sign=True, norm='l2')
+
+    def embed(self, texts):
+        return self._vectorizer.transform(texts).toarray().astype(np.float32)
+
+
+class SentenceEmbedder:
+    """Sentence-transformers model run on CPU (optional dependency)."""
+
+    def __init__(self, model_name=MODEL_NAME):
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dimensions = self._model.get_sentence_embedding_dimension()
+        self.name = model_name.replace("/", "_")
+
+    def embed(self, texts):
+        return self._model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def get_embedder(name=EMBEDDER):
+    """Returns the embedder with this name ("hashing" or "sentence-transformers")."""
+    if name == "hashing":
+        return HashingEmbedder()
+    if name == "sentence-transformers":
+        if SentenceTransformer is None:
+            raise ValueError("The sentence-transformers embedder needs the sentence-transformers package")
+        return SentenceEmbedder()
+    raise ValueError(f"Unknown embedder: {name}")
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class IvfIndex:
+    """
+    Inverted-file ANN index in numpy: vectors are clustered with spherical k-means, and a query only
+    scores the vectors of its IVF_PROBES nearest clusters.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, path):
+        self.path = path + ".ivf.npz"
+        self.centroids = None
+        self.lists = {}  # Cluster -> array of store rows
+        self.trained_on = 0
+        if os.path.exists(self.path):
+            data = np.load(self.path)
+            self.centroids = data["centroids"]
+            self.lists = {cluster: data["rows"][data["clusters"] == cluster] for cluster in range(len(self.centroids))}
+            self.trained_on = int(data["trained_on"])
+
+    def rows(self):
+        return np.concatenate(list(self.lists.values())) if self.lists else np.empty(0, dtype=np.int64)
+
+    def train(self, vectors, rows, iterations=10, seed=0):
+        """Clusters the given vectors into about sqrt(n) clusters and indexes them."""
+        rng = np.random.default_rng(seed)
+        clusters = max(1, int(np.sqrt(len(rows))))
+        centroids = vectors[rng.choice(len(rows), clusters, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            for cluster in range(clusters):
+                members = vectors[assignment == cluster]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[cluster] = centroid / (np.linalg.norm(centroid) or 1)
+        self.centroids = centroids
+        self.lists = {}
+        self.trained_on = len(rows)
+        self._assign(vectors, rows)
+
+    def _assign(self, vectors, rows):
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        for cluster in np.unique(assignment):
+            new_rows = rows[assignment == cluster]
+            self.lists[cluster] = np.concatenate([self.lists.get(cluster, np.empty(0, dtype=np.int64)), new_rows])
+
+    def add(self, vectors, rows, all_vectors):
+        """Indexes new vectors; re-clusters everything once the index has outgrown its clusters."""
+        if self.centroids is None or len(self.rows()) + len(rows) > IVF_RETRAIN_FACTOR * self.trained_on:
+            every_row = np.concatenate([self.rows(), rows])
+            self.train(all_vectors(every_row), every_row)
+        else:
+            self._assign(vectors, rows)
+
+    def search(self, query, k, store_vectors, allowed=None):
+        if self.centroids is None:
+            return []
+        # Nearest clusters first; past IVF_PROBES, only while a filtered search has fewer than k results
+        found = []
+        for probed, cluster in enumerate(np.argsort(-(self.centroids @ query)).tolist()):
+            if probed >= IVF_PROBES and sum(len(rows) for rows in found) >= k:
+                break
+            rows = self.lists.get(cluster, np.empty(0, dtype=np.int64))
+            found.append(rows if allowed is None else rows[np.isin(rows, allowed)])
+        candidates = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        if not len(candidates):
+            return []
+        candidates = np.sort(candidates)
+        similarities = store_vectors(candidates) @ query
+        best = np.argsort(-similarities, kind="stable")[:k]
+        return list(zip(candidates[best].tolist(), similarities[best].tolist()))
+
+    def save(self):
+        clusters = np.concatenate([np.full(len(rows), cluster) for cluster, rows in self.lists.items()]) \
+            if self.lists else np.empty(0, dtype=np.int64)
+        with open(self.path, "wb") as f:
+            np.savez(f, centroids=self.centroids, rows=self.rows(), clusters=clusters, trained_on=self.trained_on)
+
+
+class HnswIndex:
+    """HNSW graph index from hnswlib (optional dependency), on inner product of normalised vectors."""
+
+    kind = "hnsw"
+
+    def __init__(self, path, dimensions):
+        self.path = path + ".hnsw"
+        self._index = hnswlib.Index(space="ip", dim=dimensions)
+        if os.path.exists(self.path):
+            self._index.load_index(self.path, allow_replace_deleted=False)
+        else:
+            self._index.init_index(max_elements=INITIAL_CAPACITY, ef_construction=HNSW_EF_CONSTRUCTION, M=HNSW_M)
+        self._index.set_ef(HNSW_EF_SEARCH)
+
+    def rows(self):
+        return np.asarray(self._index.get_ids_list(), dtype=np.int64)
+
+    def add(self, vectors, rows, all_vectors):
+        needed = self._index.get_current_count() + len(rows)
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+        self._index.add_items(vectors, rows)
+
+    def search(self, query, k, store_vectors, allowed=None):
+        count = self._index.get_current_count()
+        if not count:
+            return []
+        allowed_set = None if allowed is None else set(allowed.tolist())
+        k = min(k, count if allowed_set is None else len(allowed_set))
+        if not k:
+            return []
+        rows, distances = self._index.knn_query(query, k=k, filter=None if allowed_set is None else allowed_set.__contains__)
+        # Inner-product "distance" is 1 - similarity
+        return [(int(row), float(1 - distance)) for row, distance in zip(rows[0], distances[0])]
+
+    def save(self):
+        self._index.save_index(self.path)
+
+
+class EmbeddingStore:
+    """
+    Embeddings of CVs and job descriptions, computed once per distinct text and kept on disk.
+
+    Vectors live in a memory-mapped float32 file (one row per text) and are keyed by content hash and
+    kind in a small SQLite table, so a text seen before is never embedded again, in this process or
+    the next; a job description later uploaded as a CV reuses its vector. CV vectors are also added
+    to an ANN index (HNSW if hnswlib is installed, otherwise IVF) that answers top-k searches
+    without scoring every vector. Once the vectors outgrow max_bytes, the least recently used are
+    dropped and the rest renumbered.
+
+    A store directory should only be written by one process at a time; threads may share a store.
+    Rows stay valid while the store's lock is held; a compaction may renumber them afterwards.
+    """
+
+    def __init__(self, path=STORE_PATH, embedder=None, max_bytes=STORE_MAX_BYTES):
+        self.embedder = embedder or get_embedder()
+        self.dimensions = self.embedder.dimensions
+        self.max_rows = max(1, max_bytes // (self.dimensions * 4))
+        self.directory = os.path.join(path, self.embedder.name)  # Vectors of different embedders never mix
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._keys = sqlite3.connect(os.path.join(self.directory, "keys.db"), check_same_thread=False)
+        with self._keys:
+            self._keys.execute('''CREATE TABLE IF NOT EXISTS embedding_keys (
+                                      hash TEXT NOT NULL,
+                                      kind TEXT NOT NULL,
+                                      row INTEGER NOT NULL,
+                                      last_used REAL NOT NULL,
+                                      PRIMARY KEY (hash, kind)
+                                  )''')
+            self._keys.execute('CREATE INDEX IF NOT EXISTS idx_embedding_keys_row ON embedding_keys (row)')
+            if self._keys.execute("SELECT 1 FROM sqlite_master WHERE name = 'embeddings'").fetchone():
+                # Stores written before keys included the kind
+                self._keys.execute('INSERT OR IGNORE INTO embedding_keys (hash, kind, row, last_used) '
+                                   'SELECT hash, kind, row, 0 FROM embeddings')
+                self._keys.execute('DROP TABLE embeddings')
+        self.count = self._keys.execute('SELECT COALESCE(MAX(row) + 1, 0) FROM embedding_keys').fetchone()[0]
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        self._index_path = os.path.join(self.directory, "cv")
+        self._vectors = None
+        self._open_vectors(max(INITIAL_CAPACITY, self.count))
+        self._index = None
+
+    def _open_vectors(self, capacity):
+        """(Re)maps the vector file, growing it to hold capacity rows."""
+        size = capacity * self.dimensions * 4
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimensions))
+
+    def __len__(self):
+        return self.count
+
+    def vectors(self, rows):
+        """Returns the vectors stored at the given rows."""
+        return np.asarray(self._vectors[rows])
+
+    def _lookup(self, hashes, kind=None):
+        """Returns {hash: row} for the hashes stored under kind, or under any kind if kind is None."""
+        rows = {}
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            sql = f'SELECT hash, row FROM embedding_keys WHERE hash IN ({",".join("?" * len(chunk))})'
+            rows.update(self._keys.execute(sql if kind is None else sql + ' AND kind = ?',
+                                           chunk if kind is None else chunk + [kind]).fetchall())
+        return rows
+
+    def embed(self, texts, kind="cv"):
+        """
+        Returns the store rows of the texts' vectors, embedding only texts not stored yet.
+
+        Args:
+            texts (list): CV or job description texts.
+            kind (str): "cv" or "job". Only CV vectors are added to the ANN index.
+
+        Returns:
+            numpy.ndarray: One store row per text.
+        """
+        hashes = [content_hash(text) for text in texts]
+        with self._lock:
+            known = self._lookup(hashes, kind)
+            missing = list(dict.fromkeys(digest for digest in hashes if digest not in known))
+            reused = self._lookup(missing)  # Stored under the other kind; the vector is the same
+            new = {}  # Hash -> index of its first text, for texts not stored yet
+            for i, digest in enumerate(hashes):
+                if digest not in known and digest not in reused and digest not in new:
+                    new[digest] = i
+            counter("embedding_cache_requests_total", "Embedding store lookups").inc(len(hashes) - len(new), result="hit")
+            counter("embedding_cache_requests_total", "Embedding store lookups").inc(len(new), result="miss")
+            if self.count + len(new) > self.max_rows:
+                moved = self._compact(set(known.values()) | set(reused.values()), len(new))
+                known = {digest: moved[row] for digest, row in known.items()}
+                reused = {digest: moved[row] for digest, row in reused.items()}
+
+            added = {digest: row for digest, row in reused.items()}  # Hashes newly stored under this kind
+            if new:
+                vectors = self._embed([texts[i] for i in new.values()])
+                rows = np.arange(self.count, self.count + len(new))
+                if self.count + len(new) > len(self._vectors):
+                    self._vectors.flush()
+                    capacity = max(min(2 * len(self._vectors), self.max_rows), self.count + len(new))
+                    self._open_vectors(capacity)
+                self._vectors[rows] = vectors
+                self._vectors.flush()
+                self.count += len(new)
+                added.update(zip(new, rows.tolist()))
+            now = time.time()
+            with self._keys:
+                self._keys.executemany('INSERT INTO embedding_keys (hash, kind, row, last_used) VALUES (?, ?, ?, ?)',
+                                       [(digest, kind, int(row), now) for digest, row in added.items()])
+                self._keys.executemany('UPDATE embedding_keys SET last_used = ? WHERE hash = ? AND kind = ?',
+                                       [(now, digest, kind) for digest in known])
+            known.update(added)
+            if kind == "cv" and added and self._index is not None:
+                added_rows = np.array(sorted(set(added.values())), dtype=np.int64)
+                self._index.add(self.vectors(added_rows), added_rows, self.vectors)
+                self._index.save()
+            return np.array([known[digest] for digest in hashes], dtype=np.int64)
+
+    def _compact(self, needed, incoming):
+        """
+        Drops the least recently used vectors, keeping the needed rows, so that the store fits in
+        max_rows with incoming new rows and room to grow, and renumbers the rest from 0.
+
+        The ANN index is rebuilt on its next use. Returns {old row: new row} for the kept rows.
+        """
+        budget = max(self.max_rows // 2 - incoming, len(needed))
+        recent = [row for row, in self._keys.execute('SELECT row FROM embedding_keys GROUP BY row ORDER BY MAX(last_used) DESC')]
+        keep = set(needed)
+        for row in recent:
+            if len(keep) >= budget:
+                break
+            keep.add(row)
+        keep = np.array(sorted(keep), dtype=np.int64)
+        moved = {old: new for new, old in enumerate(keep.tolist())}
+        kept_vectors = self.vectors(keep)
+        entries = self._keys.execute('SELECT hash, kind, row, last_used FROM embedding_keys').fetchall()
+
+        self._vectors.flush()
+        self._vectors = None
+        with open(self._vectors_path, "wb"):
+            pass  # Truncated, then regrown to fit the kept vectors
+        self._open_vectors(max(INITIAL_CAPACITY, len(keep) + incoming))
+        self._vectors[:len(keep)] = kept_vectors
+        self._vectors.flush()
+        with self._keys:
+            self._keys.execute('DELETE FROM embedding_keys')
+            self._keys.executemany('INSERT INTO embedding_keys (hash, kind, row, last_used) VALUES (?, ?, ?, ?)',
+                                   [(digest, kind, moved[row], last_used) for digest, kind, row, last_used in entries
+                                    if row in moved])
+        counter("embedding_evictions_total", "Vectors dropped from the embedding store to keep it in size").inc(self.count - len(keep))
+        self.count = len(keep)
+        self._index = None
+        for suffix in (".ivf.npz", ".hnsw"):
+            if os.path.exists(self._index_path + suffix):
+                os.remove(self._index_path + suffix)
+        return moved
+
+    @timed("embedding_seconds", "Time spent embedding CV and job description text")
+    def _embed(self, texts):
+        return self.embedder.embed(texts)
+
+    def index(self):
+        """Returns the ANN index over every stored CV vector, loading it and indexing any missing vectors."""
+        with self._lock:
+            if self._index is None:
+                self._index = HnswIndex(self._index_path, self.dimensions) if hnswlib is not None else IvfIndex(self._index_path)
+            cv_rows = np.array([row for row, in self._keys.execute(
+                "SELECT DISTINCT row FROM embedding_keys WHERE kind = 'cv' ORDER BY row")], dtype=np.int64)
+            missing = np.setdiff1d(cv_rows, self._index.rows())
+            if len(missing):
+                self._index.add(self.vectors(missing), missing, self.vectors)
+                self._index.save()
+            return self._index
+
+    def search(self, query, k, rows=None):
+        """
+        Returns the k stored CVs most similar to a query vector, as (row, cosine similarity) tuples.
+
+        Args:
+            query (ndarray): A normalised vector from the same embedder.
+            k (int): Number of results.
+            rows (ndarray): Only consider these CV rows. The ANN index is searched unless there are
+                no more than k of them, in which case every row is a result anyway.
+        """
+        with self._lock:
+            if rows is not None:
+                rows = np.unique(rows)
+                if len(rows) <= k:
+                    similarities = self.vectors(rows) @ query
+                    best = np.argsort(-similarities, kind="stable")
+                    return list(zip(rows[best].tolist(), similarities[best].tolist()))
+            return self.index().search(query, k, self.vectors, allowed=rows)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide embedding store, opening it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EmbeddingStore()
+    return _store
+
+
+class EmbeddingScorer:
+    """
+    Scores CVs by the cosine similarity of their embedding to each job's, from 0 to 100.
+
+    Same interface as JobScorer. Every CV and job description is embedded once and kept in the
+    embedding store. With top_k, each job's best CVs are found through the store's ANN index
+    instead of scoring every CV.
+    """
+
+    def __init__(self, job_texts, store=None, top_k=None):
+        """
+        Args:
+            job_texts (list): Job description texts, one per job.
+            store (EmbeddingStore): Where vectors are kept; defaults to the process-wide store.
+            top_k (int): If given, only the top_k scores per job are kept.
+        """
+        self.store = store if store is not None else get_store()  # An empty store is falsy
+        self.top_k = top_k
+        self.job_vectors = self.store.vectors(self.store.embed(list(job_texts), kind="job"))
+
+    @timed("scoring_seconds", "Time spent scoring CVs against jobs", method="embedding")
+    def score_cvs(self, cv_texts, mask=None):
+        """
+        Scores a batch of CVs against every job.
+
+        Args:
+            cv_texts (list): CV texts.
+            mask (csr_matrix): If given, a jobs x CVs 0/1 matrix; each job only scores (and searches
+                for its top_k among) the CVs its row allows.
+
+        Returns:
+            scipy.sparse.csr_matrix: A jobs x CVs matrix of scores between 0 and 100 (negative similarities are dropped).
+        """
+        with self.store._lock:  # The rows must not be renumbered by a compaction while they are used
+            cv_rows = self.store.embed(list(cv_texts), kind="cv")
+            if self.top_k is None:
+                scores = np.clip(self.job_vectors @ self.store.vectors(cv_rows).T, 0, None).astype(np.float64) * 100
+                scores = sparse.csr_matrix(scores)
+                if mask is not None:
+                    scores = scores.multiply(mask).tocsr()
+                    scores.eliminate_zeros()
+                return scores
+
+            # A CV may appear several times in the batch; every column of a matched row gets its score
+            columns_by_row = {}
+            for column, row in enumerate(cv_rows.tolist()):
+                columns_by_row.setdefault(row, []).append(column)
+            data, job_indices, columns = [], [], []
+            for job, vector in enumerate(self.job_vectors):
+                allowed = None
+                if mask is not None:
+                    allowed = set(mask.indices[mask.indptr[job]:mask.indptr[job + 1]].tolist())
+                    if not allowed:
+                        continue
+                rows = cv_rows if allowed is None else cv_rows[sorted(allowed)]
+                for row, similarity in self.store.search(vector, self.top_k, rows=rows):
+                    if similarity > 0:
+                        for column in columns_by_row[row]:
+                            if allowed is not None and column not in allowed:
+                                continue  # The same CV text uploaded under a name the job's title gate rules out
+                            data.append(similarity * 100)
+                            job_indices.append(job)
+                            columns.append(column)
+        return sparse.csr_matrix((data, (job_indices, columns)), shape=(len(self.job_vectors), len(cv_rows)))
+
+    def score_cv(self, cv_text, threshold=0):
+        """
+        Scores a single CV against every job.
+
+        Returns:
+            list: (job_index, score) tuples with score above threshold, sorted by descending score.
+        """
+        scores = self.score_cvs([cv_text]).toarray().ravel()
+        rows = np.flatnonzero(scores > threshold)
+        return sorted(zip(rows.tolist(), scores[rows].round(2).tolist()), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,282 @@
+# extraction_backends.py
+
+import io
+import os
+import unicodedata
+from itertools import islice
+
+import pdfplumber
+from pdfminer.layout import LTChar, LTContainer
+from pdfminer.converter import PDFLayoutAnalyzer
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+
+try:
+    import pypdfium2
+except ImportError:  # Optional; the pdfminer fast path is used instead
+    pypdfium2 = None
+
+# Backend used by extract_text_from_cv. "auto" picks the first installed of FAST_BACKENDS, with
+# pdfplumber as fallback; set CV_TEXT_BACKEND to "pdfplumber" to always run full layout analysis.
+BACKEND = os.environ.get("CV_TEXT_BACKEND", "auto")
+FAST_BACKENDS = ("pdfium", "pdfminer")  # In order of preference
+
+# Same tolerances (in points) as pdfplumber's extract_text, so the fast path lays text out the same way
+X_TOLERANCE = 3  # A larger gap between two characters starts a new word
+Y_TOLERANCE = 3  # Characters whose tops are this close belong to the same line
+
+GARBLED_RATIO = 0.1  # A page is garbled if more than this share of its characters are unreadable
+MIN_WORD_RATIO = 0.5  # ... or if fewer than this share of its non-space characters are letters or digits
+
+
+def looks_garbled(text):
+    """
+    Returns True if a page's text is empty or looks like a failed extraction.
+
+    Fonts without a usable character map come out as "(cid:NN)" placeholders, replacement
+    characters or control characters rather than words.
+    """
+    if not text.strip():
+        return True
+    unreadable = text.count("(cid:") * len("(cid:NN)") + text.count("\ufffd")
+    unreadable += sum(1 for char in text if unicodedata.category(char) in ("Cc", "Co", "Cn") and not char.isspace())
+    if unreadable > GARBLED_RATIO * len(text):
+        return True
+    visible = [char for char in text if not char.isspace()]
+    return sum(1 for char in visible if char.isalnum()) < MIN_WORD_RATIO * len(visible)
+
+
+class _Document:
+    """An open PDF whose pages are extracted one at a time with page_text(i)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PdfplumberBackend:
+    """pdfplumber with full layout analysis: the slowest backend, and the output the CV parsers were written against."""
+
+    name = "pdfplumber"
+
+    def open(self, data, max_pages=None):
+        return _PdfplumberDocument(data, max_pages)
+
+
+class _PdfplumberDocument(_Document):
+    def __init__(self, data, max_pages):
+        self._pdf = pdfplumber.open(io.BytesIO(data), pages=None if max_pages is None else range(1, max_pages + 1))
+        self._pages = self._pdf.pages[:max_pages]
+
+    def __len__(self):
+        return len(self._pages)
+
+    def page_text(self, i):
+        page = self._pages[i]
+        text = page.extract_text() or ""
+        page.flush_cache()  # Free the page's parsed layout objects before moving on
+        return text
+
+    def close(self):
+        self._pdf.close()
+
+
+class _CharCollector(PDFLayoutAnalyzer):
+    """pdfminer device that keeps the characters of the last rendered page, without any layout analysis."""
+
+    def __init__(self, resource_manager):
+        super().__init__(resource_manager, laparams=None)
+        self.chars = []
+
+    def receive_layout(self, ltpage):
+        self.chars = []
+        self._collect(ltpage)
+        self.page_top = ltpage.y1
+
+    def _collect(self, container):
+        for item in container:
+            if isinstance(item, LTChar):
+                self.chars.append(item)
+            elif isinstance(item, LTContainer):  # Text drawn inside forms and figures
+                self._collect(item)
+
+
+def _layout_chars(chars, page_top):
+    """
+    Lays characters out as text the way pdfplumber's extract_text does: characters are grouped
+    into lines by their top, lines are read top to bottom, and words within a line are split on
+    whitespace or gaps wider than X_TOLERANCE and joined by single spaces.
+    """
+    chars = sorted(chars, key=lambda char: page_top - char.y1)
+    lines = []
+    line, last_top = [], None
+    for char in chars:
+        top = page_top - char.y1
+        if line and top - last_top > Y_TOLERANCE:
+            lines.append(line)
+            line = []
+        line.append(char)
+        last_top = top
+    if line:
+        lines.append(line)
+
+    text_lines = []
+    for line in lines:
+        words, word, last = [], [], None
+        for char in sorted(line, key=lambda char: char.x0):
+            text = char.get_text()
+            if text.isspace() or (last is not None and char.x0 - last.x1 > X_TOLERANCE):
+                if word:
+                    words.append("".join(word))
+                    word = []
+            if not text.isspace():
+                word.append(text)
+            last = char
+        if word:
+            words.append("".join(word))
+        text_lines.append(" ".join(words))
+    return "\n".join(text_lines)
+
+
+class PdfminerBackend:
+    """pdfminer without layout analysis: lines are rebuilt from character positions only."""
+
+    name = "pdfminer"
+
+    def open(self, data, max_pages=None):
+        return _PdfminerDocument(data, max_pages)
+
+
+class _PdfminerDocument(_Document):
+    def __init__(self, data, max_pages):
+        document = PDFDocument(PDFParser(io.BytesIO(data)))
+        self._pages = list(islice(PDFPage.create_pages(document), max_pages))
+        resource_manager = PDFResourceManager(caching=True)
+        self._device = _CharCollector(resource_manager)
+        self._interpreter = PDFPageInterpreter(resource_manager, self._device)
+
+    def __len__(self):
+        return len(self._pages)
+
+    def page_text(self, i):
+        self._interpreter.process_page(self._pages[i])
+        text = _layout_chars(self._device.chars, self._device.page_top)
+        self._device.chars = []
+        return text
+
+    def close(self):
+        self._device.close()
+
+
+class PdfiumBackend:
+    """PDFium's text extraction through pypdfium2 (optional dependency): the fastest backend."""
+
+    name = "pdfium"
+
+    def open(self, data, max_pages=None):
+        return _PdfiumDocument(data, max_pages)
+
+
+class _PdfiumDocument(_Document):
+    def __init__(self, data, max_pages):
+        self._pdf = pypdfium2.PdfDocument(data)
+        self._count = len(self._pdf) if max_pages is None else min(len(self._pdf), max_pages)
+
+    def __len__(self):
+        return self._count
+
+    def page_text(self, i):
+        page = self._pdf[i]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range().replace("\r\n", "\n").strip()
+        finally:
+            textpage.close()
+            page.close()
+
+    def close(self):
+        self._pdf.close()
+
+
+class FallbackBackend:
+    """
+    Reads pages with a fast backend and re-reads with the fallback backend only the pages that come
+    back empty or garbled. The fallback document is opened on the first page that needs it.
+    """
+
+    def __init__(self, fast, fallback):
+        self.fast = fast
+        self.fallback = fallback
+        self.name = f"{fast.name}+{fallback.name}"
+
+    def open(self, data, max_pages=None):
+        return _FallbackDocument(self, data, max_pages)
+
+
+class _FallbackDocument(_Document):
+    def __init__(self, backend, data, max_pages):
+        self._backend = backend
+        self._data = data
+        self._max_pages = max_pages
+        self._fallback = None
+        self.fallback_pages = 0
+        try:
+            self._fast = backend.fast.open(data, max_pages)
+        except Exception:  # The fast backend cannot parse this PDF at all
+            self._fast = None
+
+    def __len__(self):
+        return len(self._fast) if self._fast is not None else len(self._fallback_document())
+
+    def _fallback_document(self):
+        if self._fallback is None:
+            self._fallback = self._backend.fallback.open(self._data, self._max_pages)
+        return self._fallback
+
+    def page_text(self, i):
+        if self._fast is not None:
+            try:
+                text = self._fast.page_text(i)
+                if not looks_garbled(text):
+                    return text
+            except Exception:
+                pass
+        self.fallback_pages += 1
+        return self._fallback_document().page_text(i)
+
+    def close(self):
+        for document in (self._fast, self._fallback):
+            if document is not None:
+                document.close()
+
+
+BACKENDS = {
+    "pdfplumber": PdfplumberBackend,
+    "pdfminer": PdfminerBackend,
+    "pdfium": PdfiumBackend,
+}
+
+
+def available_backends():
+    """Returns the names of the backends whose libraries are installed."""
+    return [name for name in BACKENDS if name != "pdfium" or pypdfium2 is not None]
+
+
+def get_backend(name=BACKEND):
+    """
+    Returns the extraction backend with this name.
+
+    "auto" picks the first installed of FAST_BACKENDS. Fast backends fall back to pdfplumber page by
+    page; "pdfplumber" returns pdfplumber alone.
+    """
+    if name == "auto":
+        name = next(fast for fast in FAST_BACKENDS if fast in available_backends())
+    if name not in available_backends():
+        raise ValueError(f"Unknown or unavailable text extraction backend: {name}")
+    if name == PdfplumberBackend.name:
+        return PdfplumberBackend()
+    return FallbackBackend(BACKENDS[name](), PdfplumberBackend())
@@ -1,28 +1,14 @@
 import pandas as pd
 import os
-from datetime import datetime, timedelta
-import pdfplumber
-import re
-
-def extract_text_from_cv(cv_file):
-    """
-    Extracts text from a CV (PDF file).
-    
-    Args:
-        cv_file (str): The CV file name.
-    
-    Returns:
-        str: The extracted text from the CV.
-    """
-    extracted_text = ""
-    try:
-        with pdfplumber.open(cv_file) as pdf:
-            for page in pdf.pages:
-                extracted_text += page.extract_text() + "\n"
-    except Exception as e:
-        print(f"Error extracting text from CV {cv_file}: {e}")
-    
-    return extracted_text.strip()
+from text_extraction import extract_text_from_cv  # Shared, cached PDF text extraction
+from matching_engine import CandidateIndex, TOKEN_PATTERN
+from candidate_matching import compute_scores, SCORING_METHODS
+from shortlist import Shortlist
+from score_store import refresh_candidate_scores, STORED_SCORES
+from bulk_loader import bulk_insert
+from slot_allocator import SlotAllocator, load_interviewer_names, DATE_FORMAT
+from db import DB_PATH, create_connection
+from metrics import print_summary
 
 def get_matching_score(cv_file, job):
     """
@@ -43,65 +29,166 @@ def get_matching_score(cv_file, job):
     cv_text_lower = cv_text.lower()
 
     # Calculate the matching score based on the number of keywords found in the CV
-    keywords = re.findall(r'\b\w+\b', job_description)  # Extract words as keywords
+    keywords = TOKEN_PATTERN.findall(job_description)  # Extract words as keywords
     score = sum(1 for keyword in keywords if keyword in cv_text_lower)
 
     return score
 
-def schedule_interviews(job_descriptions, cv_directory, threshold=60):
+def schedule_interviews(job_descriptions, cv_directory, threshold=60, scoring='keyword', top_k=None, score_matrix=None,
+                        percentile=None):
     """
     Schedules interviews for candidates based on matching scores.
     
     Args:
         job_descriptions (DataFrame): A DataFrame containing job descriptions.
         cv_directory (str): The directory containing CVs.
-        threshold (int): The minimum matching score to schedule an interview.
+        threshold (int): The minimum matching score to schedule an interview, in the units of the scorer.
+        scoring (str): 'keyword' for keyword counts, or one of the batch methods of candidate_matching (0-100):
+            'tfidf' for TF-IDF similarity, 'skills' for the share of each job's skills found in the CV, or
+            'embedding' for embedding similarity.
+        top_k (int): Schedule at most top_k candidates per job.
+        score_matrix (csr_matrix): A precomputed jobs x CVs matrix from compute_scores, with
+            CVs in sorted file name order, to reuse instead of rescoring.
+        percentile (float): Only schedule candidates at or above this percentile of each job's scores.
     
     Returns:
         list: A list of scheduled interviews.
     """
     scheduled_interviews = []
+    allocator = SlotAllocator()  # Business hours from tomorrow, one interview at a time
+
+    # Read every CV once instead of re-reading each one for every job
+    candidate_names = []
+    cv_texts = []
+    for cv_file in sorted(os.listdir(cv_directory)):
+        if cv_file.endswith('.pdf'):
+            candidate_names.append(cv_file[:-4])  # Assuming the file name is the candidate's name
+            cv_path = os.path.join(cv_directory, cv_file)  # Get the full path to the CV
+            cv_texts.append(extract_text_from_cv(cv_path))
 
-    for index, job in job_descriptions.iterrows():
+    # Keep only the best top_k candidates of each job, best first, ties by name
+    shortlist = Shortlist(top_k=top_k)
+    if scoring in SCORING_METHODS:
+        if score_matrix is None:
+            score_matrix = compute_scores(job_descriptions['Job Description'].tolist(), cv_texts, method=scoring, top_k=top_k)
+        shortlist.add_matrix(score_matrix, candidates=candidate_names)
+    else:
+        candidate_index = CandidateIndex()
+        for candidate_name, cv_text in zip(candidate_names, cv_texts):
+            candidate_index.add_candidate(candidate_name, cv_text)
+        for row, description in enumerate(job_descriptions['Job Description']):
+            for candidate_name, score in candidate_index.score_job(description):
+                shortlist.add(row, candidate_name, score)
+
+    for row, (_, job) in enumerate(job_descriptions.iterrows()):
         job_title = job['Job Title']
         print(f"Scheduling interviews for job: {job_title}")
-        
-        for cv_file in os.listdir(cv_directory):
-            if cv_file.endswith('.pdf'):
-                candidate_name = cv_file[:-4]  # Assuming the file name is the candidate's name
-                cv_path = os.path.join(cv_directory, cv_file)  # Get the full path to the CV
-                matching_score = get_matching_score(cv_path, job)  # Call the updated function
-
-                if matching_score >= threshold:  # Schedule for scores >= 20
-                    # Schedule the interview for the candidate
-                    interview_time = datetime.now() + timedelta(days=1)  # Schedule for 1 day later
-                    scheduled_interviews.append({
-                        'candidate_name': candidate_name,
-                        'job_title': job_title,
-                        'matching_score': matching_score,
-                        'interview_time': interview_time.strftime("%Y-%m-%d %H:%M:%S")  # Format the date and time
-                    })
-                    print(f"Scheduled interview for {candidate_name} with score: {matching_score} at {interview_time.strftime('%Y-%m-%d %H:%M:%S')}")
+
+        for candidate_name, matching_score in shortlist.ranked(row, percentile=percentile):
+            if matching_score < threshold:
+                break
+            # Schedule the interview for the candidate in the next free slot
+            slot = allocator.allocate(candidate_name)
+            if slot is None:
+                print(f"No free interview slot left for {candidate_name}")
+                continue
+            interview_time = slot[0].strftime(DATE_FORMAT)  # Format the date and time
+            scheduled_interviews.append({
+                'candidate_name': candidate_name,
+                'job_title': job_title,
+                'matching_score': matching_score,
+                'interview_time': interview_time
+            })
+            print(f"Scheduled interview for {candidate_name} with score: {matching_score} at {interview_time}")
 
     return scheduled_interviews
 
-def main():
-    job_description_path = r"C:\Users\Nandini\Desktop\Job Screening AI\data\job_description.csv"
-    
+def schedule_interviews_from_scores(conn, threshold=10, save=True, top_k=None, percentile=None, scoring='tfidf'):
+    """
+    Schedules interviews from the stored scores, or the stored skills, instead of rescoring PDFs.
+
+    Candidates are given slots best score first, from the interviewers' availability and around the
+    interviews already booked. Candidates who already have an interview for a job are skipped.
+
+    Args:
+        conn (Connection): The database connection.
+        threshold (float): The minimum score (0-100) to schedule an interview.
+        save (bool): Whether to record the interviews in the interview_schedules table.
+        top_k (int): Schedule at most top_k candidates per job.
+        percentile (float): Only schedule candidates at or above this percentile of each job's scores.
+        scoring (str): 'tfidf' for the candidate_scores table, or 'skills' for the skill overlap scores
+            of the candidate_skill_scores table.
+
+    Returns:
+        list: A list of scheduled interviews.
+    """
+    refresh_candidate_scores(conn)  # No-op unless jobs or CVs changed since the last run
+
+    # Percentiles are taken over every stored score of a job, not just those above the threshold
+    shortlist = Shortlist(top_k=top_k, threshold=threshold)
+    for job_id, job_title, candidate_id, candidate_name, _, score in STORED_SCORES[scoring](conn, min_score=0 if percentile else threshold):
+        shortlist.add((job_id, job_title), (candidate_id, candidate_name), score)
+    # Best scores get the earliest slots, whatever the job
+    matches = sorted(shortlist.items(percentile=percentile), key=lambda item: -item[2])
+
+    if save:
+        # Hold the write lock from reading the existing bookings until the new ones are saved, so the
+        # app and other runs never hand out the same slot
+        conn.execute('BEGIN IMMEDIATE')
     try:
-        job_descriptions = pd.read_csv(job_description_path, encoding='ISO-8859-1')
-    except Exception as e:
-        print(f"Error loading job descriptions: {e}")
-        return  # Exit if there's an error loading the CSV
+        allocator = SlotAllocator.from_database(conn)
+        interviewer_names = load_interviewer_names(conn)
+        already_scheduled = {(candidate_id, job_id) for candidate_id, job_id in conn.execute('SELECT candidate_id, job_id FROM interview_schedules')}
 
-    cv_directory = r"C:\Users\Nandini\Desktop\Job Screening AI\data\cv"
-    
-    scheduled_interviews = schedule_interviews(job_descriptions, cv_directory)
+        scheduled_interviews = []
+        rows = []
+        unscheduled = 0
+        for (job_id, job_title), (candidate_id, candidate_name), score in matches:
+            if (candidate_id, job_id) in already_scheduled:
+                continue  # Counts towards the job's top_k, but is not booked twice
+            slot = allocator.allocate(candidate_id)
+            if slot is None:
+                unscheduled += 1
+                continue
+            start, interviewer_id = slot
+            interview_time = start.strftime(DATE_FORMAT)
+            scheduled_interviews.append({
+                'candidate_name': candidate_name,
+                'job_title': job_title,
+                'matching_score': score,
+                'interview_time': interview_time,
+                'interviewer': interviewer_names.get(interviewer_id)
+            })
+            rows.append((candidate_id, job_id, interviewer_id, interview_time))
+
+        if save:
+            bulk_insert(conn, 'interview_schedules', ['candidate_id', 'job_id', 'interviewer_id', 'interview_date'], rows,
+                        commit=False)
+            conn.commit()
+    except Exception:
+        if save:
+            conn.rollback()
+        raise
+
+    if unscheduled:
+        print(f"{unscheduled} shortlisted candidates could not be given a slot; add interviewer availability.")
+    return scheduled_interviews
+
+def main():
+    database = DB_PATH
+
+    conn = create_connection(database)
+    if conn is None:
+        return  # Exit if there's an error opening the database
+
+    scheduled_interviews = schedule_interviews_from_scores(conn)
+    conn.close()
 
     # Output the scheduled interviews
     print("\nScheduled Interviews:")
     for interview in scheduled_interviews:
         print(f"Candidate: {interview['candidate_name']}, Job Title: {interview['job_title']}, Score: {interview['matching_score']}, Interview Time: {interview['interview_time']}")
+    print_summary()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,180 @@
+# job_description_loader.py
+
+import codecs
+import csv
+import io
+import os
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from bulk_loader import BATCH_SIZE
+from section_parser import parse_job_sections
+from metrics import counter, timed
+
+SNIFF_BYTES = 1 << 20  # Bytes read from the start of the file to pick its encoding
+CHUNK_SIZE = BATCH_SIZE  # Job descriptions per chunk; one bulk insert transaction or summarizer call each
+FIELD_SIZE_LIMIT = 16 * 1024 * 1024  # Longest CSV field accepted, in characters (the csv default is 128 KiB)
+TITLE_COLUMN = "Job Title"
+DESCRIPTION_COLUMN = "Job Description"
+FALLBACK_ERRORS = "job_csv_fallback"  # Codec error handler for bytes the sniffed encoding cannot decode
+# Errors raised while streaming a file that is not a readable job description CSV: csv.Error for
+# malformed rows and over-long fields, ValueError (UnicodeDecodeError included) for undecodable text
+READ_ERRORS = (csv.Error, ValueError)
+
+
+class JobDescription(NamedTuple):
+    """One row of a job description CSV."""
+    title: str
+    description: str  # As written in the file, stripped
+    cleaned: str  # clean_job_description(description), as sent to the summarizer
+    parsed: str  # parse_description(description), as stored by data_insertion
+
+
+def clean_job_description(description):
+    """
+    Cleans the job description by removing unnecessary whitespace and formatting.
+
+    Args:
+        description (str): The raw job description text.
+
+    Returns:
+        str: The cleaned job description.
+    """
+    # Collapse every run of whitespace, newlines included, to one space and trim the ends; the same
+    # result as re.sub(r'\s+', ' ', description).strip(), several times faster on long descriptions
+    return " ".join(description.split())
+
+
+@timed("regex_parse_seconds", "Time spent parsing sections out of CV and job description text", kind="job_description")
+def parse_description(description):
+    """Parse the job description to extract sections."""
+    # Find every section header in one pass over the text
+    sections = parse_job_sections(description)
+
+    # Combine sections back into a single description if needed
+    combined_description = f"Description: {sections['Description']}\nQualification: {sections['Qualification']}\nResponsibilities: {sections['Responsibilities']}"
+
+    return combined_description
+
+
+def _decode_fallback(error):
+    """Decodes bytes the sniffed encoding rejects as windows-1252, or latin-1 for the bytes windows-1252 leaves undefined."""
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    text = []
+    for byte in error.object[error.start:error.end]:
+        try:
+            text.append(bytes([byte]).decode("windows-1252"))
+        except UnicodeDecodeError:
+            text.append(chr(byte))
+    counter("job_csv_fallback_bytes_total", "Job description CSV bytes decoded as windows-1252 after the sniffed encoding failed").inc(len(text))
+    return "".join(text), error.end
+
+
+codecs.register_error(FALLBACK_ERRORS, _decode_fallback)
+
+
+def sniff_encoding(prefix):
+    """
+    Picks the encoding of a job description CSV from the first bytes of the file.
+
+    ATS exports are either UTF-8 (possibly with a byte order mark) or windows-1252. A multi-byte
+    character cut off at the end of the prefix does not count against UTF-8.
+    """
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "windows-1252"
+
+
+def _columns(header):
+    """Returns the indexes of the title and description columns, by name, or the first two columns."""
+    names = [name.strip().lower() for name in header]
+    if TITLE_COLUMN.lower() in names and DESCRIPTION_COLUMN.lower() in names:
+        return names.index(TITLE_COLUMN.lower()), names.index(DESCRIPTION_COLUMN.lower())
+    return 0, 1
+
+
+@contextmanager
+def _field_size_limit(limit):
+    """
+    Raises the csv module's field size limit to at least limit, and restores it on exit.
+
+    The limit is process-wide, so it is only raised while rows are being read, never while the
+    caller holds a chunk between reads.
+    """
+    previous = csv.field_size_limit()
+    csv.field_size_limit(max(previous, limit))
+    try:
+        yield
+    finally:
+        csv.field_size_limit(previous)
+
+
+@timed("job_csv_read_seconds", "Time spent reading, cleaning and parsing job description CSVs")
+def _read_chunk(rows, title_column, description_column, chunk_size):
+    chunk = []
+    with _field_size_limit(FIELD_SIZE_LIMIT):
+        for row in rows:
+            if len(row) <= max(title_column, description_column):
+                continue  # Blank or truncated row
+            description = row[description_column].strip()
+            chunk.append(JobDescription(row[title_column].strip(), description,
+                                        clean_job_description(description), parse_description(description)))
+            if len(chunk) >= chunk_size:
+                break
+    return chunk
+
+
+def iter_job_description_chunks(source, chunk_size=CHUNK_SIZE, encoding=None):
+    """
+    Streams a job description CSV in a single pass, as lists of JobDescription records.
+
+    The encoding is sniffed once from the first SNIFF_BYTES bytes. Bytes later in the file that it
+    cannot decode are read as windows-1252 instead of failing the whole load part way through. Only
+    one chunk is held in memory at a time, so files of any size can be loaded.
+
+    Args:
+        source (str or file): A path, or a binary file object that supports seek (e.g. an upload).
+        chunk_size (int): Records per chunk.
+        encoding (str): Skip sniffing and decode with this encoding.
+
+    Yields:
+        list: Up to chunk_size JobDescription records, in file order.
+
+    Raises:
+        One of READ_ERRORS if the file turns out not to be a readable CSV; the chunks already
+        yielded stand.
+    """
+    binary = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    text = None
+    try:
+        if encoding is None:
+            start = binary.tell()
+            encoding = sniff_encoding(binary.read(SNIFF_BYTES))
+            binary.seek(start)
+        text = io.TextIOWrapper(binary, encoding=encoding, errors=FALLBACK_ERRORS, newline="")
+        rows = csv.reader(text)
+        with _field_size_limit(FIELD_SIZE_LIMIT):
+            title_column, description_column = _columns(next(rows, []))
+        rows_read = counter("job_csv_rows_total", "Job descriptions read from CSV files")
+        while True:
+            chunk = _read_chunk(rows, title_column, description_column, chunk_size)
+            if not chunk:
+                return
+            rows_read.inc(len(chunk), encoding=encoding)
+            yield chunk
+    finally:
+        if text is not None:
+            text.detach()  # Leave the binary file open for the caller's own close below
+        if binary is not source:
+            binary.close()
+
+
+def iter_job_descriptions(source, encoding=None):
+    """Streams a job description CSV one JobDescription record at a time."""
+    for chunk in iter_job_description_chunks(source, encoding=encoding):
+        yield from chunk
@@ -1,10 +1,15 @@
 # job_description_summarizer.py
 
-import pandas as pd
 from ollama_model import OllamaModel
-import re
+from job_description_loader import clean_job_description, iter_job_description_chunks
 import sys
 import io
+import os
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from metrics import counter, timer, print_summary
 
 # Set the encoding for standard output to UTF-8
 if sys.platform == "win32":
@@ -13,6 +18,102 @@ if sys.platform == "win32":
 # Define the model name
 model_name = "tinyllama:latest"  # Replace with the actual model name you are using
 
+# Summary cache location and how many descriptions are summarized at once
+SUMMARY_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "summary_cache.db")
+SUMMARY_CONCURRENCY = 4
+
+class SummarizationService:
+    """
+    Summarizes job descriptions with one long-lived model client and an SQLite summary cache.
+
+    Summaries are cached under a hash of the cleaned description and the model name, so the same
+    description is only ever sent to the model once. Uncached descriptions are summarized concurrently,
+    up to the configured concurrency limit.
+    """
+
+    def __init__(self, model_name=model_name, cache_path=SUMMARY_CACHE_PATH, concurrency=SUMMARY_CONCURRENCY):
+        self.model_name = model_name
+        self.model = OllamaModel(model_name=model_name)
+        self.cache_path = cache_path
+        self.concurrency = concurrency
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS summary_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    summary TEXT NOT NULL
+                )
+            ''')
+
+    def _connect(self):
+        return sqlite3.connect(self.cache_path, timeout=30)
+
+    def cache_key(self, cleaned_description):
+        """Builds the cache key for an already cleaned description."""
+        return hashlib.sha256(f"{self.model_name}\0{cleaned_description}".encode("utf-8")).hexdigest()
+
+    def summarize(self, job_description):
+        """Summarizes a single job description, using the cache when possible."""
+        return self.summarize_many([job_description])[0]
+
+    def summarize_many(self, job_descriptions):
+        """
+        Summarizes a list of job descriptions.
+
+        Args:
+            job_descriptions (list): Raw job description texts.
+
+        Returns:
+            list: The summaries, in the same order as the descriptions.
+        """
+        cleaned = [clean_job_description(description) for description in job_descriptions]
+        keys = [self.cache_key(description) for description in cleaned]
+
+        summaries = {}
+        with self._connect() as conn:
+            unique_keys = list(set(keys))
+            for start in range(0, len(unique_keys), 500):  # Stay below SQLite's bound parameter limit
+                chunk = unique_keys[start:start + 500]
+                rows = conn.execute(f"SELECT key, summary FROM summary_cache WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+                summaries.update(rows)
+
+        # Each distinct uncached description is sent to the model once
+        missing = {key: description for key, description in zip(keys, cleaned) if key not in summaries}
+        requests = counter("summary_cache_requests_total", "Job description summary cache lookups")
+        requests.inc(len(keys) - len(missing), result="hit")
+        requests.inc(len(missing), result="miss")
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                results = executor.map(self._summarize_uncached, missing.items())
+                summaries.update(zip(missing, results))
+
+        return [summaries[key] for key in keys]
+
+    def _summarize_uncached(self, item):
+        key, description = item
+        try:
+            with timer("summarization_seconds", "Time spent waiting for the model to summarize a job description").time():
+                summary = self.model.summarize(description, raise_errors=True)
+        except Exception as e:
+            counter("summarization_errors_total", "Job descriptions the model failed to summarize").inc()
+            return f"An error occurred: {str(e)}"  # Errors are returned but never cached
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO summary_cache (key, model, summary) VALUES (?, ?, ?)',
+                         (key, self.model_name, summary))
+        return summary
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_summarization_service():
+    """Returns the shared summarization service, creating it on first use."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = SummarizationService()
+    return _service
+
 def summarize_job_description(job_description):
     """ 
     Summarizes the given job description using the TinyLlama model.
@@ -23,8 +124,7 @@ def summarize_job_description(job_description):
     Returns:
         str: The summarized text.
     """
-    model = OllamaModel(model_name=model_name)
-    return model.summarize(job_description)
+    return get_summarization_service().summarize(job_description)
 
 def read_job_descriptions_from_csv(file_path):
     """ 
@@ -34,53 +134,38 @@ def read_job_descriptions_from_csv(file_path):
         file_path (str): The path to the CSV file.
 
     Returns:
-        list: A list of tuples containing job titles and descriptions.
+        list: A list of tuples containing job titles and cleaned descriptions.
     """
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path, encoding='latin1')  # or use encoding='cp1252'
-        
-        # Assuming the CSV has columns named 'Job Title' and 'Job Description'
-        job_data = list(zip(df['Job Title'], df['Job Description']))
-        
-        # Clean and format job descriptions
-        cleaned_job_data = []
-        for title, description in job_data:
-            cleaned_description = clean_job_description(description)
-            cleaned_job_data.append((title, cleaned_description))
-        
-        return cleaned_job_data
+        return [(job.title, job.cleaned) for chunk in iter_job_description_chunks(file_path) for job in chunk]
     except Exception as e:
         print(f"An error occurred while reading the CSV file: {str(e)}")
         return []
 
-def clean_job_description(description):
-    """ 
-    Cleans the job description by removing unnecessary whitespace and formatting.
+def summarize_job_descriptions_from_csv(file_path):
+    """
+    Summarizes every job description in a CSV file, one chunk of the file at a time.
 
     Args:
-        description (str): The raw job description text.
+        file_path (str): The path to the CSV file.
 
-    Returns:
-        str: The cleaned job description.
+    Yields:
+        tuple: (job title, summary) pairs, in file order.
     """
-    description = re.sub(r'\n+', '\n', description)  # Replace multiple newlines with a single newline
-    description = re.sub(r'\s+', ' ', description)   # Replace multiple spaces with a single space
-    description = description.strip()  # Remove leading and trailing whitespace
-
-    return description
+    service = get_summarization_service()
+    for chunk in iter_job_description_chunks(file_path):
+        summaries = service.summarize_many([job.cleaned for job in chunk])
+        yield from zip((job.title for job in chunk), summaries)
 
 if __name__ == "__main__":
     # Path to the CSV file
     csv_file_path = "C:\\Users\\Nandini\\Desktop\\Job Screening AI\\data\\job_description.csv"  # Update this path
 
-    # Read job titles and descriptions from the CSV file
-    job_data = read_job_descriptions_from_csv(csv_file_path)
-
-    for job_title, description in job_data:
+    # Stream job titles and descriptions from the CSV file, so only one chunk is held in memory
+    for job_title, summary in summarize_job_descriptions_from_csv(csv_file_path):
         print("Job Title:", job_title)
-        summary = summarize_job_description(description)
         print("Summary:", summary)
         print("-" * 40)
 
-    print("Summarization complete.")
\ No newline at end of file
+    print("Summarization complete.")
+    print_summary()
\ No newline at end of file
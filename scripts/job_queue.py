@@ -0,0 +1,177 @@
+# job_queue.py
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from db import get_pool
+
+POLL_INTERVAL = 1.0  # Seconds an idle worker waits before checking the queue again
+HEARTBEAT_INTERVAL = 10.0  # Seconds between renewals of the claims on this process's running jobs
+CLAIM_TIMEOUT = 60.0  # A running job whose claim has not been renewed for this long is taken over
+
+
+class JobQueue:
+    """
+    SQLite-backed background job queue with a local pool of worker threads.
+
+    Jobs are stored in the background_jobs table, so queued work survives a restart. A running job
+    records the process that claimed it, which renews the claim every HEARTBEAT_INTERVAL seconds;
+    a job whose claim has expired, because its process stopped, is picked up again by any worker.
+    Jobs still being run by another live process are left alone.
+    """
+
+    def __init__(self, db_path, workers=2):
+        self.db_path = db_path
+        self._pool = get_pool(db_path)
+        self.workers = workers
+        self.handlers = {}
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"  # Claims made by this queue
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS background_jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    claimed_by TEXT,
+                    claimed_at REAL
+                )
+            ''')
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(background_jobs)')}
+            for column, column_type in (('claimed_by', 'TEXT'), ('claimed_at', 'REAL')):
+                if column not in columns:  # Tables created before claims were recorded
+                    conn.execute(f'ALTER TABLE background_jobs ADD COLUMN {column} {column_type}')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_background_jobs_status ON background_jobs (status, created_at)')
+
+    @contextmanager
+    def _connect(self):
+        """Borrows a pooled connection and commits the block as one transaction."""
+        with self._pool.connection() as conn, conn:
+            yield conn
+
+    def register(self, kind, handler):
+        """
+        Registers the function that runs jobs of the given kind.
+
+        The handler is called as handler(payload, report_progress) and must return a JSON-serialisable
+        result; report_progress takes a fraction between 0 and 1.
+        """
+        self.handlers[kind] = handler
+
+    def submit(self, kind, payload, job_id=None):
+        """Queues a job and returns its id immediately."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('''INSERT INTO background_jobs (id, kind, status, payload, created_at, updated_at)
+                            VALUES (?, ?, 'queued', ?, ?, ?)''', (job_id, kind, json.dumps(payload), now, now))
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        """Returns the job as a dict (without its payload), or None if there is no such job."""
+        with self._connect() as conn:
+            row = conn.execute('SELECT id, kind, status, progress, result, error, created_at, updated_at '
+                               'FROM background_jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] is not None else None
+        return job
+
+    def start(self):
+        """Starts the worker threads and the claim heartbeat (once). Call it when the app starts, so jobs left by a previous run resume."""
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Asks the workers to exit once their current job is finished."""
+        self._stopping.set()
+        self._wakeup.set()
+
+    def _claim(self):
+        """
+        Atomically claims the oldest job that is queued, or running under an expired claim, and
+        returns it, or None if there is none.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            return conn.execute('''
+                UPDATE background_jobs SET status = 'running', updated_at = ?, claimed_by = ?, claimed_at = ?
+                WHERE id = (SELECT id FROM background_jobs
+                            WHERE status = 'queued' OR (status = 'running' AND (claimed_at IS NULL OR claimed_at < ?))
+                            ORDER BY created_at LIMIT 1)
+                RETURNING id, kind, payload
+            ''', (now, self.owner, now, now - CLAIM_TIMEOUT)).fetchone()
+
+    def _heartbeat(self):
+        """Renews the claims on the jobs this process is running, until the queue is stopped."""
+        while not self._stopping.wait(HEARTBEAT_INTERVAL):
+            try:
+                with self._connect() as conn:
+                    conn.execute("UPDATE background_jobs SET claimed_at = ? WHERE status = 'running' AND claimed_by = ?",
+                                 (time.time(), self.owner))
+            except Exception:
+                logging.exception("Could not renew background job claims")
+
+    def _update(self, job_id, **fields):
+        """Updates a job this process has claimed; a job taken over by another process is left alone."""
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE background_jobs SET {assignments} WHERE id = ? AND claimed_by = ?",
+                         (*fields.values(), job_id, self.owner))
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                job = self._claim()
+                if job is None:
+                    self._wakeup.wait(POLL_INTERVAL)
+                    self._wakeup.clear()
+                    continue
+                self._run(job)
+            except Exception:
+                # E.g. "database is locked" while a long write holds the database; the worker must survive it
+                logging.exception("Background job worker failed; retrying")
+                self._stopping.wait(POLL_INTERVAL)
+
+    def _run(self, job):
+        """Runs one claimed job and records its result or error."""
+        job_id = job['id']
+
+        def report_progress(fraction):
+            self._update(job_id, progress=min(max(fraction, 0.0), 1.0))
+
+        try:
+            result = self.handlers[job['kind']](json.loads(job['payload']), report_progress)
+            self._update(job_id, status='done', progress=1.0, result=json.dumps(result))
+        except Exception as e:
+            logging.exception(f"Background job {job_id} failed")
+            self._update(job_id, status='failed', error=str(e))
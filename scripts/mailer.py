@@ -0,0 +1,274 @@
+# mailer.py
+
+import logging
+import os
+import smtplib
+import socket
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from db import get_pool
+from metrics import counter, timer
+
+BATCH_SIZE = 50  # Messages sent per batch over one connection
+MAX_ATTEMPTS = 5  # Delivery attempts before a message is marked failed
+BACKOFF_BASE = 2.0  # Retry delay in seconds is BACKOFF_BASE ** attempts
+IDLE_TIMEOUT = 60.0  # Close the SMTP connection after this many idle seconds
+POLL_INTERVAL = 1.0  # Seconds the sender waits before checking the outbox again
+SMTP_TIMEOUT = 30  # Seconds one SMTP operation (connect, login, send) may block
+# A batch whose claim was last renewed this many seconds ago was abandoned by its process and is sent again.
+# The claim is renewed after every message, so this only has to outlast sending one message.
+CLAIM_TIMEOUT = 10 * SMTP_TIMEOUT
+
+
+class Mailer:
+    """
+    Outbound mail subsystem with a persisted outbox.
+
+    enqueue() only writes the message to the email_outbox table. A background sender thread picks up
+    pending messages in batches and delivers them over one kept-alive, authenticated SMTP connection,
+    retrying transient failures with exponential backoff. Each message's delivery status is recorded
+    in the outbox and can be read back with status().
+
+    Several app processes can share one outbox: a sender claims its batch (status 'sending' plus its
+    owner) before delivering it, so no message is sent by two processes. A batch whose claim is older
+    than CLAIM_TIMEOUT, because its process stopped mid-batch, is claimed again; the sender renews
+    its claim after every message, so a slow batch is never taken over while it is being sent.
+    """
+
+    def __init__(self, db_path, host, port, from_email, username=None, password=None, use_tls=True,
+                 batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS, backoff_base=BACKOFF_BASE):
+        self.db_path = db_path
+        self._pool = get_pool(db_path)
+        self.host = host
+        self.port = port
+        self.from_email = from_email
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self._smtp = None
+        self._last_used = 0.0
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"  # Claims made by this sender
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS email_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    to_email TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    next_attempt_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    sent_at REAL,
+                    claimed_by TEXT,
+                    claimed_at REAL
+                )
+            ''')
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(email_outbox)')}
+            for column, column_type in (('claimed_by', 'TEXT'), ('claimed_at', 'REAL')):
+                if column not in columns:  # Outboxes created before claims were recorded
+                    conn.execute(f'ALTER TABLE email_outbox ADD COLUMN {column} {column_type}')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_email_outbox_pending ON email_outbox (status, next_attempt_at)')
+
+    @contextmanager
+    def _connect(self):
+        """Borrows a pooled connection and commits the block as one transaction."""
+        with self._pool.connection() as conn, conn:
+            yield conn
+
+    def enqueue(self, to_email, subject, body):
+        """Adds a message to the outbox and returns its id. Delivery happens in the background."""
+        now = time.time()
+        with self._connect() as conn:
+            message_id = conn.execute('''INSERT INTO email_outbox (to_email, subject, body, next_attempt_at, created_at)
+                                         VALUES (?, ?, ?, ?, ?)''', (to_email, subject, body, now, now)).lastrowid
+        self.start()
+        self._wakeup.set()
+        return message_id
+
+    def status(self, message_id):
+        """Returns the delivery status of a message as a dict, or None if there is no such message."""
+        with self._connect() as conn:
+            row = conn.execute('SELECT id, to_email, status, attempts, last_error, created_at, sent_at '
+                               'FROM email_outbox WHERE id = ?', (message_id,)).fetchone()
+        return dict(row) if row else None
+
+    def start(self):
+        """Starts the background sender thread (once). Call it when the app starts, so messages left in the outbox are sent."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mail-sender", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Asks the sender to exit after its current batch."""
+        self._stopping.set()
+        self._wakeup.set()
+
+    def flush(self, timeout=30.0):
+        """Waits until no message is due for delivery. Returns True if the outbox drained in time."""
+        self.start()
+        self._wakeup.set()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._connect() as conn:
+                pending = conn.execute("SELECT COUNT(*) FROM email_outbox WHERE (status = 'pending' AND next_attempt_at <= ?) "
+                                       "OR status = 'sending'", (time.time(),)).fetchone()[0]
+            if not pending:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def _get_smtp(self):
+        """Returns the open SMTP connection, reconnecting and logging in only when needed."""
+        if self._smtp is not None and time.time() - self._last_used > IDLE_TIMEOUT:
+            self._close_smtp()
+        if self._smtp is None:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            self._smtp = smtp
+        self._last_used = time.time()
+        return self._smtp
+
+    def _close_smtp(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+    def _build_message(self, row):
+        msg = MIMEMultipart()
+        msg['From'] = self.from_email
+        msg['To'] = row['to_email']
+        msg['Subject'] = row['subject']
+        msg.attach(MIMEText(row['body'], 'plain'))
+        return msg
+
+    def _next_batch(self):
+        """
+        Atomically claims up to batch_size messages that are due, or whose sending claim has expired,
+        and returns them oldest first.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            batch = conn.execute('''
+                UPDATE email_outbox SET status = 'sending', claimed_by = ?, claimed_at = ?
+                WHERE id IN (SELECT id FROM email_outbox
+                             WHERE (status = 'pending' AND next_attempt_at <= ?) OR (status = 'sending' AND claimed_at < ?)
+                             ORDER BY next_attempt_at LIMIT ?)
+                RETURNING *
+            ''', (self.owner, now, now, now - CLAIM_TIMEOUT, self.batch_size)).fetchall()
+        return sorted(batch, key=lambda row: (row['next_attempt_at'], row['id']))
+
+    def _record(self, updates):
+        """Records delivery outcomes for messages this sender still has claimed, and releases the claims."""
+        with self._connect() as conn:
+            conn.executemany('''UPDATE email_outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?,
+                                sent_at = ?, claimed_by = NULL, claimed_at = NULL
+                                WHERE id = ? AND claimed_by = ?''', [(*update, self.owner) for update in updates])
+
+    def _send_batch(self, batch):
+        """Delivers a batch over one connection and records the outcome of every message."""
+        send_time = timer("smtp_send_seconds", "Time spent handing one email to the SMTP server, including reconnects")
+        outcomes = counter("emails_total", "Email delivery attempts by outcome")
+        updates = []
+        for i, row in enumerate(batch):
+            attempts = row['attempts'] + 1
+            try:
+                with send_time.time():
+                    self._get_smtp().send_message(self._build_message(row))
+                updates.append(('sent', attempts, None, row['next_attempt_at'], time.time(), row['id']))
+                outcomes.inc(outcome="sent")
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused) as e:
+                # The server rejected this message outright; retrying will not help
+                updates.append(('failed', attempts, str(e), row['next_attempt_at'], None, row['id']))
+                outcomes.inc(outcome="rejected")
+            except (smtplib.SMTPException, OSError) as e:
+                outcomes.inc(outcome="error")
+                self._close_smtp()  # The connection is likely broken; reconnect on the next attempt
+                logging.warning(f"Email {row['id']} to {row['to_email']} failed (attempt {attempts}): {e}")
+                retry_at = time.time() + self.backoff_base ** attempts
+                if attempts >= self.max_attempts:
+                    updates.append(('failed', attempts, str(e), row['next_attempt_at'], None, row['id']))
+                else:
+                    updates.append(('pending', attempts, str(e), retry_at, None, row['id']))
+                # Back off the rest of the batch too instead of hammering a server that is down
+                for rest in batch[i + 1:]:
+                    updates.append(('pending', rest['attempts'], rest['last_error'], retry_at, None, rest['id']))
+                break
+            except Exception as e:
+                # The message itself cannot be built or encoded (e.g. a non-ASCII address); retrying will not help
+                logging.warning(f"Email {row['id']} to {row['to_email']} is invalid: {e}")
+                updates.append(('failed', attempts, str(e), row['next_attempt_at'], None, row['id']))
+                outcomes.inc(outcome="invalid")
+            self._renew_claim()
+        self._record(updates)
+
+    def _renew_claim(self):
+        """Keeps the rest of the batch claimed while it is being sent."""
+        try:
+            with self._connect() as conn:
+                conn.execute("UPDATE email_outbox SET claimed_at = ? WHERE status = 'sending' AND claimed_by = ?",
+                             (time.time(), self.owner))
+        except Exception:
+            logging.exception("Could not renew the outbox claim")
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                batch = self._next_batch()
+                if not batch:
+                    if self._smtp is not None and time.time() - self._last_used > IDLE_TIMEOUT:
+                        self._close_smtp()
+                    self._wakeup.wait(POLL_INTERVAL)
+                    self._wakeup.clear()
+                    continue
+                self._send_batch(batch)
+            except Exception:
+                # E.g. "database is locked"; a batch left claimed is sent again once its claim expires
+                logging.exception("Mail sender failed; retrying")
+                self._stopping.wait(POLL_INTERVAL)
+        self._close_smtp()
+
+
+def run_debug_server(host='localhost', port=1025):
+    """
+    Runs a local stand-in SMTP server that prints every message it receives instead of delivering it.
+
+    Point a Mailer at it with use_tls=False and no username to test invitations offline.
+    Requires the aiosmtpd package.
+    """
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.handlers import Debugging
+
+    controller = Controller(Debugging(sys.stdout), hostname=host, port=port)
+    controller.start()
+    print(f"Debug SMTP server listening on {host}:{port}. Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    run_debug_server()
@@ -1,31 +1,180 @@
-from flask import Flask, request, jsonify, render_template
-import pandas as pd
-import sqlite3
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from job_description_summarizer import summarize_job_description  # Import the summarization function
-from candidate_matching import match_candidate, load_job_descriptions  # Import the matching and loading functions
-from datetime import datetime, timedelta
+from flask import Flask, Response, g, request, jsonify, render_template, stream_with_context
+import json
+import os
+import shutil
+import time
+import uuid
+from job_description_summarizer import get_summarization_service  # Import the cached summarization service
+from job_description_loader import iter_job_description_chunks, READ_ERRORS
+from candidate_matching import compute_scores, extract_job_title_from_cv, make_scorer, title_mask, SCORING_METHODS  # Import the scoring functions
+from text_extraction import extract_text_from_cv
+from upload_stream import iter_uploaded_files
+from job_queue import JobQueue
+from mailer import Mailer
+from bulk_loader import bulk_insert, insert_job_descriptions
+from score_store import refresh_candidate_scores, STORED_SCORES
+from db import DB_PATH, init_app, get_request_connection
+from shortlist import Shortlist, TOP_K, PAGE_SIZE
+from metrics import REGISTRY, timer
+from slot_allocator import SlotAllocator, load_interviewer_names, DATE_FORMAT
+from werkzeug.utils import secure_filename
 
 # Specify the full path to the templates directory
 template_dir = r'recruitment-automation\templates'
 
 app = Flask(__name__, template_folder=template_dir)
 
+# Pooled database connections; each request borrows one and returns it when the request ends
+db_pool = init_app(app, DB_PATH)
+
 # Database connection function
 def get_db_connection():
-    conn = sqlite3.connect('recruitment.db')
-    conn.row_factory = sqlite3.Row  # This allows us to access columns by name
-    return conn
+    return get_request_connection()  # Rows allow us to access columns by name
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    """Record how long each endpoint took, for /metrics."""
+    timer('http_request_seconds', 'Time spent handling HTTP requests').observe(
+        time.perf_counter() - g.request_start, endpoint=request.endpoint or 'unknown', status=response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Expose timings and counters in the Prometheus text format."""
+    return Response(REGISTRY.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+# Score above which a candidate is shortlisted, per scoring method. Every method scores from 0 to
+# 100 but on its own scale: a strong TF-IDF match scores 10-20, while skill overlap and embedding
+# similarity run much higher. Each threshold shortlists about the same share (17-19%) of the
+# pairs of the bundled CVs and job descriptions.
+SHORTLIST_THRESHOLDS = {'tfidf': 10, 'skills': 34, 'embedding': 30}
+SCORING = 'tfidf'  # Default scoring method; requests may pick another of SCORING_METHODS with 'scoring'
+TOP_SCORES_SHOWN = 50  # Precomputed matches listed on the index page
+
+# Background jobs: uploads are saved under UPLOAD_DIR and processed by JOB_WORKERS worker threads
+UPLOAD_DIR = 'uploads'
+JOB_WORKERS = 2
+job_queue = JobQueue(DB_PATH, workers=JOB_WORKERS)
+
+# Interview invitations are queued in the outbox and delivered in the background
+mailer = Mailer(DB_PATH,
+                host='smtp.example.com', port=587,  # Replace with your SMTP server
+                from_email="your_email@example.com",  # Replace with your email
+                username="your_email@example.com",
+                password="your_password")  # Replace with your email password
+
+# Most recent (key, jobs x CVs score matrix), shared by /match_candidates and /schedule_interviews
+last_score_matrix = (None, None)
+
+def load_jobs():
+    """Load every job description row from the database."""
+    # Also called from background jobs, which run outside any request
+    with db_pool.connection() as conn:
+        return conn.execute('SELECT * FROM job_descriptions').fetchall()
+
+def get_score_matrix(job_descriptions, cv_files, progress=None, scoring=SCORING, top_k=None):
+    """
+    Scores every uploaded CV against every job in one batch, with TF-IDF by default. Whatever the
+    scoring method, a CV only scores against jobs whose title is similar to the job title in the CV
+    (see candidate_matching.title_mask); every other pair scores 0.
+
+    The matrix is reused when the same jobs and CVs are submitted again (e.g. matching and then
+    scheduling the same upload), so the CVs are only scored once.
+
+    Args:
+        job_descriptions (list): Job description rows.
+        cv_files (list): (filename, file or path) pairs.
+        progress (callable): Optional callback receiving the fraction of CVs read so far.
+        scoring (str): One of SCORING_METHODS.
+        top_k (int): If given, only the top_k scores per job are computed and kept; embedding
+            scoring then finds them through the embedding store's ANN index.
+
+    Returns:
+        tuple: (candidate_names, score_matrix) with one matrix column per candidate name.
+    """
+    global last_score_matrix
+    candidate_names = []
+    cv_texts = []
+    for i, (filename, cv_file) in enumerate(cv_files):
+        if filename.endswith('.pdf'):
+            candidate_names.append(filename[:-4])  # Assuming the file name is the candidate's name
+            cv_texts.append(extract_text_from_cv(cv_file))
+        if progress:
+            progress((i + 1) / len(cv_files) * 0.9)
+
+    key = (scoring, top_k, tuple(job['id'] for job in job_descriptions), tuple(hash(text) for text in cv_texts))
+    cached = last_score_matrix
+    if cached[0] != key:
+        mask = title_mask([job['title'] for job in job_descriptions], [extract_job_title_from_cv(text) for text in cv_texts])
+        cached = (key, compute_scores([job['description'] for job in job_descriptions], cv_texts,
+                                      method=scoring, top_k=top_k, mask=mask))
+        last_score_matrix = cached
+    return candidate_names, cached[1]
+
+def shortlist_options(values, paginate=True):
+    """
+    Reads the shortlisting options of a request: top_k (candidates kept per job), percentile
+    (per-job percentile cutoff for the shortlist), scoring (one of SCORING_METHODS; unknown methods
+    fall back to SCORING) and, when paginate is set, page and page_size.
+    """
+    scoring = values.get('scoring', SCORING)
+    options = {'top_k': values.get('top_k', TOP_K, type=int), 'percentile': values.get('percentile', None, type=float),
+               'scoring': scoring if scoring in SCORING_METHODS else SCORING}
+    if paginate:
+        options['page'] = values.get('page', 1, type=int)
+        options['page_size'] = values.get('page_size', PAGE_SIZE, type=int)
+    return options
+
+def build_shortlist(job_descriptions, cv_files, progress=None, top_k=TOP_K, scoring=SCORING, percentile=None):
+    """Score CVs against every job and keep the top_k candidates of each job."""
+    # Only the top_k scores of each job are computed, unless a percentile cutoff needs every score
+    candidate_names, scores = get_score_matrix(job_descriptions, cv_files, progress, scoring,
+                                               top_k=top_k if percentile is None else None)
+    shortlist = Shortlist(top_k=top_k)
+    shortlist.add_matrix(scores)  # Only candidates with a matching score greater than 0 are stored in the matrix
+    return candidate_names, shortlist
+
+def match_uploaded_candidates(job_descriptions, cv_files, progress=None, top_k=TOP_K, percentile=None,
+                              page=1, page_size=PAGE_SIZE, scoring=SCORING):
+    """
+    Score CVs against every job and return one page of the best matches of each job, plus the
+    shortlisted candidates: those among the matches above the shortlist threshold and, if given,
+    the per-job percentile.
+    """
+    candidate_names, shortlist = build_shortlist(job_descriptions, cv_files, progress, top_k, scoring, percentile)
+
+    matches = shortlist.page(page, page_size)
+    results = [{
+        'Candidate Name': candidate_names[candidate],
+        'Job Title': job_descriptions[row]['title'],
+        'Matching Score': matching_score
+    } for row, candidate, matching_score in matches.pop('items')]
+
+    shortlisted_candidates = [{
+        'Candidate Name': candidate_names[candidate],
+        'Job Title': job_descriptions[row]['title']  # Removed the Email field
+    } for row, candidate, _ in shortlist.items(threshold=SHORTLIST_THRESHOLDS[scoring], percentile=percentile)]
+
+    return {'results': results, 'shortlisted_candidates': shortlisted_candidates, 'pagination': matches}
 
 @app.route('/')
 def index():
     """Render the main index page."""
     conn = get_db_connection()
-    scheduled_interviews = conn.execute('SELECT * FROM interviews').fetchall()
-    conn.close()
-    return render_template('index.html', scheduled_interviews=scheduled_interviews)
+    scheduled_interviews = conn.execute('''SELECT s.id, c.name AS candidate_name, j.title AS job_title, s.interview_date
+                                           FROM interview_schedules s
+                                           JOIN candidates c ON c.id = s.candidate_id
+                                           JOIN job_descriptions j ON j.id = s.job_id
+                                           ORDER BY s.interview_date''').fetchall()
+    # Precomputed TF-IDF or skill overlap scores; nothing is rescored to render the page
+    scoring = request.args.get('scoring', SCORING)
+    scoring = scoring if scoring in STORED_SCORES else SCORING
+    top_scores = STORED_SCORES[scoring](conn, min_score=SHORTLIST_THRESHOLDS[scoring], limit=TOP_SCORES_SHOWN)
+    return render_template('index.html', scheduled_interviews=scheduled_interviews, top_scores=top_scores)
 
 @app.route('/upload_job_descriptions', methods=['POST'])
 def upload_job_descriptions():
@@ -37,35 +186,38 @@ def upload_job_descriptions():
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
 
-    # Read job titles and descriptions from the uploaded CSV file
+    # Stream job titles and descriptions from the uploaded CSV file, one chunk at a time
+    conn = get_db_connection()
+    summaries = []
+    inserted = 0
+    error = None
     try:
-        job_descriptions = load_job_descriptions(file)
-    except Exception as e:
-        return jsonify({'error': f'Error reading job descriptions: {str(e)}'}), 400
-
-    if job_descriptions is None or job_descriptions.empty:
+        for chunk in iter_job_description_chunks(file.stream):
+            # Cached summaries are reused; only new descriptions reach the model, several at a time
+            chunk_summaries = get_summarization_service().summarize_many([job.cleaned for job in chunk])
+            summaries.extend({'Job Title': job.title, 'Summary': summary} for job, summary in zip(chunk, chunk_summaries))
+
+            # Insert job descriptions into the database; each chunk is committed as it is read
+            inserted += len(insert_job_descriptions(conn, [(job.title, job.description) for job in chunk]))
+    except READ_ERRORS as e:
+        error = f'Error reading job descriptions after {inserted} were saved: {str(e)}'
+
+    if inserted:
+        # Rescore stored candidates against the new jobs in the background, including the jobs
+        # saved before a malformed row stopped the upload
+        job_queue.submit('refresh_scores', {})
+
+    if error:
+        return jsonify({'error': error, 'inserted_jobs': inserted, 'summaries': summaries}), 400
+    if not summaries:
         return jsonify({'error': 'No job descriptions found in the uploaded file.'}), 400
 
-    summaries = []
-    conn = get_db_connection()
-    for index, job in job_descriptions.iterrows():
-        summary = summarize_job_description(job['Job Description'])
-        summaries.append({'Job Title': job['Job Title'], 'Summary': summary})
-
-        # Insert job description into the database
-        conn.execute('INSERT INTO job_descriptions (job_title, job_description) VALUES (?, ?)',
-                     (job['Job Title'], job['Job Description']))
-    conn.commit()
-    conn.close()
-
-    return jsonify({'summaries': summaries})
+    return jsonify({'summaries': summaries, 'inserted_jobs': inserted})
 
 @app.route('/match_candidates', methods=['POST'])
 def match_candidates():
     """Match candidates' CVs against job descriptions and return matching scores."""
-    conn = get_db_connection()
-    job_descriptions = conn.execute('SELECT * FROM job_descriptions').fetchall()
-    conn.close()
+    job_descriptions = load_jobs()
 
     if not job_descriptions:
         return jsonify({'error': 'No job descriptions uploaded. Please upload job descriptions first.'}), 400
@@ -78,79 +230,140 @@ def match_candidates():
     if not cv_files:
         return jsonify({'error': 'No CV files uploaded'}), 400
 
-    results = []
-    shortlisted_candidates = []  # List to store candidates with matching scores > 50
-    for job in job_descriptions:
-        job_title = job['job_title']  # Adjust this based on your database structure
-        
-        for cv_file in cv_files:
-            if cv_file.filename.endswith('.pdf'):
-                matching_score = match_candidate(cv_file, job)  # Pass the CV file and job
-                
-                candidate_name = cv_file.filename[:-4]  # Assuming the file name is the candidate's name
-                
-                # Append the result only if the matching score is greater than 0
-                if matching_score > 0:
-                    results.append({
-                        'Candidate Name': candidate_name,
-                        'Job Title': job_title,
-                        'Matching Score': matching_score
-                    })
-                    
-                    # Check if the matching score is greater than 50
-                    if matching_score > 50:
-                        shortlisted_candidates.append({
-                            'Candidate Name': candidate_name,
-                            'Job Title': job_title  # Removed the Email field
-                        })
+    return jsonify(match_uploaded_candidates(job_descriptions, [(cv_file.filename, cv_file) for cv_file in cv_files],
+                                             **shortlist_options(request.values)))
 
-    return jsonify({'results': results, 'shortlisted_candidates': shortlisted_candidates})
+@app.route('/match_candidates/stream', methods=['POST'])
+def match_candidates_stream():
+    """
+    Match uploaded CVs against job descriptions one file at a time, streaming scores as NDJSON.
 
-INTERVIEW_INTERVAL = timedelta(minutes=30)  # Change to timedelta(hours=1) for 1-hour intervals
+    Each CV is read from the request body once, scored against every job and its results sent
+    before the next CV is read, so large uploads neither time out nor have to fit in memory.
+    """
+    job_descriptions = load_jobs()
 
-@app.route('/schedule_interviews', methods=['POST'])
-def schedule_interviews_route():
-    """Schedule interviews for candidates based on matching scores and send email invitations."""
-    global job_descriptions  # Use the global variable to access job descriptions
-
-    if job_descriptions is None:
+    if not job_descriptions:
         return jsonify({'error': 'No job descriptions uploaded. Please upload job descriptions first.'}), 400
 
-    if 'cv_files' not in request.files:
+    boundary = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not boundary:
         return jsonify({'error': 'No CV files uploaded'}), 400
 
-    cv_files = request.files.getlist('cv_files')
-    threshold = 50  # Set your threshold for scheduling interviews
-    global scheduled_interviews
-    scheduled_interviews = []  # Reset scheduled interviews
-
-    # Start scheduling from the current time
-    current_time = datetime.now()
-
-    for index, job in job_descriptions.iterrows():
-        job_title = job['Job Title']  # Adjust this based on your CSV structure
-        
-        for cv_file in cv_files:
-            if cv_file.filename.endswith('.pdf'):
-                matching_score = match_candidate(cv_file, job)  # Calculate matching score
-                
-                candidate_name = cv_file.filename[:-4]  # Assuming the file name is the candidate's name
-                
-                # Schedule interview if matching score is greater than the threshold
-                if matching_score > threshold:
-                    email = candidate_name + "@example.com"  # Placeholder for candidate's email
+    # Only the query string: reading form values would consume the body before it can be streamed
+    scoring = shortlist_options(request.args, paginate=False)['scoring']
+    scorer = make_scorer([job['description'] for job in job_descriptions], scoring)
+    threshold = SHORTLIST_THRESHOLDS[scoring]
+
+    def generate():
+        processed = 0
+        for filename, cv_file in iter_uploaded_files(request.stream, boundary):
+            if not filename.endswith('.pdf'):
+                continue
+            candidate_name = filename[:-4]  # Assuming the file name is the candidate's name
+            for row, matching_score in scorer.score_cv(extract_text_from_cv(cv_file)):
+                yield json.dumps({
+                    'Candidate Name': candidate_name,
+                    'Job Title': job_descriptions[row]['title'],
+                    'Matching Score': matching_score,
+                    'Shortlisted': matching_score > threshold
+                }) + '\n'
+            processed += 1
+        yield json.dumps({'done': True, 'cvs_processed': processed}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def schedule_uploaded_candidates(job_descriptions, cv_files, progress=None, top_k=TOP_K, percentile=None, scoring=SCORING):
+    """Schedule interviews for shortlisted CVs and send email invitations. Returns the scheduled interviews."""
+    threshold = SHORTLIST_THRESHOLDS[scoring]  # Set your threshold for scheduling interviews
+    scheduled_interviews = []
+
+    # Reuses the matrix computed by /match_candidates for the same upload; scoring happens before the database is locked
+    candidate_names, shortlist = build_shortlist(job_descriptions, cv_files, progress, top_k, scoring, percentile)
+
+    with db_pool.connection() as conn:
+        # Hold the write lock from reading the existing bookings until the new ones are saved, so
+        # concurrent requests and background jobs never hand out the same slot
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Slots come from interviewer availability within business hours, around interviews already booked
+            allocator = SlotAllocator.from_database(conn, by_name=True)
+            interviewer_names = load_interviewer_names(conn)
+            candidate_ids = get_candidate_ids(conn, candidate_names)
+            already_scheduled = {(candidate_id, job_id) for candidate_id, job_id in
+                                 conn.execute('SELECT candidate_id, job_id FROM interview_schedules')}
+
+            rows = []
+            for row, job in enumerate(job_descriptions):
+                job_title = job['title']
+
+                # Schedule interview if matching score is greater than the threshold (and percentile cutoff)
+                for candidate, matching_score in shortlist.ranked(row, threshold=threshold, percentile=percentile):
+                    candidate_name = candidate_names[candidate]
+                    candidate_id = candidate_ids[candidate_name]
+                    if (candidate_id, job['id']) in already_scheduled:
+                        continue  # Already has an interview for this job
+
+                    slot = allocator.allocate(candidate_name)
+                    if slot is None:
+                        continue  # Every interviewer is fully booked
+                    start, interviewer_id = slot
+                    interview_time = start.strftime(DATE_FORMAT)  # Format the date and time
+                    already_scheduled.add((candidate_id, job['id']))
+                    rows.append((candidate_id, job['id'], interviewer_id, interview_time))
+
                     scheduled_interviews.append({
                         'candidate_name': candidate_name,
                         'job_title': job_title,
                         'matching_score': matching_score,
-                        'interview_time': current_time.strftime("%Y-%m-%d %H:%M:%S")  # Format the date and time
+                        'interview_time': interview_time,
+                        'interviewer': interviewer_names.get(interviewer_id),
+                        'email_id': None
                     })
-                    
-                    # Send email invitation
-                    send_email(email, job_title, current_time.strftime("%Y-%m-%d %H:%M:%S"))
 
-                    # Increment the current time by the defined interval for the next interview
-                    current_time += INTERVIEW_INTERVAL
+            bulk_insert(conn, 'interview_schedules', ['candidate_id', 'job_id', 'interviewer_id', 'interview_date'], rows,
+                        commit=False)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    # Invitations are only queued for interviews that were saved
+    for interview in scheduled_interviews:
+        email = interview['candidate_name'] + "@example.com"  # Placeholder for candidate's email
+        # Queue the email invitation; its delivery status can be checked at /emails/<email_id>
+        interview['email_id'] = send_email(email, interview['job_title'], interview['interview_time'])
+
+    return scheduled_interviews
+
+def get_candidate_ids(conn, candidate_names):
+    """
+    Returns candidate name -> id for uploaded CVs, inside the caller's transaction.
+
+    Uploaded CVs are matched to stored candidates by name (the CV file name); CVs of candidates not
+    yet in the database get a candidates row, so their interviews can be saved.
+    """
+    candidate_ids = {}
+    for name in set(candidate_names):
+        row = conn.execute('SELECT MIN(id) FROM candidates WHERE name = ?', (name,)).fetchone()
+        candidate_ids[name] = row[0] if row[0] is not None else \
+            conn.execute('INSERT INTO candidates (name, email) VALUES (?, ?)', (name, name + "@example.com")).lastrowid
+    return candidate_ids
+
+@app.route('/schedule_interviews', methods=['POST'])
+def schedule_interviews_route():
+    """Schedule interviews for candidates based on matching scores and send email invitations."""
+    job_descriptions = load_jobs()
+
+    if not job_descriptions:
+        return jsonify({'error': 'No job descriptions uploaded. Please upload job descriptions first.'}), 400
+
+    if 'cv_files' not in request.files:
+        return jsonify({'error': 'No CV files uploaded'}), 400
+
+    cv_files = request.files.getlist('cv_files')
+    scheduled_interviews = schedule_uploaded_candidates(job_descriptions, [(cv_file.filename, cv_file) for cv_file in cv_files],
+                                                        **shortlist_options(request.values, paginate=False))
 
     # Check if no candidates were scheduled for interviews
     if not scheduled_interviews:
@@ -158,28 +371,99 @@ def schedule_interviews_route():
 
     return jsonify({'scheduled_interviews': scheduled_interviews})
 
-def send_email(to_email, job_title, interview_time):
-    """Send an email invitation for the interview."""
-    from_email = "your_email@example.com"  # Replace with your email
-    password = "your_password"  # Replace with your email password
+def run_upload_job(payload, report_progress, work):
+    """Run a queued matching or scheduling job against the CVs saved for it, then delete them."""
+    try:
+        cv_files = [(filename, path) for filename, path in payload['cv_files']]
+        return work(load_jobs(), cv_files, report_progress, **payload.get('options', {}))
+    finally:
+        shutil.rmtree(payload['upload_dir'], ignore_errors=True)
+
+def refresh_scores_job(payload, report_progress):
+    """Bring the candidate_scores table up to date after jobs or CVs changed."""
+    with db_pool.connection() as conn:
+        return {'rescored_cvs': refresh_candidate_scores(conn)}
+
+job_queue.register('refresh_scores', refresh_scores_job)
+job_queue.register('match_candidates', lambda payload, progress: run_upload_job(payload, progress, match_uploaded_candidates))
+job_queue.register('schedule_interviews', lambda payload, progress: {
+    'scheduled_interviews': run_upload_job(payload, progress, schedule_uploaded_candidates)})
+
+@app.before_request
+def start_background_workers():
+    """
+    Starts the job workers and the mail sender (once) when the app serves its first request, so
+    jobs queued or interrupted before a restart resume, and mail left in the outbox is sent,
+    without waiting for a new submission. Not done at import time: the debug reloader imports this
+    module in a parent process that never serves requests.
+    """
+    job_queue.start()
+    mailer.start()
+
+@app.route('/jobs/<kind>', methods=['POST'])
+def submit_job(kind):
+    """Queue a matching or scheduling run for the uploaded CVs and return its job id immediately."""
+    if kind not in ('match_candidates', 'schedule_interviews'):
+        return jsonify({'error': f'Unknown job type: {kind}'}), 404
+
+    if not load_jobs():
+        return jsonify({'error': 'No job descriptions uploaded. Please upload job descriptions first.'}), 400
+
+    cv_files = request.files.getlist('cv_files')
+    if not cv_files:
+        return jsonify({'error': 'No CV files uploaded'}), 400
+
+    # Save the uploads so the worker (or a restarted server) can read them later
+    job_id = uuid.uuid4().hex
+    upload_dir = os.path.join(UPLOAD_DIR, job_id)
+    os.makedirs(upload_dir)
+    saved_files = []
+    for i, cv_file in enumerate(cv_files):
+        path = os.path.join(upload_dir, f"{i}_{secure_filename(cv_file.filename)}")
+        cv_file.save(path)
+        saved_files.append((cv_file.filename, path))
+
+    options = shortlist_options(request.values, paginate=kind == 'match_candidates')
+    job_queue.submit(kind, {'cv_files': saved_files, 'upload_dir': upload_dir, 'options': options}, job_id=job_id)
+    return jsonify({'job_id': job_id, 'status_url': f'/jobs/{job_id}'}), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Return the status and progress of a background job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    job.pop('result')
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """Return the result of a finished background job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] == 'failed':
+        return jsonify({'error': job['error']}), 500
+    if job['status'] != 'done':
+        return jsonify({'status': job['status'], 'progress': job['progress']}), 202
+    return jsonify(job['result'])
 
+def send_email(to_email, job_title, interview_time):
+    """Queue an email invitation for the interview and return its outbox id."""
     subject = "Interview Invitation"
     body = f"Dear Candidate,\n\nWe are pleased to invite you for an interview for the position of '{job_title}' on {interview_time}.\n\nBest regards,\nYour Company"
+    return mailer.enqueue(to_email, subject, body)
 
-    msg = MIMEMultipart()
-    msg['From'] = from_email
-    msg['To'] = to_email
-    msg['Subject'] = subject
-    msg.attach(MIMEText(body, 'plain'))
-
-    try:
-        with smtplib.SMTP('smtp.example.com', 587) as server:  # Replace with your SMTP server
-            server.starttls()
-            server.login(from_email, password)
-            server.send_message(msg)
-    except Exception as e:
-        # Handle any exceptions silently
-        pass
+@app.route('/emails/<int:email_id>', methods=['GET'])
+def email_status(email_id):
+    """Return the delivery status of a queued interview invitation."""
+    status = mailer.status(email_id)
+    if status is None:
+        return jsonify({'error': 'Email not found'}), 404
+    return jsonify(status)
 
 if __name__ == '__main__':
+    # With the reloader, only the child process that serves requests runs the background workers
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_workers()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,80 @@
+# matching_engine.py
+
+import heapq
+import re
+from collections import Counter, defaultdict
+
+from metrics import timed
+
+# Same notion of a keyword as candidate_matching.keyword_score: every word in the job description
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+
+def tokenize(text):
+    """Splits text into lower-cased word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class CandidateIndex:
+    """
+    Inverted index of candidate CVs (term -> candidate postings).
+
+    Each CV is tokenized once when it is added; scoring a job then walks only the postings of the
+    job's distinct terms instead of rescanning every CV for every keyword.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(set)
+        self.candidate_ids = set()
+
+    def __len__(self):
+        return len(self.candidate_ids)
+
+    def add_candidate(self, candidate_id, text):
+        """
+        Adds a candidate to the index.
+
+        Args:
+            candidate_id: Any hashable id for the candidate (e.g. the CV file name).
+            text (str): The CV text whose words should be matched against job keywords.
+        """
+        self.candidate_ids.add(candidate_id)
+        for term in set(tokenize(text)):
+            self.postings[term].add(candidate_id)
+
+    @timed("scoring_seconds", "Time spent scoring CVs against jobs", method="keyword")
+    def score_job(self, description, candidates=None, top_k=None, min_score=1):
+        """
+        Scores every indexed candidate against a job description in one pass over its terms.
+
+        A candidate scores one point per keyword occurrence in the job description that also
+        appears in their CV, mirroring candidate_matching.keyword_score.
+
+        Args:
+            description (str): The job description text.
+            candidates (set): If given, only these candidates are scored, e.g. those passing the job's
+                title gate (see candidate_matching.candidates_by_job).
+            top_k (int): If given, only the top_k best candidates are returned.
+            min_score (int): Candidates scoring below this are dropped.
+
+        Returns:
+            list: (candidate_id, score) tuples sorted by descending score.
+        """
+        if candidates is not None and not candidates:
+            return []
+
+        scores = defaultdict(int)
+        for term, weight in Counter(tokenize(description)).items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            if candidates is not None:
+                postings = postings & candidates
+            for candidate_id in postings:
+                scores[candidate_id] += weight
+
+        results = [(candidate_id, score) for candidate_id, score in scores.items() if score >= min_score]
+        key = lambda item: (-item[1], str(item[0]))  # Highest score first, ties by candidate id
+        if top_k is not None:
+            return heapq.nsmallest(top_k, results, key=key)
+        return sorted(results, key=key)
@@ -0,0 +1,199 @@
+# metrics.py
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+PREFIX = "recruitment_"  # Prepended to every metric name in the Prometheus output
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # Timer histogram bounds, in seconds
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """A monotonically increasing count, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, lock):
+        self.name = name
+        self.help = help
+        self._lock = lock
+        self.series = {}  # Label key -> value
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+    def _merge(self, key, value):
+        self.series[key] = self.series.get(key, 0) + value
+
+
+class Timer:
+    """Records durations in seconds as a histogram, optionally split by labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, lock):
+        self.name = name
+        self.help = help
+        self._lock = lock
+        self.series = {}  # Label key -> [count, total seconds, max seconds, per-bucket counts]
+
+    def observe(self, seconds, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0, 0.0, 0.0, [0] * len(BUCKETS)]
+            series[0] += 1
+            series[1] += seconds
+            series[2] = max(series[2], seconds)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    series[3][i] += 1
+                    break
+
+    @contextmanager
+    def time(self, **labels):
+        """Context manager that observes how long its block took."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _merge(self, key, value):
+        series = self.series.get(key)
+        if series is None:
+            self.series[key] = [value[0], value[1], value[2], list(value[3])]
+        else:
+            series[0] += value[0]
+            series[1] += value[1]
+            series[2] = max(series[2], value[2])
+            series[3] = [a + b for a, b in zip(series[3], value[3])]
+
+
+class Registry:
+    """Holds every metric of the process and renders them for /metrics or the end of a CLI run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.metrics = {}
+
+    def _get(self, cls, name, help):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help, self._lock)
+            return metric
+
+    def counter(self, name, help=""):
+        return self._get(Counter, name, help)
+
+    def timer(self, name, help=""):
+        return self._get(Timer, name, help)
+
+    def drain(self):
+        """Returns a picklable copy of every metric and resets them, for handing worker metrics to the parent."""
+        with self._lock:
+            snapshot = {name: (metric.kind, metric.help, metric.series) for name, metric in self.metrics.items() if metric.series}
+            for metric in self.metrics.values():
+                metric.series = {}
+        return snapshot
+
+    def merge(self, snapshot):
+        """Adds the metrics drained from another process to this registry."""
+        for name, (kind, help, series) in snapshot.items():
+            metric = self._get(Counter if kind == "counter" else Timer, name, help)
+            with self._lock:
+                for key, value in series.items():
+                    metric._merge(key, value)
+
+    def render_prometheus(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, metric in sorted(self.metrics.items()):
+                full_name = PREFIX + name
+                lines.append(f"# HELP {full_name} {metric.help}")
+                lines.append(f"# TYPE {full_name} {metric.kind}")
+                for key, value in sorted(metric.series.items()):
+                    if metric.kind == "counter":
+                        lines.append(f"{full_name}{_format_labels(key)} {value}")
+                        continue
+                    count, total, _, buckets = value
+                    cumulative = 0
+                    for bound, bucket in zip(BUCKETS, buckets):
+                        cumulative += bucket
+                        lines.append(f"{full_name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                    lines.append(f"{full_name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+                    lines.append(f"{full_name}_sum{_format_labels(key)} {total}")
+                    lines.append(f"{full_name}_count{_format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def summary_table(self):
+        """Returns a plain-text table of every timer, slowest stage first, followed by every counter."""
+        with self._lock:
+            timers = [(name + _format_labels(key), *value[:3]) for name, metric in self.metrics.items()
+                      if metric.kind == "histogram" for key, value in metric.series.items()]
+            counters = [(name + _format_labels(key), value) for name, metric in self.metrics.items()
+                        if metric.kind == "counter" for key, value in metric.series.items()]
+        if not timers and not counters:
+            return "No metrics recorded."
+        width = max(len(row[0]) for row in timers + counters)
+        lines = [f"{'Stage':<{width}}  {'Count':>8}  {'Total s':>10}  {'Mean ms':>10}  {'Max ms':>10}"]
+        for name, count, total, longest in sorted(timers, key=lambda row: -row[2]):
+            lines.append(f"{name:<{width}}  {count:>8}  {total:>10.3f}  {total / count * 1000:>10.2f}  {longest * 1000:>10.2f}")
+        for name, value in sorted(counters):
+            lines.append(f"{name:<{width}}  {value:>8}")
+        return "\n".join(lines)
+
+
+REGISTRY = Registry()
+
+
+def counter(name, help=""):
+    """Returns the process-wide counter with this name, creating it on first use."""
+    return REGISTRY.counter(name, help)
+
+
+def timer(name, help=""):
+    """Returns the process-wide timer with this name, creating it on first use."""
+    return REGISTRY.timer(name, help)
+
+
+def timed(name, help="", **labels):
+    """Decorator that records every call of the function in the named timer."""
+    def decorator(func):
+        metric = timer(name, help)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with metric.time(**labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def reset():
+    """Clears every metric; used to start worker processes without the metrics of the parent they forked from."""
+    REGISTRY.drain()
+
+
+def print_summary():
+    """Prints the timing summary table; called at the end of the command-line scripts."""
+    print("\nTiming summary:")
+    print(REGISTRY.summary_table())
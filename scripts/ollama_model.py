@@ -1,29 +1,137 @@
 # ollama_model.py
 
+import asyncio
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Where the Ollama server listens, and how long to wait for it
+OLLAMA_URL = "http://localhost:11434"
+CONNECT_TIMEOUT = 5  # Seconds to establish a connection
+READ_TIMEOUT = 120  # Seconds to wait between bytes of the response
+POOL_SIZE = 10  # Keep-alive connections kept open to the server
+
+SUMMARY_PROMPT = (
+    "Summarize the following job description in 3-4 sentences, covering the role, "
+    "key responsibilities and required qualifications.\n\n{job_description}"
+)
+
+
 class OllamaModel:
-    def __init__(self, model_name):
+    def __init__(self, model_name, base_url=OLLAMA_URL, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), pool_size=POOL_SIZE):
         self.model_name = model_name
-        # Load the model here if necessary
-        # For example, you might have a function to load the model
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        # One session per model keeps connections alive between requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
-    def summarize(self, job_description):
+    def summarize(self, job_description, raise_errors=False):
         """
         Summarizes the given job description using the TinyLlama model.
 
         Args:
             job_description (str): The job description text to summarize.
+            raise_errors (bool): Raise model errors instead of returning them as the summary text.
 
         Returns:
             str: The summarized text or an error message.
         """
         try:
-            # Here you would call the TinyLlama model directly to get the summary
             summary = self._generate_summary(job_description)
             return summary
         except Exception as e:
+            if raise_errors:
+                raise
             return f"An error occurred: {str(e)}"
 
+    def generate(self, prompt, **options):
+        """
+        Sends a prompt to the Ollama /api/generate endpoint and returns the full response text.
+
+        Args:
+            prompt (str): The prompt to complete.
+            **options: Model options passed through to Ollama (e.g. temperature, num_predict).
+
+        Returns:
+            str: The generated text.
+        """
+        response = self._post(prompt, stream=False, options=options)
+        return response.json()["response"]
+
+    def stream_generate(self, prompt, **options):
+        """
+        Like generate, but yields the response tokens as the server produces them.
+
+        Yields:
+            str: Each chunk of generated text.
+        """
+        with self._post(prompt, stream=True, options=options) as response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+
+    def close(self):
+        """Closes the pooled connections."""
+        self.session.close()
+
+    def _post(self, prompt, stream, options):
+        payload = {"model": self.model_name, "prompt": prompt, "stream": stream}
+        if options:
+            payload["options"] = options
+        response = self.session.post(f"{self.base_url}/api/generate", json=payload, stream=stream, timeout=self.timeout)
+        if response.status_code != 200:
+            try:
+                message = response.json().get("error", response.text)
+            except ValueError:
+                message = response.text
+            response.close()
+            raise RuntimeError(f"Ollama returned HTTP {response.status_code}: {message}")
+        return response
+
     def _generate_summary(self, job_description):
-        # Placeholder for the actual summarization logic using TinyLlama
-        # Replace this with the actual call to the TinyLlama model
-        return f"Summary of: {job_description}"  # Example placeholder summary
+        return self.generate(SUMMARY_PROMPT.format(job_description=job_description)).strip()
+
+
+class AsyncOllamaModel:
+    """
+    asyncio front end for OllamaModel, for summarizing many descriptions concurrently.
+
+    Requests run on worker threads that share the model's pooled session, and at most max_concurrency
+    of them are in flight at once.
+    """
+
+    def __init__(self, model_name, max_concurrency=POOL_SIZE, **kwargs):
+        self.model = OllamaModel(model_name, pool_size=max(max_concurrency, 1), **kwargs)
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    async def generate(self, prompt, **options):
+        """Asynchronously returns the full response text for a prompt."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await asyncio.to_thread(self.model.generate, prompt, **options)
+
+    async def summarize(self, job_description):
+        """Asynchronously summarizes a job description. Errors are raised, not returned."""
+        text = await self.generate(SUMMARY_PROMPT.format(job_description=job_description))
+        return text.strip()
+
+    async def summarize_many(self, job_descriptions):
+        """Summarizes all descriptions concurrently and returns the summaries in order."""
+        return await asyncio.gather(*(self.summarize(description) for description in job_descriptions))
+
+    def close(self):
+        self.model.close()
@@ -0,0 +1,118 @@
+# ollama_stub_server.py
+#
+# A stand-in for the Ollama HTTP API, for exercising the summarizer offline.
+#
+#     python ollama_stub_server.py --port 11434 --latency 0.5 --token-latency 0.02
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUMMARY_WORDS = 40  # Number of words of the prompt echoed back as the "summary"
+
+
+def make_handler(latency, token_latency):
+    """Builds a request handler class that answers like Ollama, with the given artificial delays."""
+
+    class OllamaStubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, like the real server
+
+        def log_message(self, format, *args):
+            pass  # Keep load tests quiet
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                self._send_json(200, {"models": [{"name": "tinyllama:latest"}]})
+            elif self.path == "/":
+                body = b"Ollama is running"
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/api/generate":
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length))
+                model = request["model"]
+                prompt = request["prompt"]
+            except (ValueError, KeyError):
+                self._send_json(400, {"error": "invalid request"})
+                return
+
+            # Echo the start of the text after the instructions as the "summary"
+            text = prompt.rsplit("\n\n", 1)[-1]
+            tokens = [word + " " for word in text.split()[:SUMMARY_WORDS]]
+            time.sleep(latency)
+
+            if not request.get("stream", True):
+                time.sleep(token_latency * len(tokens))
+                self._send_json(200, {"model": model, "response": "".join(tokens).strip(), "done": True})
+                return
+
+            # Stream NDJSON chunks with chunked transfer encoding, as Ollama does
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for token in tokens:
+                time.sleep(token_latency)
+                self._write_chunk({"model": model, "response": token, "done": False})
+            self._write_chunk({"model": model, "response": "", "done": True})
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _write_chunk(self, payload):
+            data = (json.dumps(payload) + "\n").encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+    return OllamaStubHandler
+
+
+def start_stub_server(host="127.0.0.1", port=0, latency=0.0, token_latency=0.0):
+    """
+    Starts the stub server on a background thread.
+
+    Returns:
+        ThreadingHTTPServer: The running server; its URL is http://host:server.server_port.
+        Call shutdown() on it to stop.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(latency, token_latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the Ollama HTTP API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds between tokens")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.latency, args.token_latency))
+    print(f"Ollama stub listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# score_store.py
+
+import hashlib
+
+from candidate_matching import JobScorer, SkillScorer
+from text_extraction import extract_text_from_cv
+from bulk_loader import BATCH_SIZE
+from skills_taxonomy import extract_skills, replace_candidate_skills, replace_job_skills, load_skills
+from metrics import counter, timer
+
+# Bump when the scoring method changes so every stored score is recomputed
+SCORER = "tfidf-1"
+# Tables of stored scores, one per scoring method, refreshed together and with the same version tag
+SCORE_TABLES = ('candidate_scores', 'candidate_skill_scores')
+
+
+def scorer_version(jobs):
+    """
+    Returns the version tag stored with each score.
+
+    TF-IDF weights depend on the whole set of job descriptions, so the tag includes a fingerprint of
+    the jobs: adding, editing or removing a job makes every stored score stale.
+    """
+    digest = hashlib.sha256()
+    for job_id, description in jobs:
+        digest.update(f"{job_id}\0{description}\0".encode("utf-8"))
+    return f"{SCORER}:{digest.hexdigest()[:16]}"
+
+
+def _score_rows(scores, batch, job_ids, version):
+    """Turns a jobs x CVs score matrix of a batch into (job_id, candidate_id, score, version) rows."""
+    scores = scores.tocsc()
+    rows = []
+    for column, (_, candidate_id) in enumerate(batch):
+        begin, end = scores.indptr[column], scores.indptr[column + 1]
+        for job_row, score in zip(scores.indices[begin:end].tolist(), scores.data[begin:end].tolist()):
+            rows.append((job_ids[job_row], candidate_id, round(score, 2), version))
+    return rows
+
+
+def refresh_candidate_scores(conn, batch_size=BATCH_SIZE):
+    """
+    Brings the candidate_scores (TF-IDF) and candidate_skill_scores (skill overlap) tables up to
+    date with the current jobs and CVs.
+
+    Only CVs whose cv_files.scored_version differs from the current scorer version are scored, i.e.
+    new or modified CVs, or every CV after the job descriptions changed. Scores of deleted CVs, and
+    of CVs linked to an earlier candidate as duplicates, are removed and duplicates are not scored. Only scores above zero are stored. The skills found in each scored CV, and in every job
+    when the jobs changed, are stored alongside in candidate_skills and job_skills.
+
+    Returns:
+        int: The number of CVs that were (re)scored.
+    """
+    with conn:
+        for table in SCORE_TABLES:
+            conn.execute(f'''DELETE FROM {table} WHERE candidate_id IN
+                             (SELECT candidate_id FROM cv_files WHERE deleted = 1)''')
+            conn.execute(f'DELETE FROM {table} WHERE candidate_id IN (SELECT id FROM candidates WHERE duplicate_of IS NOT NULL)')
+        conn.execute('''DELETE FROM candidate_skills WHERE candidate_id IN
+                        (SELECT candidate_id FROM cv_files WHERE deleted = 1)''')
+
+    jobs = conn.execute('SELECT id, description FROM job_descriptions ORDER BY id').fetchall()
+    if not jobs:
+        return 0
+    version = scorer_version(jobs)
+    job_ids = [job_id for job_id, _ in jobs]
+    scorer = JobScorer([description for _, description in jobs])
+
+    stale = conn.execute('''SELECT f.path, f.candidate_id FROM cv_files f
+                            JOIN candidates c ON c.id = f.candidate_id
+                            WHERE f.deleted = 0 AND c.duplicate_of IS NULL
+                            AND (f.scored_version IS NULL OR f.scored_version != ?)''', (version,)).fetchall()
+
+    if stale or conn.execute('SELECT 1 FROM job_skills LIMIT 1').fetchone() is None:
+        # A new scorer version means the jobs may have changed; their skills are cheap to find again
+        with conn:
+            conn.execute('DELETE FROM job_skills')
+            replace_job_skills(conn, [(job_id, extract_skills(description)) for job_id, description in jobs])
+    if stale:
+        job_skills = load_skills(conn, 'job_skills')
+        skill_scorer = SkillScorer(job_skills=[job_skills.get(job_id, ()) for job_id in job_ids])
+
+    for start in range(0, len(stale), batch_size):
+        batch = stale[start:start + batch_size]
+        cv_texts = [extract_text_from_cv(path) for path, _ in batch]
+        cv_skills = [extract_skills(text) for text in cv_texts]
+        rows = {'candidate_scores': _score_rows(scorer.score_cvs(cv_texts), batch, job_ids, version),
+                'candidate_skill_scores': _score_rows(skill_scorer.score_cvs(cv_skills=cv_skills), batch, job_ids, version)}
+
+        with timer("db_write_seconds", "Time spent in database write transactions").time(table="candidate_scores"), conn:
+            for table in SCORE_TABLES:
+                conn.executemany(f'DELETE FROM {table} WHERE candidate_id = ?', [(candidate_id,) for _, candidate_id in batch])
+                conn.executemany(f'INSERT INTO {table} (job_id, candidate_id, score, scorer_version) VALUES (?, ?, ?, ?)', rows[table])
+            conn.executemany('UPDATE cv_files SET scored_version = ? WHERE path = ?', [(version, path) for path, _ in batch])
+            replace_candidate_skills(conn, [(candidate_id, skills) for (_, candidate_id), skills in zip(batch, cv_skills)])
+        for table in SCORE_TABLES:
+            counter("db_rows_written_total", "Rows written to the database").inc(len(rows[table]), table=table)
+
+    if stale:
+        # Scores for jobs that no longer exist belong to an older version
+        with conn:
+            for table in SCORE_TABLES:
+                conn.execute(f'DELETE FROM {table} WHERE scorer_version != ?', (version,))
+    return len(stale)
+
+
+def load_candidate_scores(conn, job_id=None, min_score=0, limit=None, table='candidate_scores'):
+    """
+    Reads precomputed scores, best first, joined with the candidate and job details.
+
+    Args:
+        conn (Connection): The database connection.
+        job_id (int): Only return scores for this job.
+        min_score (float): Only return scores above this.
+        limit (int): Maximum number of rows to return.
+        table (str): One of SCORE_TABLES; TF-IDF scores by default.
+
+    Returns:
+        list: Tuples of (job_id, job_title, candidate_id, candidate_name, candidate_email, score).
+    """
+    if table not in SCORE_TABLES:
+        raise ValueError(f"Unknown score table: {table}")
+    sql = f'''SELECT s.job_id, j.title, s.candidate_id, c.name, c.email, s.score
+             FROM {table} s
+             JOIN job_descriptions j ON j.id = s.job_id
+             JOIN candidates c ON c.id = s.candidate_id
+             WHERE s.score > ?'''
+    params = [min_score]
+    if job_id is not None:
+        sql += ' AND s.job_id = ?'
+        params.append(job_id)
+    sql += ' ORDER BY s.score DESC, s.candidate_id'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+
+def load_skill_scores(conn, job_id=None, min_score=0, limit=None):
+    """
+    Reads the skill overlap scores stored by refresh_candidate_scores, best first; nothing is rescored.
+
+    Takes the same arguments, and returns the same tuples, as load_candidate_scores.
+    """
+    return load_candidate_scores(conn, job_id, min_score, limit, table='candidate_skill_scores')
+
+
+# Scoring methods whose scores of the stored candidates can be read without rescoring any text
+STORED_SCORES = {'tfidf': load_candidate_scores, 'skills': load_skill_scores}
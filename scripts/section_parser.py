@@ -0,0 +1,143 @@
+# section_parser.py
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# Every section header the CV and job description parsers look for
+HEADERS = (
+    "Work Experience", "Skills:", "Certifications:", "Achievements:",
+    "Description:", "Qualification:", "Responsibilities:",
+)
+HEADER_PATTERN = re.compile("|".join(re.escape(header) for header in HEADERS))
+
+# Headers that end each section; a section without an entry runs to the end of the text
+SECTION_ENDS = {
+    "Work Experience": ("Skills:", "Certifications:", "Achievements:"),
+    "Description:": ("Qualification:", "Responsibilities:"),
+    "Qualification:": ("Responsibilities:",),
+}
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+PHONE_PATTERN = re.compile(r'\+?\d[\d -]{8,}\d')  # Adjust this pattern based on expected phone formats
+TITLE_END_PATTERN = re.compile(r'\s+at')  # "<job title> at <company>"
+LINE_PATTERN = re.compile(r'\s*(.*)')  # The rest of the line, after any leading whitespace and blank lines
+
+
+class Sections:
+    """
+    The section headers of one document, located in a single pass over the text.
+
+    Each section's text is then sliced out between its header and the next header that ends it,
+    instead of scanning the whole document again for every section.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.markers = [(match.group(), match.start(), match.end()) for match in HEADER_PATTERN.finditer(text)]
+        self._first = {}  # Header -> index of its first occurrence in markers
+        for i, (header, _, _) in enumerate(self.markers):
+            self._first.setdefault(header, i)
+
+    def header_end(self, header):
+        """Returns the position just after the first occurrence of header, or None if it is missing."""
+        i = self._first.get(header)
+        return None if i is None else self.markers[i][2]
+
+    def body(self, header):
+        """
+        Returns the stripped text of the first section with this header, up to the next header in
+        SECTION_ENDS[header] or the end of the document. Returns None if the header is missing.
+        """
+        i = self._first.get(header)
+        if i is None:
+            return None
+        ends = SECTION_ENDS.get(header, ())
+        start = self.markers[i][2]
+        for name, position, _ in self.markers[i + 1:]:
+            if name in ends:
+                return self.text[start:position].strip()
+        return self.text[start:].strip()
+
+    def closed(self, header):
+        """Returns True if the header is present and followed by one of the headers that end its section."""
+        i = self._first.get(header)
+        if i is None:
+            return False
+        ends = SECTION_ENDS.get(header, ())
+        return any(name in ends for name, _, _ in self.markers[i + 1:])
+
+    def line_after(self, header):
+        """Returns the first non-blank line following the header, stripped, or None if the header is missing."""
+        start = self.header_end(header)
+        if start is None:
+            return None
+        return LINE_PATTERN.match(self.text, start).group(1).strip()
+
+
+class CVRecord(NamedTuple):
+    """The fields parsed out of a CV. Missing fields are None."""
+    email: str
+    phone: str
+    skills: str
+    job_title: str
+    work_experience: str
+
+
+@lru_cache(maxsize=256)
+def parse_cv(cv_text):
+    """
+    Parses a CV's text into a CVRecord.
+
+    Results are cached by text, so the CV helpers called one after another on the same text
+    (e.g. extract_job_title_from_cv then extract_job_description_from_cv) only parse it once.
+    """
+    sections = Sections(cv_text)
+    email = EMAIL_PATTERN.search(cv_text)
+    phone = PHONE_PATTERN.search(cv_text)
+
+    job_title = None
+    start = sections.header_end("Work Experience")
+    if start is not None:
+        title_end = TITLE_END_PATTERN.search(cv_text, start)
+        if title_end:
+            job_title = cv_text[start:title_end.start()].strip()
+
+    return CVRecord(
+        email=email.group(0) if email else None,
+        phone=phone.group(0) if phone else None,
+        skills=sections.line_after("Skills:"),
+        job_title=job_title,
+        work_experience=sections.body("Work Experience"),
+    )
+
+
+def has_cv_fields(cv_text, fields):
+    """
+    Returns True if the start of a CV already holds the given CVRecord fields exactly as they would
+    be parsed from the whole CV, so a page-by-page text extractor can stop reading.
+
+    A field found in the start of a CV always parses the same from the whole CV, except a section
+    that has not been ended by a following header yet, or a "Skills:" header with nothing after it.
+    """
+    record = parse_cv(cv_text)
+    for field in fields:
+        if field == "work_experience":
+            if not Sections(cv_text).closed("Work Experience"):
+                return False
+        elif field == "skills":
+            if not record.skills:
+                return False
+        elif getattr(record, field) is None:
+            return False
+    return True
+
+
+def parse_job_sections(description):
+    """Returns the Description, Qualification and Responsibilities sections of a job description ('' if missing)."""
+    sections = Sections(description)
+    return {
+        "Description": sections.body("Description:") or "",
+        "Qualification": sections.body("Qualification:") or "",
+        "Responsibilities": sections.body("Responsibilities:") or "",
+    }
@@ -0,0 +1,147 @@
+# shortlist.py
+
+import heapq
+import math
+from collections import Counter
+from itertools import islice
+
+TOP_K = 50  # Candidates kept per job
+PAGE_SIZE = 50  # Matches returned per page
+MAX_PAGE_SIZE = 500
+HISTOGRAM_STEP = 0.1  # Width of the score buckets used for percentile cutoffs
+
+
+class _Descending:
+    """Wraps a candidate key so that smaller keys rank higher when scores are tied."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+class Shortlist:
+    """
+    Keeps the top_k best-scoring candidates for each job in a bounded min-heap.
+
+    Memory stays proportional to jobs x top_k however many candidates are scored. Ties are broken by
+    the smaller candidate key. Every score seen is also counted in a per-job histogram of
+    HISTOGRAM_STEP-wide buckets, so results can be cut at a percentile of the job's whole score
+    distribution, not just of the candidates kept.
+    """
+
+    def __init__(self, top_k=TOP_K, threshold=0):
+        """
+        Args:
+            top_k (int): Candidates kept per job. None keeps every candidate above the threshold.
+            threshold (float): Candidates scoring at or below this are never kept.
+        """
+        self.top_k = top_k
+        self.threshold = threshold
+        self._heaps = {}  # Job -> min-heap of (score, _Descending(candidate)); jobs in insertion order
+        self._histograms = {}  # Job -> Counter of score bucket -> number of candidates
+
+    def add(self, job, candidate, score):
+        """Records one candidate's score for a job, keeping it if it ranks in the job's top_k."""
+        heap = self._heaps.setdefault(job, [])
+        self._histograms.setdefault(job, Counter())[self._bucket(score)] += 1
+        if score <= self.threshold:
+            return
+        entry = (score, _Descending(candidate))
+        if self.top_k is None or len(heap) < self.top_k:
+            heapq.heappush(heap, entry)
+        elif heap[0] < entry:
+            heapq.heapreplace(heap, entry)
+
+    @staticmethod
+    def _bucket(score):
+        return int(score / HISTOGRAM_STEP + 1e-9)  # Guard against 0.3 / 0.1 == 2.999...
+
+    def add_matrix(self, scores, jobs=None, candidates=None):
+        """
+        Records every score of a jobs x candidates sparse matrix, as returned by compute_score_matrix.
+
+        Jobs are identified by row index and candidates by column index, or by jobs[row] and
+        candidates[column] if given.
+        Scores are rounded to two decimals. Candidates missing from the matrix score 0: they are
+        never kept, but they are counted in the job's histogram so percentile cutoffs see them.
+        """
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            job = row if jobs is None else jobs[row]
+            self._heaps.setdefault(job, [])
+            histogram = self._histograms.setdefault(job, Counter())
+            if scores.shape[1] > end - start:
+                histogram[0] += scores.shape[1] - (end - start)
+            for column, score in zip(scores.indices[start:end].tolist(), scores.data[start:end].round(2).tolist()):
+                self.add(job, column if candidates is None else candidates[column], score)
+
+    def percentile_cutoff(self, job, percentile):
+        """
+        Returns the lowest score in the given percentile of the job's scores, to within HISTOGRAM_STEP.
+
+        For example, percentile=90 returns the score the top 10% of the job's candidates reach.
+        """
+        histogram = self._histograms.get(job)
+        if not histogram:
+            return 0
+        below = math.floor(sum(histogram.values()) * percentile / 100)  # Candidates under the cutoff
+        seen = 0
+        for bucket in sorted(histogram):
+            seen += histogram[bucket]
+            if seen > below:
+                return bucket * HISTOGRAM_STEP
+        return (max(histogram) + 1) * HISTOGRAM_STEP
+
+    def ranked(self, job, threshold=None, percentile=None):
+        """
+        Returns the kept candidates for one job, best first.
+
+        Args:
+            job: The job key.
+            threshold (float): Also drop candidates scoring at or below this.
+            percentile (float): Also drop candidates below this percentile of the job's scores.
+
+        Returns:
+            list: (candidate, score) tuples.
+        """
+        cutoff = self.percentile_cutoff(job, percentile) if percentile else None
+        results = []
+        for score, candidate in sorted(self._heaps.get(job, []), reverse=True):
+            if threshold is not None and score <= threshold:
+                break
+            if cutoff is not None and score < cutoff:
+                break
+            results.append((candidate.value, score))
+        return results
+
+    def items(self, threshold=None, percentile=None):
+        """Yields (job, candidate, score) for every kept candidate, job by job, best first within each job."""
+        for job in self._heaps:
+            for candidate, score in self.ranked(job, threshold, percentile):
+                yield job, candidate, score
+
+    def page(self, page=1, page_size=PAGE_SIZE, threshold=None, percentile=None):
+        """
+        Returns one page of items().
+
+        Returns:
+            dict: 'items' holding (job, candidate, score) tuples, plus 'page', 'page_size', 'total'
+            and 'pages'.
+        """
+        page = max(page, 1)
+        page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+        ranked = [(job, self.ranked(job, threshold, percentile)) for job in self._heaps]
+        total = sum(len(candidates) for _, candidates in ranked)
+        items = ((job, candidate, score) for job, candidates in ranked for candidate, score in candidates)
+        start = (page - 1) * page_size
+        return {
+            'items': list(islice(items, start, start + page_size)),
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'pages': max(math.ceil(total / page_size), 1),
+        }
@@ -0,0 +1,286 @@
+# skills_taxonomy.py
+
+import csv
+import os
+import threading
+from collections import deque
+
+from metrics import counter, timed
+
+# Extra skills and synonyms, as a CSV with "skill" and "synonym" columns; set SKILLS_TAXONOMY to use one
+TAXONOMY_PATH = os.environ.get("SKILLS_TAXONOMY")
+
+# Canonical skill -> synonyms. Matching is case-insensitive and on whole words, so "Java" does not
+# match inside "JavaScript". The canonical name, lower-cased, is the skill id stored in the database.
+SKILLS = {
+    # Languages
+    "Python": ["python3"],
+    "Java": [],
+    "JavaScript": ["js", "ecmascript"],
+    "TypeScript": [],
+    "C++": ["cpp"],
+    "C#": ["csharp", "c sharp"],
+    "Embedded C": [],
+    "Golang": ["go language"],
+    "Rust": [],
+    "Scala": [],
+    "Kotlin": [],
+    "Swift": ["swiftui"],
+    "R Programming": ["rstudio", "r language"],
+    "SQL": ["t-sql", "pl/sql"],
+    "Bash": ["shell scripting", "shell script"],
+    "PowerShell": [],
+    "Solidity": [],
+    "MATLAB": [],
+    # Web and mobile
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    "React": ["react.js", "reactjs"],
+    "Angular": ["angularjs"],
+    "Vue.js": ["vue", "vuejs"],
+    "Node.js": ["nodejs"],
+    "Django": [],
+    "Flask": [],
+    "Spring Boot": ["spring framework"],
+    "GraphQL": [],
+    "REST APIs": ["rest api", "restful apis", "restful api"],
+    "Full-Stack Development": ["full stack development", "full-stack web development", "full stack"],
+    "Mobile Development": ["mobile app development", "mobile app creation", "android", "ios"],
+    # Data and machine learning
+    "Machine Learning": ["ml"],
+    "Deep Learning": [],
+    "Artificial Intelligence": ["ai"],
+    "Natural Language Processing": ["nlp"],
+    "Computer Vision": [],
+    "Data Analysis": ["data analytics"],
+    "Data Visualization": [],
+    "Statistics": ["statistical analysis", "statistical modeling"],
+    "Predictive Modeling": ["predictive models", "predictive analytics"],
+    "TensorFlow": [],
+    "PyTorch": [],
+    "scikit-learn": ["scikit learn", "sklearn"],
+    "Pandas": [],
+    "NumPy": [],
+    "Spark": ["apache spark", "pyspark"],
+    "Hadoop": [],
+    "Kafka": ["apache kafka"],
+    "Airflow": ["apache airflow"],
+    "ETL": ["data pipelines", "data pipeline"],
+    "Big Data": [],
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Business Intelligence": ["bi"],
+    # Databases
+    "PostgreSQL": ["postgres"],
+    "MySQL": [],
+    "Oracle": [],
+    "SQL Server": ["mssql"],
+    "MongoDB": [],
+    "Redis": [],
+    "Cassandra": [],
+    "Database Administration": ["database management"],
+    # Cloud and operations
+    "AWS": ["amazon web services"],
+    "Azure": ["microsoft azure"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "Cloud Computing": ["cloud architecture", "cloud platforms", "cloud infrastructure"],
+    "Docker": ["containers", "containerization"],
+    "Kubernetes": ["k8s"],
+    "Terraform": [],
+    "CloudFormation": [],
+    "Infrastructure as Code": ["infrastructure-as-code", "iac"],
+    "CI/CD": ["ci/cd pipelines", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Jenkins": [],
+    "Ansible": [],
+    "Linux": ["unix"],
+    "Git": ["github", "gitlab"],
+    "DevOps": [],
+    "Monitoring": ["observability", "prometheus", "grafana"],
+    "Microservices": ["microservice architecture"],
+    "System Design": ["software architecture", "system architecture"],
+    # Security and networks
+    "Cybersecurity": ["cyber security", "information security", "security best practices"],
+    "Penetration Testing": ["pen testing", "ethical hacking"],
+    "Risk Assessment": ["risk management"],
+    "Network Security": ["securing enterprise networks", "firewalls"],
+    "Networking": ["tcp/ip", "network engineering", "routing and switching"],
+    "Compliance": ["compliance measures", "gdpr", "iso 27001"],
+    "Cryptography": ["encryption"],
+    "Blockchain": ["smart contracts", "ethereum"],
+    # Engineering practice
+    "Testing": ["software testing", "quality assurance", "test automation", "automated testing"],
+    "Selenium": [],
+    "Agile": ["scrum", "kanban"],
+    "Project Management": ["pmp", "project planning"],
+    "Product Management": ["product roadmap", "roadmapping"],
+    "UX Design": ["ux", "ui", "user experience", "user research", "ux/ui", "ui/ux"],
+    "Figma": [],
+    "Robotics": ["ros"],
+    "Embedded Systems": ["firmware", "microcontrollers"],
+    "Troubleshooting": ["debugging"],
+    "Communication": ["communication skills", "stakeholder management"],
+    "Leadership": ["mentoring", "team leadership"],
+    "Problem Solving": ["problem-solving", "problem-solving skills"],
+}
+
+
+def skill_id(name):
+    """Returns the id stored for a canonical skill name."""
+    return name.strip().lower()
+
+
+def normalize(text):
+    """Lower-cases text and collapses runs of whitespace, so terms split across lines still match."""
+    return " ".join(text.lower().split())
+
+
+def _is_word(char):
+    return char.isalnum() or char == "_"
+
+
+class SkillMatcher:
+    """
+    Finds every skill of a taxonomy mentioned in a text in a single pass, with an Aho-Corasick automaton.
+
+    All synonyms are compiled into one trie with failure links, so the cost of a scan depends on the
+    length of the text and the number of mentions, not on the number of terms in the dictionary.
+    """
+
+    def __init__(self, taxonomy):
+        """
+        Args:
+            taxonomy (dict): Canonical skill name -> list of synonyms.
+        """
+        self._goto = [{}]  # State -> {character: next state}
+        self._fail = [0]  # State -> state of the longest proper suffix that is also in the trie
+        self._outputs = [()]  # State -> (skill id, term length, whole-word start, whole-word end) of the terms ending here
+        self.terms = 0
+        for name, synonyms in taxonomy.items():
+            for term in {normalize(term) for term in [name, *synonyms]} - {""}:
+                self._add(term, skill_id(name))
+        self._link()
+
+    def _add(self, term, skill):
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        # Only require a word boundary on sides where the term itself starts or ends with a word
+        # character, so "c++" still matches in "c++," and "c#" in "(c#)"
+        self._outputs[state] += ((skill, len(term), _is_word(term[0]), _is_word(term[-1])),)
+        self.terms += 1
+
+    def _link(self):
+        """Computes the failure links breadth first and merges each state's outputs with its suffix's."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]
+
+    def find(self, text):
+        """
+        Yields (skill id, start, end) for every skill mention in the normalized text.
+
+        Overlapping mentions are all reported, e.g. "machine learning" and "learning" if both are terms.
+        """
+        text = normalize(text)
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for skill, length, word_start, word_end in outputs[state]:
+                start = end - length
+                if word_start and start > 0 and _is_word(text[start - 1]):
+                    continue
+                if word_end and end < len(text) and _is_word(text[end]):
+                    continue
+                yield skill, start, end
+
+    def skills(self, text):
+        """Returns the set of skill ids mentioned in the text."""
+        return {skill for skill, _, _ in self.find(text)}
+
+
+def load_taxonomy(path=TAXONOMY_PATH):
+    """
+    Returns SKILLS extended with the skills and synonyms of a CSV file, if one is given.
+
+    Rows whose synonym column is empty add the skill with no synonyms.
+    """
+    taxonomy = {name: list(synonyms) for name, synonyms in SKILLS.items()}
+    if path:
+        canonical = {skill_id(name): name for name in taxonomy}
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                name = canonical.setdefault(skill_id(row["skill"]), row["skill"].strip())
+                synonyms = taxonomy.setdefault(name, [])
+                if row.get("synonym"):
+                    synonyms.append(row["synonym"])
+    return taxonomy
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher():
+    """Return the process-wide skill matcher, compiling the taxonomy on first use."""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = SkillMatcher(load_taxonomy())
+    return _matcher
+
+
+@timed("skill_match_seconds", "Time spent finding skill mentions in CV and job description text")
+def extract_skills(text):
+    """Returns the sorted ids of every skill mentioned in a CV or job description."""
+    return sorted(get_matcher().skills(text))
+
+
+def _replace_skills(table, owner_column, conn, owner_skills):
+    owner_skills = list(owner_skills)
+    conn.executemany(f'DELETE FROM {table} WHERE {owner_column} = ?', [(owner,) for owner, _ in owner_skills])
+    rows = [(owner, skill) for owner, skills in owner_skills for skill in skills]
+    conn.executemany(f'INSERT OR IGNORE INTO {table} ({owner_column}, skill) VALUES (?, ?)', rows)
+    counter("db_rows_written_total", "Rows written to the database").inc(len(rows), table=table)
+
+
+def replace_candidate_skills(conn, candidate_skills):
+    """
+    Replaces the stored skills of each candidate, inside the caller's transaction.
+
+    Args:
+        conn (Connection): The database connection.
+        candidate_skills (iterable): (candidate_id, skill ids) pairs.
+    """
+    _replace_skills('candidate_skills', 'candidate_id', conn, candidate_skills)
+
+
+def replace_job_skills(conn, job_skills):
+    """Replaces the stored skills of each job, given (job_id, skill ids) pairs, inside the caller's transaction."""
+    _replace_skills('job_skills', 'job_id', conn, job_skills)
+
+
+def load_skills(conn, table='candidate_skills'):
+    """Returns {candidate or job id: set of skill ids} from candidate_skills or job_skills."""
+    owner_column = 'candidate_id' if table == 'candidate_skills' else 'job_id'
+    skills = {}
+    for owner, skill in conn.execute(f'SELECT {owner_column}, skill FROM {table}'):
+        skills.setdefault(owner, set()).add(skill)
+    return skills
@@ -0,0 +1,229 @@
+# slot_allocator.py
+
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+
+INTERVIEW_DURATION = timedelta(minutes=30)  # Length of one interview slot
+BUSINESS_HOURS = (time(9, 0), time(17, 0))  # Interviews start and end within these hours
+WORKING_DAYS = (0, 1, 2, 3, 4)  # Monday to Friday
+NOTICE = timedelta(days=1)  # Earliest interview is this long after scheduling
+DEFAULT_HORIZON = timedelta(days=28)  # How far ahead the default panel is available
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class IntervalIndex:
+    """
+    Sorted, non-overlapping busy intervals of one interviewer or candidate.
+
+    Intervals are half-open [start, end) and kept as two parallel sorted lists, so conflict checks
+    and finding the next free time are binary searches.
+    """
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            self.add(start, end)
+
+    def add(self, start, end):
+        """Marks [start, end) as busy, merging it with any intervals it overlaps."""
+        first = bisect_right(self.ends, start)  # First interval ending after start
+        last = bisect_left(self.starts, end)  # First interval starting at or after end
+        if first < last:
+            start = min(start, self.starts[first])
+            end = max(end, self.ends[last - 1])
+        self.starts[first:last] = [start]
+        self.ends[first:last] = [end]
+
+    def overlaps(self, start, end):
+        """Returns True if any busy interval overlaps [start, end)."""
+        i = bisect_right(self.ends, start)
+        return i < len(self.starts) and self.starts[i] < end
+
+    def next_free(self, start, duration):
+        """Returns the earliest time at or after start when a gap of the given duration begins."""
+        while True:
+            i = bisect_right(self.ends, start)  # First interval that ends after start
+            if i == len(self.starts) or self.starts[i] >= start + duration:
+                return start
+            start = self.ends[i]
+
+
+def business_windows(start, end, business_hours=BUSINESS_HOURS, working_days=WORKING_DAYS):
+    """Splits [start, end) into the parts that fall within business hours on working days."""
+    windows = []
+    day = start.date()
+    while day <= end.date():
+        if day.weekday() in working_days:
+            window_start = max(start, datetime.combine(day, business_hours[0]))
+            window_end = min(end, datetime.combine(day, business_hours[1]))
+            if window_start < window_end:
+                windows.append((window_start, window_end))
+        day += timedelta(days=1)
+    return windows
+
+
+def earliest_start(now=None, notice=NOTICE, duration=INTERVIEW_DURATION):
+    """Returns the first slot boundary at least notice after now."""
+    earliest = (now or datetime.now()) + notice
+    midnight = datetime.combine(earliest.date(), time())
+    slots = -(-(earliest - midnight) // duration)  # Round up to a whole number of slots
+    return midnight + slots * duration
+
+
+class SlotAllocator:
+    """
+    Assigns interview slots from interviewer availability, avoiding every existing booking.
+
+    Each interviewer's free time is searched through an IntervalIndex of their bookings, and a heap
+    holds every interviewer's next free slot, so each allocation takes the earliest slot across all
+    interviewers in O(log n). A candidate is never given two overlapping interviews.
+    """
+
+    def __init__(self, availability=None, bookings=(), duration=INTERVIEW_DURATION, not_before=None,
+                 business_hours=BUSINESS_HOURS, working_days=WORKING_DAYS):
+        """
+        Args:
+            availability (dict): Interviewer id -> list of (start, end) datetimes they can interview in.
+                These are clipped to business hours. None gives a single default panel (id None)
+                available every business hour for DEFAULT_HORIZON.
+            bookings (iterable): Existing interviews as (interviewer_id, candidate_key, start) tuples.
+                interviewer_id may be None; the booking then only blocks the candidate.
+            duration (timedelta): Length of each interview.
+            not_before (datetime): No slot starts earlier than this. Defaults to earliest_start().
+        """
+        self.duration = duration
+        self.not_before = not_before or earliest_start(duration=duration)
+        if availability is None:
+            availability = {None: [(self.not_before, self.not_before + DEFAULT_HORIZON)]}
+
+        # Each interviewer's working windows, merged so that they are sorted and disjoint
+        self._windows = {}
+        for interviewer, intervals in availability.items():
+            windows = IntervalIndex()
+            for start, end in intervals:
+                for window in business_windows(max(start, self.not_before), end, business_hours, working_days):
+                    windows.add(*window)
+            self._windows[interviewer] = windows
+
+        self._interviewer_busy = {interviewer: IntervalIndex() for interviewer in self._windows}
+        self._candidate_busy = {}
+        for interviewer, candidate_key, start in bookings:
+            self._book(interviewer, candidate_key, start)
+
+        # (next free slot, interviewer) for every interviewer that has one
+        self._heap = []
+        for interviewer in self._windows:
+            slot = self._next_slot(interviewer, self.not_before)
+            if slot is not None:
+                self._heap.append((slot, self._order(interviewer), interviewer))
+        heapq.heapify(self._heap)
+
+    @staticmethod
+    def _order(interviewer):
+        # Heap tie-breaker that also works for the default panel's None id
+        return (interviewer is not None, interviewer)
+
+    def _book(self, interviewer, candidate_key, start):
+        end = start + self.duration
+        if interviewer in self._interviewer_busy:
+            self._interviewer_busy[interviewer].add(start, end)
+        if candidate_key is not None:
+            self._candidate_busy.setdefault(candidate_key, IntervalIndex()).add(start, end)
+
+    def _next_slot(self, interviewer, after):
+        """Returns the interviewer's first free slot starting at or after the given time, or None."""
+        windows = self._windows[interviewer]
+        busy = self._interviewer_busy[interviewer]
+        # Skip windows that end too soon to hold a slot after the given time
+        for i in range(bisect_left(windows.ends, after + self.duration), len(windows.starts)):
+            start = busy.next_free(max(after, windows.starts[i]), self.duration)
+            if start + self.duration <= windows.ends[i]:
+                return start
+        return None
+
+    def _joint_slot(self, interviewer, candidate_busy, after):
+        """Returns the first slot at or after the given time free for both interviewer and candidate."""
+        while True:
+            start = self._next_slot(interviewer, after)
+            if start is None:
+                return None
+            after = candidate_busy.next_free(start, self.duration)
+            if after == start:
+                return start
+
+    def allocate(self, candidate_key=None):
+        """
+        Books the earliest slot the candidate is free for with any available interviewer.
+
+        Returns:
+            tuple: (start, interviewer_id), or None when no interviewer has a free slot left.
+        """
+        candidate_busy = self._candidate_busy.get(candidate_key)
+        popped = []
+        best = None
+        while self._heap and (best is None or self._heap[0][:2] < best[:2]):
+            entry = heapq.heappop(self._heap)
+            popped.append(entry)
+            start, order, interviewer = entry
+            if candidate_busy is not None and candidate_busy.overlaps(start, start + self.duration):
+                start = self._joint_slot(interviewer, candidate_busy, start)
+                if start is None:
+                    continue
+            if best is None or (start, order) < best[:2]:
+                best = (start, order, interviewer)
+
+        if best is None:
+            for entry in popped:
+                heapq.heappush(self._heap, entry)
+            return None
+
+        start, _, chosen = best
+        self._book(chosen, candidate_key, start)
+        for slot, order, interviewer in popped:
+            if interviewer == chosen:
+                slot = self._next_slot(interviewer, slot)  # Earlier gaps before the booking stay usable
+                if slot is None:
+                    continue
+            heapq.heappush(self._heap, (slot, order, interviewer))
+        return start, chosen
+
+    @classmethod
+    def from_database(cls, conn, by_name=False, duration=INTERVIEW_DURATION, not_before=None, **kwargs):
+        """
+        Builds an allocator from the interviewers, interviewer_availability and interview_schedules tables.
+
+        Bookings are keyed by candidate id, or by candidate name when by_name is True (for candidates
+        known only by their CV file name). Without any interviewers the default panel is used.
+        """
+        not_before = not_before or earliest_start(duration=duration)
+        availability = load_availability(conn, not_before) or None
+        # Earlier interviews cannot overlap any slot the allocator hands out
+        bookings = [(interviewer, name if by_name else candidate_id, start)
+                    for interviewer, candidate_id, name, _, start in load_bookings(conn, not_before - duration)]
+        return cls(availability, bookings, duration=duration, not_before=not_before, **kwargs)
+
+
+def load_availability(conn, not_before):
+    """Returns interviewer id -> [(start, end)] for availability windows that end after not_before."""
+    availability = {}
+    rows = conn.execute('''SELECT interviewer_id, start_time, end_time FROM interviewer_availability
+                           WHERE end_time > ? ORDER BY interviewer_id, start_time''', (not_before.strftime(DATE_FORMAT),))
+    for interviewer, start, end in rows:
+        availability.setdefault(interviewer, []).append((datetime.fromisoformat(start), datetime.fromisoformat(end)))
+    return availability
+
+
+def load_bookings(conn, since):
+    """Returns existing interviews from since onward as (interviewer_id, candidate_id, candidate_name, job_id, start) tuples."""
+    rows = conn.execute('''SELECT s.interviewer_id, s.candidate_id, c.name, s.job_id, s.interview_date
+                           FROM interview_schedules s LEFT JOIN candidates c ON c.id = s.candidate_id
+                           WHERE s.interview_date >= ?''', (since.strftime(DATE_FORMAT),))
+    return [(interviewer, candidate_id, name, job_id, datetime.fromisoformat(start))
+            for interviewer, candidate_id, name, job_id, start in rows]
+
+
+def load_interviewer_names(conn):
+    """Returns interviewer id -> name."""
+    return {interviewer: name for interviewer, name in conn.execute('SELECT id, name FROM interviewers')}
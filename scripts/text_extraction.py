@@ -0,0 +1,242 @@
+# text_extraction.py
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from extraction_backends import get_backend
+from metrics import counter, timer
+
+# Bump this whenever the extraction logic changes so stale cache entries are ignored
+EXTRACTOR_VERSION = "2"
+
+# Location and size cap of the on-disk text cache; set CV_TEXT_CACHE to use a different file
+CACHE_PATH = os.environ.get("CV_TEXT_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cv_text_cache.db"))
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MB of extracted text
+
+MAX_PAGES = None  # Pages read per CV; None reads every page
+
+
+class TextCache:
+    """
+    On-disk cache of extracted CV text, keyed by the PDF content hash, backend and extractor version.
+
+    Entries are evicted least-recently-used first once the total stored text exceeds max_bytes.
+    The cache is a small SQLite database so it can be shared between processes and Flask workers.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cv_text_cache (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cv_text_cache_last_access ON cv_text_cache (last_access)')
+
+    def _connect(self):
+        """Return the connection owned by the calling thread, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        # A connection inherited through fork() (e.g. by a worker process) must not be reused
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        """Return the cached text for key, or None if it is not cached."""
+        conn = self._connect()
+        row = conn.execute('SELECT text FROM cv_text_cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute('UPDATE cv_text_cache SET last_access = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+
+    def put(self, key, text):
+        """Store text under key and evict old entries if the cache grew past its size cap."""
+        conn = self._connect()
+        size = len(text.encode("utf-8"))
+        with self._lock, conn:
+            conn.execute('INSERT OR REPLACE INTO cv_text_cache (key, text, size, last_access) VALUES (?, ?, ?, ?)',
+                         (key, text, size, time.time()))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """Delete least-recently-used entries until the cache fits in max_bytes."""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cv_text_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute('SELECT key, size FROM cv_text_cache ORDER BY last_access')
+        stale_keys = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM cv_text_cache WHERE key = ?', stale_keys)
+
+    def clear(self):
+        """Remove every cached entry."""
+        conn = self._connect()
+        with self._lock, conn:
+            conn.execute('DELETE FROM cv_text_cache')
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide text cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TextCache()
+    return _cache
+
+
+def read_cv_bytes(cv_file):
+    """
+    Reads the raw bytes of a CV given a path or a file-like object (e.g. a Flask upload).
+
+    File-like objects are rewound afterwards so they can be read again.
+    """
+    if isinstance(cv_file, (str, os.PathLike)):
+        with open(cv_file, "rb") as f:
+            return f.read()
+
+    stream = getattr(cv_file, "stream", cv_file)
+    if hasattr(stream, "seek"):
+        stream.seek(0)
+    data = stream.read()
+    if hasattr(stream, "seek"):
+        stream.seek(0)
+    return data
+
+
+def cache_key(data, max_pages=None, backend=None):
+    """Build the cache key for a PDF from its content hash, the backend, the extractor version and any page limit."""
+    backend = backend or _default_backend()
+    key = f"{hashlib.sha256(data).hexdigest()}:{backend.name}-{EXTRACTOR_VERSION}"
+    return key if max_pages is None else f"{key}:p{max_pages}"
+
+
+_backend = None
+
+
+def _default_backend():
+    """Return the extraction backend configured by CV_TEXT_BACKEND, creating it on first use."""
+    global _backend
+    if _backend is None:
+        _backend = get_backend()
+    return _backend
+
+
+def _join_pages(pages):
+    return "\n".join(pages).strip()
+
+
+def extract_text_from_cv(cv_file, use_cache=True, max_pages=MAX_PAGES, backend=None):
+    """
+    Extracts text from a CV (PDF file), reusing the cached text if this PDF was seen before.
+
+    Args:
+        cv_file (str or file-like): Path to the PDF, or an open/uploaded PDF file.
+        use_cache (bool): Whether to consult and fill the on-disk text cache.
+        max_pages (int): Only read this many pages. None reads every page.
+        backend: Extraction backend from extraction_backends. None uses the configured one.
+
+    Returns:
+        str: The extracted text from the CV, or an empty string if it could not be read.
+    """
+    return extract_text_until(cv_file, None, use_cache=use_cache, max_pages=max_pages, backend=backend)
+
+
+def extract_text_until(cv_file, done, use_cache=True, max_pages=MAX_PAGES, backend=None, raise_errors=False):
+    """
+    Extracts text from a CV page by page, stopping as soon as the text read so far is enough.
+
+    Most CVs carry the fields the parsers need on their first page, so the layout analysis of the
+    remaining pages can often be skipped. Text covering every page (up to max_pages) is cached
+    under the PDF's cache_key; the first pages of an early exit are cached under that key plus
+    ":prefix" and are returned again for any done that accepts them. Cached text may therefore run
+    past the page where done would have stopped.
+
+    Args:
+        cv_file (str or file-like): Path to the PDF, or an open/uploaded PDF file.
+        done (callable): Called with the text of the pages read so far; returns True to stop reading.
+            None reads every page.
+        use_cache (bool): Whether to consult and fill the on-disk text cache.
+        max_pages (int): Never read more than this many pages. None reads every page.
+        backend: Extraction backend from extraction_backends. None uses the configured one.
+        raise_errors (bool): Raise read and parser errors instead of returning an empty string, so
+            callers can tell an unreadable CV from one without text.
+
+    Returns:
+        str: The extracted text, or an empty string if the CV could not be read.
+    """
+    name = getattr(cv_file, "filename", cv_file)
+    try:
+        data = read_cv_bytes(cv_file)
+    except OSError as e:
+        logging.error(f"Error reading CV {name}: {e}")
+        if raise_errors:
+            raise
+        return ""
+
+    backend = backend or _default_backend()
+    key = cache_key(data, max_pages, backend)
+    cache = get_cache() if use_cache else None
+    if cache is not None:
+        cached_text = cache.get(key)
+        if cached_text is None and done is not None:
+            # The first pages kept by an earlier early exit; good enough if they satisfy this caller too
+            cached_text = cache.get(f"{key}:prefix")
+            if cached_text is not None and not done(cached_text):
+                cached_text = None
+        counter("text_cache_requests_total", "CV text cache lookups").inc(result="miss" if cached_text is None else "hit")
+        if cached_text is not None:
+            return cached_text
+
+    pages = []
+    stopped_early = False
+    try:
+        with timer("pdf_extract_seconds", "Time spent extracting text from CV PDFs").time():
+            with backend.open(data, max_pages) as document:
+                for i in range(len(document)):
+                    pages.append(document.page_text(i))
+                    # No need to ask after the last page; the text is complete and can be cached
+                    if done is not None and i + 1 < len(document) and done(_join_pages(pages)):
+                        stopped_early = True
+                        break
+                fallback_pages = getattr(document, "fallback_pages", 0)
+    except Exception as e:
+        logging.error(f"Error extracting text from CV {name}: {e}")
+        if raise_errors:
+            raise
+        return ""
+    counter("pdf_pages_read_total", "CV pages run through the text extractor").inc(len(pages))
+    if fallback_pages:
+        counter("pdf_fallback_pages_total", "CV pages re-read with pdfplumber after the fast backend failed").inc(fallback_pages)
+
+    text = _join_pages(pages)
+    if stopped_early:
+        counter("pdf_early_exits_total", "CV extractions stopped before the last page").inc()
+    if cache is not None:
+        cache.put(f"{key}:prefix" if stopped_early else key, text)
+    return text
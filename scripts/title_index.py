@@ -0,0 +1,114 @@
+# title_index.py
+
+import re
+from collections import Counter, defaultdict
+
+SIMILARITY_THRESHOLD = 0.6  # Trigram similarity (0-1) above which a CV title matches a job title
+
+# Abbreviations expanded before comparing titles
+ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "jnr": "junior",
+    "eng": "engineer", "engr": "engineer", "dev": "developer", "devs": "developers",
+    "mgr": "manager", "mngr": "manager", "admin": "administrator", "dba": "database administrator",
+    "swe": "software engineer", "sde": "software engineer", "qa": "quality assurance",
+    "ml": "machine learning", "bi": "business intelligence", "pm": "project manager",
+}
+# Seniority and grade words dropped, so "Senior Software Engineer II" matches "Software Engineer"
+SENIORITY = {
+    "senior", "junior", "lead", "principal", "staff", "associate", "intern", "trainee", "head", "chief",
+    "entry", "level", "mid", "i", "ii", "iii", "iv", "1", "2", "3",
+}
+WORD_PATTERN = re.compile(r'[a-z0-9+#]+')  # Keeps "c++" and "c#" whole
+
+
+def normalize_title(title):
+    """Lower-cases a job title, expands abbreviations, and drops punctuation and seniority words."""
+    words = []
+    for word in WORD_PATTERN.findall(title.lower()):
+        for expanded in ABBREVIATIONS.get(word, word).split():
+            if expanded not in SENIORITY:
+                words.append(expanded)
+    return " ".join(words)
+
+
+def trigrams(normalized_title):
+    """Returns the set of character trigrams of a normalized title, padded so word starts and ends count."""
+    padded = f"  {normalized_title} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def title_similarity(first, second):
+    """Returns the Jaccard similarity (0-1) of the trigrams of two titles after normalization; 0 if either is empty."""
+    first, second = normalize_title(first), normalize_title(second)
+    if not first or not second:
+        return 0.0  # Nothing to compare; even two empty titles would otherwise share the padding trigram
+    first, second = trigrams(first), trigrams(second)
+    return len(first & second) / len(first | second)
+
+
+class TitleIndex:
+    """
+    Trigram index of job titles, resolving a title to every similar indexed title in one lookup.
+
+    Titles are normalized first, so "Sr. Software Engineer" and "Software Engineer" are the same
+    title. Similarity is the Jaccard index of the trigram sets, counted from the postings of the
+    query's trigrams only, instead of comparing against every indexed title.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        """
+        Args:
+            threshold (float): Default similarity lookup() must exceed.
+        """
+        self.threshold = threshold
+        self.keys_by_title = defaultdict(set)  # Normalized title -> keys added with it
+        self._sizes = {}  # Normalized title -> number of trigrams
+        self._postings = defaultdict(set)  # Trigram -> normalized titles containing it
+
+    def __len__(self):
+        return len(self.keys_by_title)
+
+    def add(self, key, title):
+        """Indexes a title under a key (e.g. a job id or candidate name). Several keys may share a title."""
+        normalized = normalize_title(title)
+        if not normalized:
+            return
+        if normalized not in self._sizes:
+            grams = trigrams(normalized)
+            self._sizes[normalized] = len(grams)
+            for gram in grams:
+                self._postings[gram].add(normalized)
+        self.keys_by_title[normalized].add(key)
+
+    def lookup(self, title, threshold=None):
+        """
+        Returns the indexed titles similar to title, most similar first.
+
+        Args:
+            title (str): The title to resolve, e.g. the one found in a CV.
+            threshold (float): Similarity a title must exceed; defaults to the index's threshold.
+
+        Returns:
+            list: (normalized title, similarity) tuples.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        normalized = normalize_title(title)
+        if not normalized:
+            return []
+        grams = trigrams(normalized)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        matches = []
+        for candidate, common in shared.items():
+            similarity = common / (len(grams) + self._sizes[candidate] - common)
+            if similarity > threshold:
+                matches.append((candidate, similarity))
+        return sorted(matches, key=lambda item: (-item[1], item[0]))
+
+    def keys(self, title, threshold=None):
+        """Returns the set of keys whose title is similar to title."""
+        keys = set()
+        for normalized, _ in self.lookup(title, threshold):
+            keys |= self.keys_by_title[normalized]
+        return keys
@@ -0,0 +1,58 @@
+# upload_stream.py
+
+from tempfile import SpooledTemporaryFile
+
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+CHUNK_SIZE = 64 * 1024  # Bytes read from the request body at a time
+SPOOL_MAX_MEMORY = 5 * 1024 * 1024  # Uploaded files larger than this are spooled to a temp file
+
+
+def _read_chunks(stream):
+    """Yields the request body in chunks, then None to mark the end of the data."""
+    while True:
+        data = stream.read(CHUNK_SIZE)
+        if not data:
+            break
+        yield data
+    yield None
+
+
+def iter_uploaded_files(stream, boundary, field_name='cv_files'):
+    """
+    Parses a multipart/form-data body incrementally and yields each uploaded file in turn.
+
+    Only one file is held at a time: the next file is not read from the stream until the caller
+    has finished with the current one, so large uploads never need to be buffered in full.
+
+    Args:
+        stream (file-like): The raw request body, e.g. flask.request.stream.
+        boundary (str): The multipart boundary from the Content-Type header.
+        field_name (str): Only files uploaded under this form field are yielded.
+
+    Yields:
+        tuple: (filename, file) where file is a spooled temporary file positioned at the start.
+    """
+    decoder = MultipartDecoder(boundary.encode())
+    filename = None
+    spool = None
+
+    for chunk in _read_chunks(stream):
+        decoder.receive_data(chunk)
+        event = decoder.next_event()
+        while not isinstance(event, (NeedData, Epilogue)):
+            if isinstance(event, File) and event.name == field_name:
+                filename = event.filename
+                spool = SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+            elif isinstance(event, (File, Field)):
+                spool = None  # Other form fields are skipped
+            elif isinstance(event, Data) and spool is not None:
+                spool.write(event.data)
+                if not event.more_data:
+                    spool.seek(0)
+                    try:
+                        yield filename, spool
+                    finally:
+                        spool.close()
+                        spool = None
+            event = decoder.next_event()
@@ -0,0 +1,14 @@
+# conftest.py
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CVS_DIR = os.path.join(ROOT, "cvs")
+JOB_CSV = os.path.join(ROOT, "job_description.csv")
+
+# Keep the tests' extracted text and embeddings out of the repository's cache; set before any script is imported
+os.environ.setdefault("CV_TEXT_CACHE", os.path.join(tempfile.mkdtemp(prefix="cv-text-cache-"), "cv_text_cache.db"))
+os.environ.setdefault("CV_EMBEDDINGS", tempfile.mkdtemp(prefix="cv-embeddings-"))
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
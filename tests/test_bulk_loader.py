@@ -0,0 +1,16 @@
+# test_bulk_loader.py
+
+import sqlite3
+
+from bulk_loader import bulk_insert
+
+
+def test_ids_are_read_back_not_assumed_consecutive():
+    conn = sqlite3.connect(":memory:")
+    conn.execute('CREATE TABLE job_descriptions (id INTEGER PRIMARY KEY, title TEXT)')
+    rows = [(5, 'Data Scientist'), (None, 'Software Engineer'), (2, 'Product Manager'), (None, 'Chef')]
+    ids = bulk_insert(conn, 'job_descriptions', ['id', 'title'], rows, batch_size=3)
+    assert ids == [5, 6, 2, 7]
+    assert dict(conn.execute('SELECT title, id FROM job_descriptions')) == \
+        {'Data Scientist': 5, 'Software Engineer': 6, 'Product Manager': 2, 'Chef': 7}
+    conn.close()
@@ -0,0 +1,30 @@
+# test_candidate_matching.py
+
+import numpy as np
+import pytest
+
+import embedding_matcher
+from candidate_matching import SCORING_METHODS, compute_scores, title_mask
+from embedding_matcher import EmbeddingStore, HashingEmbedder
+
+JOBS = [("Python Developer", "python developer with sql and django experience"),
+        ("Data Analyst", "data analyst with sql, excel and python reporting")]
+CVS = [("Senior Python Developer", "python developer, sql, django, excel"),
+       ("Data Analyst", "python developer, sql, django, excel"),
+       ("Chef", "python developer, sql, django, excel reporting")]
+
+
+@pytest.mark.parametrize("method", SCORING_METHODS)
+@pytest.mark.parametrize("top_k", [None, 1])
+def test_title_gate_applies_to_every_scoring_method(method, top_k, tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_matcher, "_store", EmbeddingStore(str(tmp_path), HashingEmbedder(dimensions=64)))
+    job_texts = [text for _, text in JOBS]
+    cv_texts = [text for _, text in CVS]
+    mask = title_mask([title for title, _ in JOBS], [title for title, _ in CVS])
+    assert mask.toarray().tolist() == [[1, 0, 0], [0, 1, 0]]
+
+    gated = compute_scores(job_texts, cv_texts, method=method, top_k=top_k, mask=mask).toarray()
+    ungated = compute_scores(job_texts, cv_texts, method=method).toarray()
+    # Every CV shares words with both jobs, so only the gate zeroes a pair, and top_k is taken within it
+    assert (ungated > 0).all()
+    np.testing.assert_allclose(gated, ungated * mask.toarray(), rtol=1e-5)
@@ -0,0 +1,72 @@
+# test_cv_extractor.py
+
+import os
+import shutil
+import sqlite3
+import threading
+
+import pytest
+
+import cv_extractor
+from conftest import CVS_DIR
+from cv_extractor import process_cv_directory_incremental, process_cv_directory_parallel
+from database_setup import setup_database
+
+
+@pytest.fixture
+def cv_directory(tmp_path):
+    directory = tmp_path / "cvs"
+    directory.mkdir()
+    for name in sorted(os.listdir(CVS_DIR))[:6]:
+        shutil.copy(os.path.join(CVS_DIR, name), directory / name)
+    return str(directory)
+
+
+def test_unbounded_queue_keeps_every_cv_in_flight(tmp_path, cv_directory, monkeypatch):
+    in_flight = []
+    wait = cv_extractor.wait
+
+    def recording_wait(pending, **kwargs):
+        in_flight.append(len(pending))
+        return wait(pending, **kwargs)
+
+    monkeypatch.setattr(cv_extractor, "wait", recording_wait)
+    conn = sqlite3.connect(tmp_path / "recruitment.db")
+    setup_database(conn)
+    assert process_cv_directory_parallel(cv_directory, conn, workers=2, queue_size=0) == 6
+    assert max(in_flight) == 6
+    conn.close()
+
+
+def test_writer_failure_stops_the_feeder(tmp_path, cv_directory, monkeypatch):
+    def failing_insert(conn, candidates):
+        next(candidates)
+        raise sqlite3.OperationalError("disk is full")  # While the feeder still has CVs to hand over
+
+    monkeypatch.setattr(cv_extractor, "insert_candidates", failing_insert)
+    conn = sqlite3.connect(tmp_path / "recruitment.db")
+    setup_database(conn)
+    threads = set(threading.enumerate())
+    with pytest.raises(sqlite3.OperationalError):
+        process_cv_directory_parallel(cv_directory, conn, workers=2, queue_size=1)
+    # The feeder and the process pool's threads have exited instead of waiting on the full queue
+    assert set(threading.enumerate()) <= threads
+    conn.close()
+
+
+def test_unreadable_cv_is_retried_on_the_next_run(tmp_path, cv_directory):
+    names = sorted(os.listdir(CVS_DIR))
+    broken = os.path.join(cv_directory, "broken.pdf")
+    with open(broken, "wb") as f:
+        f.write(b"%PDF-1.4 truncated")
+    conn = sqlite3.connect(tmp_path / "recruitment.db")
+    setup_database(conn)
+
+    assert process_cv_directory_incremental(cv_directory, conn, workers=1) == (6, 0)
+    assert conn.execute("SELECT COUNT(*) FROM cv_files WHERE path = ?", (broken,)).fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM candidates WHERE name = 'broken'").fetchone()[0] == 0
+
+    shutil.copy(os.path.join(CVS_DIR, names[6]), broken)
+    assert process_cv_directory_incremental(cv_directory, conn, workers=1) == (1, 0)
+    assert conn.execute("SELECT email FROM candidates WHERE name = 'broken'").fetchone()[0] != "N/A"
+    conn.close()
@@ -0,0 +1,58 @@
+# test_dedup.py
+
+import os
+import shutil
+import sqlite3
+
+from bulk_loader import insert_candidates
+from conftest import CVS_DIR, JOB_CSV
+from cv_extractor import process_cv_directory_incremental
+from database_setup import insert_job_descriptions_from_csv, setup_database
+from dedup import DuplicateIndex, link_duplicates, minhash
+from score_store import refresh_candidate_scores
+
+
+def test_renamed_cv_stays_original_and_is_scored(tmp_path):
+    cv_directory = tmp_path / "cvs"
+    cv_directory.mkdir()
+    for name in sorted(os.listdir(CVS_DIR))[:3]:
+        shutil.copy(os.path.join(CVS_DIR, name), cv_directory / name)
+    conn = sqlite3.connect(tmp_path / "recruitment.db")
+    setup_database(conn)
+    insert_job_descriptions_from_csv(conn, JOB_CSV)
+
+    process_cv_directory_incremental(str(cv_directory), conn, workers=1)
+    refresh_candidate_scores(conn)
+
+    # A rename is a deleted CV plus a new one with the same email and text
+    renamed = cv_directory / "Renamed.pdf"
+    os.rename(cv_directory / sorted(os.listdir(cv_directory))[0], renamed)
+    assert process_cv_directory_incremental(str(cv_directory), conn, workers=1) == (1, 1)
+    assert refresh_candidate_scores(conn) == 1
+
+    candidate_id, duplicate_of = conn.execute('''SELECT c.id, c.duplicate_of FROM cv_files f
+                                                 JOIN candidates c ON c.id = f.candidate_id WHERE f.path = ?''',
+                                              (str(renamed),)).fetchone()
+    assert duplicate_of is None
+    assert conn.execute('SELECT COUNT(*) FROM candidate_scores WHERE candidate_id = ?', (candidate_id,)).fetchone()[0] > 0
+    conn.close()
+
+
+def test_duplicates_link_to_the_root_of_a_two_level_chain(tmp_path):
+    conn = sqlite3.connect(tmp_path / "recruitment.db")
+    setup_database(conn)
+    insert_candidates(conn, [(name, f"{name}@example.com", "N/A", "Python") for name in ("ann", "bob", "cat")])
+    link_duplicates(conn, [(1, minhash("ann"), "ann@example.com", "N/A"),
+                           (2, minhash("bob"), "bob@example.com", "N/A"),
+                           (3, minhash("cat"), "bob@example.com", "N/A")])
+    assert conn.execute('SELECT duplicate_of FROM candidates WHERE id = 3').fetchone()[0] == 2
+
+    # Bob's CV is edited into a duplicate of Ann's; Cat, who duplicated Bob, now belongs to Ann's group
+    link_duplicates(conn, [(2, minhash("bob"), "ann@example.com", "N/A")])
+    assert dict(conn.execute('SELECT id, duplicate_of FROM candidates')) == {1: None, 2: 1, 3: 1}
+
+    # A chain left behind by an older run still resolves to its root
+    with conn:
+        conn.execute('UPDATE candidates SET duplicate_of = 2 WHERE id = 3')
+    assert DuplicateIndex(conn).find(minhash("dan"), email="cat@example.com")[0] == 1
+    conn.close()
@@ -0,0 +1,39 @@
+# test_embedding_matcher.py
+
+import numpy as np
+
+from embedding_matcher import EmbeddingScorer, EmbeddingStore, HashingEmbedder
+
+TEXTS = [f"python developer {i} with sql experience number {i * 7}" for i in range(30)]
+
+
+def test_job_text_uploaded_as_cv_is_indexed(tmp_path):
+    store = EmbeddingStore(str(tmp_path), HashingEmbedder(dimensions=64))
+    job_row, = store.embed([TEXTS[0]], kind="job")
+    cv_row, = store.embed([TEXTS[0]], kind="cv")
+    assert cv_row == job_row and len(store) == 1  # The vector is reused, not embedded again
+    assert job_row in store.index().rows()
+
+
+def test_store_stays_within_its_size_bound(tmp_path):
+    embedder = HashingEmbedder(dimensions=64)
+    store = EmbeddingStore(str(tmp_path), embedder, max_bytes=10 * 64 * 4)
+    for start in range(0, len(TEXTS), 5):
+        batch = TEXTS[start:start + 5]
+        rows = store.embed(batch)
+        assert len(store) <= store.max_rows
+        np.testing.assert_allclose(store.vectors(rows), embedder.embed(batch))
+    # Evicted texts are embedded again, and the rebuilt index only holds live rows
+    rows = store.embed(TEXTS[:5])
+    np.testing.assert_allclose(store.vectors(rows), embedder.embed(TEXTS[:5]))
+    assert set(store.index().rows().tolist()) <= set(range(len(store)))
+
+
+def test_top_k_scoring_searches_the_ann_index(tmp_path):
+    store = EmbeddingStore(str(tmp_path), HashingEmbedder(dimensions=64))
+    scorer = EmbeddingScorer(["python developer with sql"], store=store, top_k=3)
+    scores = scorer.score_cvs(TEXTS[:10])
+    assert store._index is not None
+    assert scores.nnz == 3
+    exact = EmbeddingScorer(["python developer with sql"], store=store).score_cvs(TEXTS[:10]).toarray().ravel()
+    assert sorted(scores.indices.tolist()) == sorted(np.argsort(-exact, kind="stable")[:3].tolist())
@@ -0,0 +1,55 @@
+# test_interview_scheduler.py
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+import interview_scheduler
+from conftest import CVS_DIR, JOB_CSV
+from cv_extractor import process_cv_directory_incremental
+from database_setup import insert_job_descriptions_from_csv, setup_database
+from db import connect
+from interview_scheduler import schedule_interviews_from_scores
+from score_store import refresh_candidate_scores
+
+
+def test_concurrent_runs_never_share_a_slot(tmp_path, monkeypatch):
+    cv_directory = tmp_path / "cvs"
+    cv_directory.mkdir()
+    for name in sorted(os.listdir(CVS_DIR))[:6]:
+        shutil.copy(os.path.join(CVS_DIR, name), cv_directory / name)
+    database = str(tmp_path / "recruitment.db")
+    conn = sqlite3.connect(database)
+    setup_database(conn)
+    insert_job_descriptions_from_csv(conn, JOB_CSV)
+    process_cv_directory_incremental(str(cv_directory), conn, workers=1)
+    refresh_candidate_scores(conn)
+
+    # Both runs read the existing bookings before either saves its own, unless the first holds the lock
+    from_database = interview_scheduler.SlotAllocator.from_database
+
+    def slow_from_database(*args, **kwargs):
+        allocator = from_database(*args, **kwargs)
+        time.sleep(0.3)
+        return allocator
+
+    monkeypatch.setattr(interview_scheduler.SlotAllocator, "from_database", slow_from_database)
+
+    def run():
+        run_conn = connect(database, check_same_thread=False)
+        schedule_interviews_from_scores(run_conn, threshold=0)
+        run_conn.close()
+
+    runs = [threading.Thread(target=run) for _ in range(2)]
+    for thread in runs:
+        thread.start()
+    for thread in runs:
+        thread.join()
+
+    bookings = conn.execute('SELECT candidate_id, job_id, interviewer_id, interview_date FROM interview_schedules').fetchall()
+    assert bookings
+    assert len({(candidate_id, job_id) for candidate_id, job_id, _, _ in bookings}) == len(bookings)
+    assert len({(interviewer_id, date) for _, _, interviewer_id, date in bookings}) == len(bookings)
+    conn.close()
@@ -0,0 +1,29 @@
+# test_job_description_loader.py
+
+import csv
+import io
+
+import pytest
+
+from job_description_loader import FIELD_SIZE_LIMIT, READ_ERRORS, iter_job_description_chunks
+
+
+def test_long_fields_load_without_changing_the_csv_limit():
+    limit = csv.field_size_limit()
+    description = "Python " * (limit // 7 + 100)  # Longer than the csv module accepts by default
+    data = "Job Title,Job Description\n" + "".join(f'Engineer {i},"{description}"\n' for i in range(3))
+    chunks = iter_job_description_chunks(io.BytesIO(data.encode()), chunk_size=1)
+    for chunk in chunks:
+        assert len(chunk[0].description) > limit
+        assert csv.field_size_limit() == limit  # Restored while the caller holds a chunk
+    assert csv.field_size_limit() == limit
+
+
+def test_field_over_the_cap_raises_a_read_error():
+    limit = csv.field_size_limit()
+    data = b"Job Title,Job Description\nEngineer,Python\nChef," + b"x" * (FIELD_SIZE_LIMIT + 1) + b"\n"
+    chunks = iter_job_description_chunks(io.BytesIO(data), chunk_size=1)
+    assert next(chunks)[0].title == "Engineer"
+    with pytest.raises(READ_ERRORS):
+        next(chunks)
+    assert csv.field_size_limit() == limit
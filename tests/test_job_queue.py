@@ -0,0 +1,39 @@
+# test_job_queue.py
+
+import sqlite3
+import time
+
+import job_queue
+from job_queue import JobQueue
+
+
+def wait_for(queue, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in ('done', 'failed'):
+            return job
+        time.sleep(0.02)
+    return queue.get(job_id)
+
+
+def test_worker_survives_a_locked_database(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "POLL_INTERVAL", 0.05)
+    queue = JobQueue(str(tmp_path / "jobs.db"), workers=1)
+    queue.register('double', lambda payload, progress: payload * 2)
+    claim = queue._claim
+    failures = []
+
+    def flaky_claim():
+        if not failures:
+            failures.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        return claim()
+
+    monkeypatch.setattr(queue, "_claim", flaky_claim)
+    job_id = queue.submit('double', 21)
+    try:
+        job = wait_for(queue, job_id)
+        assert failures and job['status'] == 'done' and job['result'] == 42
+    finally:
+        queue.stop()
@@ -0,0 +1,54 @@
+# test_mailer.py
+
+import sqlite3
+
+import mailer
+from mailer import Mailer
+
+
+class FakeSMTP:
+    """Accepts every message, except that it cannot encode non-ASCII addresses."""
+
+    sent = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def starttls(self):
+        pass
+
+    def login(self, *args):
+        pass
+
+    def send_message(self, message):
+        message['To'].encode('ascii')
+        FakeSMTP.sent.append(message['To'])
+
+    def quit(self):
+        pass
+
+
+def test_sender_survives_bad_messages_and_database_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(mailer.smtplib, "SMTP", FakeSMTP)
+    monkeypatch.setattr(mailer, "POLL_INTERVAL", 0.05)
+    outbox = Mailer(str(tmp_path / "mail.db"), "smtp.example.com", 587, "hr@example.com", use_tls=False)
+    next_batch = outbox._next_batch
+    failures = []
+
+    def flaky_next_batch():
+        if not failures:
+            failures.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        return next_batch()
+
+    monkeypatch.setattr(outbox, "_next_batch", flaky_next_batch)
+    first = outbox.enqueue("ann@example.com", "Interview", "Hello")
+    bad = outbox.enqueue("jürgen@exämple.com", "Interview", "Hello")
+    last = outbox.enqueue("bob@example.com", "Interview", "Hello")
+    try:
+        assert outbox.flush(timeout=10)
+        assert failures
+        assert [outbox.status(message_id)['status'] for message_id in (first, bad, last)] == ['sent', 'failed', 'sent']
+        assert FakeSMTP.sent == ["ann@example.com", "bob@example.com"]
+    finally:
+        outbox.stop()
@@ -0,0 +1,41 @@
+# test_score_store.py
+
+import os
+import shutil
+import sqlite3
+
+import score_store
+from conftest import CVS_DIR, JOB_CSV
+from candidate_matching import SkillScorer
+from cv_extractor import process_cv_directory_incremental
+from database_setup import insert_job_descriptions_from_csv, setup_database
+from score_store import load_skill_scores, refresh_candidate_scores
+from text_extraction import extract_text_from_cv
+
+
+def test_stored_skill_scores_match_rescoring_the_text(tmp_path, monkeypatch):
+    cv_directory = tmp_path / "cvs"
+    cv_directory.mkdir()
+    for name in sorted(os.listdir(CVS_DIR))[:5]:
+        shutil.copy(os.path.join(CVS_DIR, name), cv_directory / name)
+    conn = sqlite3.connect(tmp_path / "recruitment.db")
+    setup_database(conn)
+    insert_job_descriptions_from_csv(conn, JOB_CSV)
+    process_cv_directory_incremental(str(cv_directory), conn, workers=1)
+    refresh_candidate_scores(conn)
+
+    jobs = conn.execute('SELECT id, description FROM job_descriptions ORDER BY id').fetchall()
+    cvs = conn.execute('SELECT candidate_id, path FROM cv_files ORDER BY candidate_id').fetchall()
+    scores = SkillScorer([description for _, description in jobs]).score_cvs(
+        [extract_text_from_cv(path) for _, path in cvs]).toarray()
+    expected = {(jobs[row][0], cvs[column][0]): round(scores[row, column], 2)
+                for row, column in zip(*scores.nonzero())}
+
+    # Read from the table refresh_candidate_scores fills, without scoring any skills again
+    monkeypatch.setattr(score_store, "SkillScorer", None)
+    stored = load_skill_scores(conn)
+    assert len(stored) == conn.execute('SELECT COUNT(*) FROM candidate_skill_scores').fetchone()[0]
+    assert expected and {(job_id, candidate_id): score for job_id, _, candidate_id, _, _, score in stored} == expected
+    assert [score for *_, score in stored] == sorted((score for *_, score in stored), reverse=True)
+    assert len(load_skill_scores(conn, job_id=jobs[0][0], limit=2)) <= 2
+    conn.close()
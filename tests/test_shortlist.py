@@ -0,0 +1,17 @@
+# test_shortlist.py
+
+from scipy import sparse
+
+from shortlist import Shortlist
+
+
+def test_percentile_counts_candidates_missing_from_the_matrix():
+    # One job, ten candidates, only two of them scored
+    scores = sparse.csr_matrix(([40.0, 20.0], ([0, 0], [3, 7])), shape=(1, 10))
+    shortlist = Shortlist(top_k=None)
+    shortlist.add_matrix(scores)
+    # 80% of the candidates score 0, so the 85th percentile lies among the scored two
+    assert shortlist.percentile_cutoff(0, 85) == 20.0
+    assert shortlist.ranked(0, percentile=85) == [(3, 40.0), (7, 20.0)]
+    assert shortlist.ranked(0, percentile=95) == [(3, 40.0)]
+    assert shortlist.percentile_cutoff(0, 50) == 0
@@ -0,0 +1,38 @@
+# test_text_extraction.py
+
+import os
+
+import text_extraction
+from conftest import CVS_DIR
+from text_extraction import TextCache, extract_text_from_cv, extract_text_until
+
+
+class CountingBackend:
+    """Wraps the configured backend, under the same name, and counts the PDFs it opens."""
+
+    def __init__(self):
+        self.backend = text_extraction._default_backend()
+        self.name = self.backend.name
+        self.opened = 0
+
+    def open(self, data, max_pages=None):
+        self.opened += 1
+        return self.backend.open(data, max_pages)
+
+
+def test_early_exit_text_is_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(text_extraction, "_cache", TextCache(str(tmp_path / "cache.db")))
+    cv_path = os.path.join(CVS_DIR, "C1070.pdf")  # Two pages
+    backend = CountingBackend()
+
+    first_page = extract_text_until(cv_path, lambda text: True, backend=backend)
+    assert first_page and backend.opened == 1
+    # The first page is reused for any caller it satisfies, without opening the PDF again
+    assert extract_text_until(cv_path, lambda text: len(text) > 0, backend=backend) == first_page
+    assert backend.opened == 1
+
+    # A caller the prefix does not satisfy, or one asking for every page, reads the PDF
+    full_text = extract_text_from_cv(cv_path, backend=backend)
+    assert backend.opened == 2 and full_text.startswith(first_page) and len(full_text) > len(first_page)
+    assert extract_text_until(cv_path, lambda text: True, backend=backend) == full_text
+    assert backend.opened == 2
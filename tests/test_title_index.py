@@ -0,0 +1,31 @@
+# test_title_index.py
+
+from candidate_matching import candidates_by_job
+from title_index import SIMILARITY_THRESHOLD, TitleIndex, title_similarity
+
+
+def test_empty_titles_are_not_similar():
+    assert title_similarity('', '') == 0.0
+    assert title_similarity('Sr.', 'II') == 0.0  # Nothing left after normalization
+    assert title_similarity('', 'Software Engineer') == 0.0
+
+
+def test_abbreviations_and_seniority_are_ignored():
+    assert title_similarity('Sr. Software Eng.', 'Software Engineer') == 1.0
+
+
+def test_similarity_at_the_threshold_does_not_match():
+    assert title_similarity('Product Manager', 'Project Manager') == SIMILARITY_THRESHOLD
+
+    index = TitleIndex()
+    index.add(1, 'Project Manager')
+    index.add(2, 'Software Engineer')
+    assert index.keys('Product Manager') == set()
+    assert index.keys('Senior PM') == {1}
+    assert index.keys('') == set()
+
+
+def test_cv_titles_resolve_to_jobs_through_the_job_title_index():
+    job_titles = ['Software Engineer', 'Data Scientist', 'Sr. Software Eng.']
+    cv_titles = {'ann': 'Senior Software Engineer', 'bob': 'Data Scientist II', 'cat': 'Chef', 'dan': ''}
+    assert candidates_by_job(job_titles, cv_titles) == [{'ann'}, {'bob'}, {'ann'}]